@@ -0,0 +1,46 @@
+"""Small LRU cache for results derived from a swimmer's data.
+
+Entries are stored with the data version they were computed from (see
+``SwimmerDatabase.get_data_version``). A lookup with a newer version misses
+and recomputes, so cached results never need explicit invalidation.
+"""
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Tuple
+import threading
+
+from app.monitoring.metrics import record_cache
+
+class VersionedCache:
+    """Thread-safe LRU of (version, value) pairs"""
+    
+    def __init__(self, name: str, maxsize: int = 256):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_or_compute(self, key: Hashable, version: int, compute: Callable[[], Any]) -> Any:
+        """Return the value cached for ``key`` at ``version``, computing it on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                record_cache(self.name, True)
+                return entry[1]
+            self.misses += 1
+        record_cache(self.name, False)
+        
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,322 @@
+"""Single-pass analytics over a swimmer's race history.
+
+Every view derived from a swimmer's records (summary stats, personal best
+cards, improvement trends and season bests) is produced by one walk over
+the records in date order, grouped by (stroke, distance, pool type).
+"""
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+from app.analytics.conversion import convert_times, other_pool
+
+logger = logging.getLogger(__name__)
+
+# Races within this many days of the swimmer's latest race count as recent
+RECENT_IMPROVEMENT_DAYS = 90
+
+STROKE_ORDER = {"Freestyle": 1, "Backstroke": 2, "Breaststroke": 3, "Butterfly": 4, "Individual Medley": 5}
+
+STROKE_INFO = {
+    "Freestyle": {"color": "#3B82F6", "icon": "🏊"},  # Blue
+    "Backstroke": {"color": "#10B981", "icon": "🤿"},  # Green
+    "Breaststroke": {"color": "#F59E0B", "icon": "🐸"},  # Amber
+    "Butterfly": {"color": "#8B5CF6", "icon": "🦋"},  # Purple
+    "Individual Medley": {"color": "#EF4444", "icon": "🎯"}  # Red
+}
+
+
+def empty_stats() -> Dict[str, Any]:
+    """Stats reported for a swimmer with no races"""
+    return {
+        "totalRaces": 0,
+        "personalBests": 0,
+        "averageWAPoints": 0,
+        "mostCommonStroke": "Freestyle",
+        "mostCommonDistance": 50,
+        "currentSeason": "2024-25",
+        "seasonsCompeted": [],
+        "recentImprovements": 0,
+        "competitionSpan": {
+            "firstRace": None,
+            "lastRace": None,
+            "yearsActive": 0
+        }
+    }
+
+def get_stroke_info(stroke):
+    """Get color and icon information for strokes"""
+    return STROKE_INFO.get(stroke, {"color": "#6B7280", "icon": "🏊"})
+
+def convert_time_to_seconds(time_str):
+    """Convert time string to seconds"""
+    if not time_str:
+        return None
+    
+    try:
+        time_str = str(time_str).strip()
+        
+        if ':' in time_str:
+            # Format: MM:SS.sss or H:MM:SS.sss
+            parts = time_str.split(':')
+            if len(parts) == 2:
+                # MM:SS.sss
+                minutes = float(parts[0])
+                seconds = float(parts[1])
+                return minutes * 60 + seconds
+            elif len(parts) == 3:
+                # H:MM:SS.sss
+                hours = float(parts[0])
+                minutes = float(parts[1])
+                seconds = float(parts[2])
+                return hours * 3600 + minutes * 60 + seconds
+        else:
+            # Format: SS.sss
+            return float(time_str)
+    except (ValueError, TypeError):
+        return None
+
+def season_for_date(meet_date) -> str:
+    """Get swimming season (September to August) for a date"""
+    if meet_date.month >= 9:
+        return f"{meet_date.year}-{meet_date.year + 1}"
+    return f"{meet_date.year - 1}-{meet_date.year}"
+
+def _value(field):
+    """Unwrap enum fields to their plain string value"""
+    return field.value if hasattr(field, 'value') else str(field)
+
+class EventSummary:
+    """Running aggregates for one (stroke, distance, pool type) event"""
+    
+    __slots__ = (
+        "stroke", "distance", "pool_type", "races", "best_seconds", "best_record",
+        "first_seconds", "recent_seconds", "improvement_dates", "seasons", "season_bests"
+    )
+    
+    def __init__(self, stroke: str, distance: int, pool_type: str):
+        self.stroke = stroke
+        self.distance = distance
+        self.pool_type = pool_type
+        self.races = 0
+        self.best_seconds = None
+        self.best_record = None
+        self.first_seconds = None
+        self.recent_seconds = []  # Last three timed swims, oldest first
+        self.improvement_dates = []  # Dates on which the PB was lowered
+        self.seasons = set()
+        self.season_bests = {}
+    
+    def add(self, record, seconds: Optional[float], season: Optional[str]):
+        self.races += 1
+        if season:
+            self.seasons.add(season)
+        if seconds is None:
+            return
+        
+        if self.best_seconds is None:
+            self.first_seconds = seconds
+            self.best_seconds = seconds
+            self.best_record = record
+        elif seconds < self.best_seconds:
+            self.best_seconds = seconds
+            self.best_record = record
+            self.improvement_dates.append(record.meet_date)
+        
+        self.recent_seconds.append(seconds)
+        if len(self.recent_seconds) > 3:
+            del self.recent_seconds[0]
+        
+        if season and (season not in self.season_bests or seconds < self.season_bests[season]):
+            self.season_bests[season] = seconds
+    
+    def improvement(self) -> Dict[str, Any]:
+        """Improvement figures in seconds (positive = faster)"""
+        recent = self.recent_seconds
+        if len(recent) < 2:
+            return {
+                "recent_improvement": 0,
+                "season_improvement": 0,
+                "all_time_improvement": 0,
+                "trend": "stable"
+            }
+        
+        latest_time = recent[-1]
+        recent_improvement = recent[-2] - latest_time
+        all_time_improvement = self.first_seconds - latest_time
+        
+        if len(recent) == 3:
+            if recent[0] > recent[1] > recent[2]:
+                trend = "improving"
+            elif recent[0] < recent[1] < recent[2]:
+                trend = "declining"
+            else:
+                trend = "stable"
+        else:
+            trend = "improving" if recent_improvement > 0 else "stable"
+        
+        # Change between the latest two seasons' bests
+        season_improvement = 0
+        if len(self.season_bests) >= 2:
+            previous_season, current_season = sorted(self.season_bests)[-2:]
+            season_improvement = self.season_bests[previous_season] - self.season_bests[current_season]
+        
+        return {
+            "recent_improvement": round(recent_improvement, 2),
+            "season_improvement": round(season_improvement, 2),
+            "all_time_improvement": round(all_time_improvement, 2),
+            "trend": trend
+        }
+
+def _format_best(record, seconds: float, equivalent_seconds: float, include_round: bool) -> Dict[str, Any]:
+    pool_type = _value(record.pool_type)
+    best = {
+        "time": record.time,
+        "time_seconds": seconds,
+        "pool_type": pool_type,
+        "equivalent_pool_type": other_pool(pool_type),
+        "equivalent_time_seconds": round(equivalent_seconds, 2),
+        "date": record.meet_date.isoformat() if record.meet_date else None,
+        "meet_name": record.meet_name or "Unknown Meet",
+        "venue": record.venue or "Unknown Venue",
+        "wa_points": record.wa_points or 0
+    }
+    if include_round:
+        best["round_type"] = _value(record.round_type)
+    return best
+
+def _sort_key(record):
+    return (record.meet_date, getattr(record, 'id', None) or 0)
+
+def analyze_records(records) -> Dict[str, Any]:
+    """Compute stats, personal best cards and season bests in one pass.
+    
+    Records are visited once in date order (ties broken by record id); all
+    per-event work is constant time per record, so the cost is linear in the
+    history length apart from the initial sort, which is itself linear for the
+    newest-first lists returned by the database. Times come from the stored
+    ``time_seconds`` only, as in the SQL aggregates behind ``/complete``, so
+    untimed swims (DQ/NT) count as races but never as personal bests.
+    """
+    dated = sorted((r for r in records if r.meet_date), key=_sort_key)
+    if not dated:
+        return {"stats": empty_stats(), "personal_best_cards": [], "events": []}
+    
+    stroke_counts: Dict[str, int] = {}
+    distance_counts: Dict[int, int] = {}
+    wa_total = 0
+    wa_count = 0
+    seasons = set()
+    years = set()
+    events: Dict[tuple, EventSummary] = {}
+    
+    for record in dated:
+        stroke = _value(record.stroke)
+        pool_type = _value(record.pool_type)
+        seconds = record.time_seconds
+        season = record.season or season_for_date(record.meet_date)
+        
+        stroke_counts[stroke] = stroke_counts.get(stroke, 0) + 1
+        distance_counts[record.distance] = distance_counts.get(record.distance, 0) + 1
+        if record.wa_points and record.wa_points > 0:
+            wa_total += record.wa_points
+            wa_count += 1
+        if record.season:
+            seasons.add(record.season)
+        years.add(record.meet_date.year)
+        
+        key = (stroke, record.distance, pool_type)
+        summary = events.get(key)
+        if summary is None:
+            summary = events[key] = EventSummary(stroke, record.distance, pool_type)
+        summary.add(record, seconds, season)
+    
+    first_race = dated[0].meet_date
+    last_race = dated[-1].meet_date
+    recent_cutoff = last_race - timedelta(days=RECENT_IMPROVEMENT_DAYS)
+    
+    stats = {
+        "totalRaces": len(dated),
+        "personalBests": sum(1 for e in events.values() if e.best_record is not None),
+        "averageWAPoints": int(wa_total / wa_count) if wa_count else 0,
+        "mostCommonStroke": max(stroke_counts, key=stroke_counts.get),
+        "mostCommonDistance": max(distance_counts, key=distance_counts.get),
+        "currentSeason": max(seasons) if seasons else "2024-25",
+        "seasonsCompeted": sorted(seasons, reverse=True),
+        "recentImprovements": sum(
+            1 for e in events.values() for d in e.improvement_dates if d >= recent_cutoff
+        ),
+        "competitionSpan": {
+            "firstRace": first_race.isoformat(),
+            "lastRace": last_race.isoformat(),
+            "yearsActive": len(years)
+        }
+    }
+    
+    return {
+        "stats": stats,
+        "personal_best_cards": _build_cards(events),
+        "events": list(events.values())
+    }
+
+def _build_cards(events: Dict[tuple, EventSummary]) -> List[Dict[str, Any]]:
+    """Pair LC and SC summaries into one card per (stroke, distance).
+    
+    The primary best is the faster swim once both are converted to long
+    course, so an SC time is not preferred just for being in the faster pool.
+    """
+    by_event: Dict[tuple, List[EventSummary]] = {}
+    for summary in events.values():
+        by_event.setdefault((summary.stroke, summary.distance), []).append(summary)
+    
+    timed_summaries = [s for s in events.values() if s.best_record is not None]
+    columns = (
+        [s.best_seconds for s in timed_summaries],
+        [s.stroke for s in timed_summaries],
+        [s.distance for s in timed_summaries],
+        [s.pool_type for s in timed_summaries]
+    )
+    lc_times = convert_times(*columns, "LC")
+    sc_times = convert_times(*columns, "SC")
+    lc_equivalent = {}
+    other_equivalent = {}
+    for i, summary in enumerate(timed_summaries):
+        lc_equivalent[id(summary)] = float(lc_times[i])
+        other_equivalent[id(summary)] = float(lc_times[i] if summary.pool_type == "SC" else sc_times[i])
+    
+    cards = []
+    for (stroke, distance), summaries in by_event.items():
+        timed = sorted(
+            (s for s in summaries if s.best_record is not None),
+            key=lambda s: (lc_equivalent[id(s)], s.pool_type)
+        )
+        if not timed:
+            continue
+        
+        primary = timed[0]
+        secondary = timed[1] if len(timed) > 1 else None
+        stroke_info = get_stroke_info(stroke)
+        seasons_competed = set()
+        for summary in summaries:
+            seasons_competed.update(summary.seasons)
+        
+        cards.append({
+            "event_name": f"{distance} {stroke}",
+            "stroke": stroke,
+            "distance": distance,
+            "stroke_color": stroke_info["color"],
+            "stroke_icon": stroke_info["icon"],
+            "primary_best": _format_best(
+                primary.best_record, primary.best_seconds, other_equivalent[id(primary)], include_round=True
+            ),
+            "secondary_best": _format_best(
+                secondary.best_record, secondary.best_seconds, other_equivalent[id(secondary)], include_round=False
+            ) if secondary else None,
+            "improvement": primary.improvement(),
+            "season_bests": dict(sorted(primary.season_bests.items(), reverse=True)),
+            "total_races": sum(s.races for s in summaries),
+            "seasons_competed": sorted(seasons_competed, reverse=True)
+        })
+    
+    cards.sort(key=lambda card: (STROKE_ORDER.get(card["stroke"], 6), card["distance"]))
+    return cards
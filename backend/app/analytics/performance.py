@@ -0,0 +1,148 @@
+"""Vectorized per-event performance analysis.
+
+Works on columnar arrays pulled straight from ``swim_records`` (see
+``SwimmerDatabase.get_record_columns``). Rows arrive ordered by swimmer,
+event, pool type and date, so every per-event aggregate is a segmented
+NumPy reduction over contiguous slices; there is no Python loop per record.
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+import logging
+
+import numpy as np
+
+from app.analytics.conversion import convert_times
+
+logger = logging.getLogger(__name__)
+
+# Residual coefficient of variation at which consistency reaches 0
+CONSISTENCY_CV_FLOOR = 0.10
+
+DAYS_PER_YEAR = 365.25
+
+# Julian day number of the Unix epoch, used to turn julianday() back into dates
+UNIX_EPOCH_JULIAN_DAY = 2440587.5
+
+def julian_day_to_datetime(julian_day: float) -> datetime:
+    """Convert a SQLite julianday() value to a naive datetime"""
+    return datetime(1970, 1, 1) + timedelta(days=float(julian_day) - UNIX_EPOCH_JULIAN_DAY)
+
+def segment_starts(*keys: np.ndarray) -> np.ndarray:
+    """Indices where any of the (pre-sorted) key columns changes value"""
+    changed = np.zeros(len(keys[0]), dtype=bool)
+    changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    return np.flatnonzero(changed)
+
+def segmented_running_min(values: np.ndarray, group_ids: np.ndarray) -> np.ndarray:
+    """Running minimum that restarts at every group boundary.
+    
+    Each group is shifted below all earlier groups so a single
+    ``np.minimum.accumulate`` never carries a minimum across a boundary.
+    """
+    span = float(values.max() - values.min()) + 1.0
+    offsets = group_ids * span
+    return np.minimum.accumulate(values - offsets) + offsets
+
+def analyze_columns(rows: Sequence[tuple]) -> List[Dict[str, Any]]:
+    """Analyse every (tiref, stroke, distance, pool type) event in ``rows``.
+    
+    ``rows`` are ``(tiref, stroke, distance, pool_type, time_seconds,
+    julian_day, season)`` tuples sorted by the first four columns and date.
+    Returns one dict per event with the regression trend (seconds per year,
+    positive = getting faster), a detrended consistency score (0-100),
+    the PB progression and season-over-season bests.
+    """
+    if not rows:
+        return []
+    
+    tirefs, strokes, distances, pools, times, days, seasons = (np.asarray(c) for c in zip(*rows))
+    times = times.astype(float)
+    days = days.astype(float)
+    seasons = np.array([s or "" for s in seasons])
+    
+    starts = segment_starts(tirefs, strokes, distances, pools)
+    group_ids = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(times))))
+    counts = np.bincount(group_ids).astype(float)
+    
+    # Least-squares slope of time vs date per event, with dates centred per
+    # event for numerical stability
+    x = days - days[starts][group_ids]
+    sum_x = np.add.reduceat(x, starts)
+    sum_y = np.add.reduceat(times, starts)
+    mean_x = sum_x / counts
+    mean_y = sum_y / counts
+    sxx = np.add.reduceat(x * x, starts) - counts * mean_x ** 2
+    sxy = np.add.reduceat(x * times, starts) - counts * mean_x * mean_y
+    syy = np.add.reduceat(times * times, starts) - counts * mean_y ** 2
+    
+    has_spread = sxx > 1e-9
+    slope = np.where(has_spread, sxy / np.where(has_spread, sxx, 1.0), 0.0)
+    
+    # Consistency from the dispersion of residuals around the trend line
+    sse = np.clip(syy - slope * sxy, 0.0, None)
+    residual_cv = np.sqrt(sse / counts) / mean_y
+    consistency = np.clip(100.0 * (1.0 - residual_cv / CONSISTENCY_CV_FLOOR), 0.0, 100.0)
+    
+    best = np.minimum.reduceat(times, starts)
+    
+    # Each event's best as an equivalent time in the other pool type
+    best_pools = pools[starts].astype(str)
+    equivalent_pools = np.where(best_pools == "SC", "LC", "SC")
+    best_lc = convert_times(best, strokes[starts], distances[starts], best_pools, "LC")
+    best_sc = convert_times(best, strokes[starts], distances[starts], best_pools, "SC")
+    best_equivalent = np.where(best_pools == "SC", best_lc, best_sc)
+    
+    latest = times[np.append(starts[1:], len(times)) - 1]
+    
+    # PB progression: swims that lowered the running best within their event
+    running_best = segmented_running_min(times, group_ids)
+    is_new_best = np.ones(len(times), dtype=bool)
+    is_new_best[1:] = running_best[1:] < running_best[:-1]
+    is_new_best[starts] = True
+    
+    # Season bests: (event, season) runs are contiguous because rows are date ordered
+    season_starts = segment_starts(group_ids, seasons)
+    season_best = np.minimum.reduceat(times, season_starts)
+    season_races = np.diff(np.append(season_starts, len(times)))
+    season_group = group_ids[season_starts]
+    season_delta = np.full(len(season_starts), np.nan)
+    same_event = season_group[1:] == season_group[:-1]
+    season_delta[1:][same_event] = (season_best[:-1] - season_best[1:])[same_event]
+    
+    progression_index = np.flatnonzero(is_new_best)
+    progression_group = group_ids[progression_index]
+    
+    results = []
+    for g, start in enumerate(starts):
+        p_lo, p_hi = np.searchsorted(progression_group, [g, g + 1])
+        s_lo, s_hi = np.searchsorted(season_group, [g, g + 1])
+        results.append({
+            "tiref": str(tirefs[start]),
+            "stroke": str(strokes[start]),
+            "distance": int(distances[start]),
+            "pool_type": str(pools[start]),
+            "races": int(counts[g]),
+            "improvement_trend": round(float(-slope[g] * DAYS_PER_YEAR), 3),
+            "consistency_score": round(float(consistency[g]), 1),
+            "best_time_seconds": round(float(best[g]), 2),
+            "equivalent_pool_type": str(equivalent_pools[g]),
+            "best_time_equivalent_seconds": round(float(best_equivalent[g]), 2),
+            "latest_time_seconds": round(float(latest[g]), 2),
+            "rolling_bests": [
+                {"date": julian_day_to_datetime(days[i]), "time_seconds": round(float(times[i]), 2)}
+                for i in progression_index[p_lo:p_hi]
+            ],
+            "season_bests": [
+                {
+                    "season": str(seasons[season_starts[k]]) or None,
+                    "best_time_seconds": round(float(season_best[k]), 2),
+                    "races": int(season_races[k]),
+                    "delta_seconds": None if np.isnan(season_delta[k]) else round(float(season_delta[k]), 2)
+                }
+                for k in range(s_lo, s_hi)
+            ]
+        })
+    
+    return results
@@ -0,0 +1,83 @@
+"""World Aquatics points from base-time tables.
+
+Points follow the official formula ``1000 * (B / T) ** 3``, truncated to an
+integer, where B is the base time for the swimmer's gender, pool type and
+event. The base times are read from ``app/data/base_times.csv`` once at
+import into a dense (gender, pool type, stroke, distance) grid, so scoring
+an array of swims is a single vectorized lookup and power. There is no
+default gender: swims of a swimmer whose gender is unknown score 0.
+"""
+from pathlib import Path
+from typing import Optional
+import csv
+import logging
+
+import numpy as np
+
+from app.analytics.conversion import ArrayLike, lookup_codes
+
+logger = logging.getLogger(__name__)
+
+# Base time table shipped with the app
+BASE_TIMES_PATH = Path(__file__).resolve().parent.parent / "data" / "base_times.csv"
+
+class BaseTimeTable:
+    """Base times indexed by gender, pool type, stroke and distance"""
+    
+    def __init__(self, path: Path = BASE_TIMES_PATH):
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        
+        self.genders = {g: i for i, g in enumerate(sorted({r["gender"] for r in rows}))}
+        self.pools = {p: i for i, p in enumerate(sorted({r["pool_type"] for r in rows}))}
+        self.strokes = {s: i for i, s in enumerate(sorted({r["stroke"] for r in rows}))}
+        self.distances = {d: i for i, d in enumerate(sorted({int(r["distance"]) for r in rows}))}
+        
+        # The extra last slot on every axis holds NaN for unknown values
+        self.grid = np.full(
+            (len(self.genders) + 1, len(self.pools) + 1, len(self.strokes) + 1, len(self.distances) + 1),
+            np.nan
+        )
+        for r in rows:
+            self.grid[
+                self.genders[r["gender"]], self.pools[r["pool_type"]],
+                self.strokes[r["stroke"]], self.distances[int(r["distance"])]
+            ] = float(r["base_time_seconds"])
+        logger.info(f"Loaded {len(rows)} base times from {path}")
+    
+    def base_times(self, strokes: ArrayLike, distances: ArrayLike, pool_types: ArrayLike,
+                   genders: ArrayLike) -> np.ndarray:
+        """Base times for broadcastable event columns (NaN where there is none or the gender is unknown)"""
+        strokes, distances, pool_types, genders = np.broadcast_arrays(
+            np.asarray(strokes, dtype=str),
+            np.asarray(distances, dtype=int),
+            np.asarray(pool_types, dtype=str),
+            np.asarray(genders, dtype=str)
+        )
+        if strokes.size == 0:
+            return np.empty(strokes.shape)
+        return self.grid[
+            lookup_codes(genders.ravel(), self.genders, len(self.genders)),
+            lookup_codes(pool_types.ravel(), self.pools, len(self.pools)),
+            lookup_codes(strokes.ravel(), self.strokes, len(self.strokes)),
+            lookup_codes(distances.ravel(), self.distances, len(self.distances))
+        ].reshape(strokes.shape)
+    
+    def points(self, times: ArrayLike, strokes: ArrayLike, distances: ArrayLike, pool_types: ArrayLike,
+               genders: ArrayLike) -> np.ndarray:
+        """WA points for arrays of swims; 0 where the time, gender or base time is missing"""
+        times = np.asarray(times, dtype=float)
+        base = self.base_times(strokes, distances, pool_types, genders)
+        valid = np.isfinite(base) & np.isfinite(times) & (times > 0)
+        ratio = np.divide(base, times, out=np.zeros(np.broadcast(base, times).shape), where=valid)
+        return np.floor(1000.0 * ratio ** 3).astype(int)
+
+# Loaded once and shared by the scraper, ingest and backfill
+points_table = BaseTimeTable()
+
+def calculate_points(time_seconds: Optional[float], stroke: str, distance: int, pool_type: str,
+                     gender: Optional[str] = None) -> int:
+    """WA points for a single swim (0 if it cannot be scored, including when the gender is unknown)"""
+    if not time_seconds or not gender:
+        return 0
+    return int(points_table.points(time_seconds, stroke, distance, pool_type, gender))
@@ -0,0 +1,213 @@
+"""Race time predictions fitted from stored swims.
+
+Two models are fitted per swimmer, vectorized across every event (and
+across every swimmer when a whole club is passed in):
+
+* A Riegel-style distance model, ``T = T_ref * (D / D_ref) ** k``, with the
+  exponent k fitted per (swimmer, stroke, pool type) by least squares of
+  log best time against log distance. It predicts untried distances.
+* A recency-weighted linear trend per event (exponential weights with a
+  half-life of ``TREND_HALF_LIFE_DAYS``), which predicts times at upcoming
+  meet dates with an interval from the weighted residual spread.
+"""
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+import numpy as np
+
+from app.database.database import db
+from app.analytics.cache import VersionedCache
+from app.analytics.performance import DAYS_PER_YEAR, UNIX_EPOCH_JULIAN_DAY, julian_day_to_datetime, segment_starts
+
+logger = logging.getLogger(__name__)
+
+# Exponent used when a stroke has been swum at a single distance
+DEFAULT_RIEGEL_EXPONENT = 1.12
+RIEGEL_EXPONENT_RANGE = (1.0, 1.3)
+
+# Recent swims count double compared with swims this many days older
+TREND_HALF_LIFE_DAYS = 180
+
+# Largest yearly change the trend may extrapolate, as a fraction of the event's typical time
+MAX_TREND_FRACTION_PER_YEAR = 0.08
+
+# Distances offered for prediction per stroke
+STANDARD_DISTANCES = {
+    "Freestyle": [50, 100, 200, 400, 800, 1500],
+    "Backstroke": [50, 100, 200],
+    "Breaststroke": [50, 100, 200],
+    "Butterfly": [50, 100, 200],
+    "Individual Medley": [100, 200, 400]
+}
+
+# Days ahead predicted when no meet dates are given
+DEFAULT_HORIZON_DAYS = (30, 90, 180)
+
+# Swimmer predictions keyed on the swimmer's data version
+prediction_cache = VersionedCache("predictions", maxsize=512)
+
+# Club predictions keyed on the global data version; swimmer edits and
+# deletes do not bump it, so the change listener also clears this cache
+club_prediction_cache = VersionedCache("club_predictions", maxsize=64)
+db.add_change_listener(lambda tiref: club_prediction_cache.clear())
+
+def target_dates(dates: Optional[str] = None) -> List[date]:
+    """Parse comma-separated ISO meet dates, defaulting to fixed horizons from today"""
+    if not dates:
+        today = date.today()
+        return [today + timedelta(days=d) for d in DEFAULT_HORIZON_DAYS]
+    return sorted(date.fromisoformat(d.strip()) for d in dates.split(",") if d.strip())
+
+def to_julian_days(dates: Sequence[date]) -> List[float]:
+    return [(d - date(1970, 1, 1)).days + UNIX_EPOCH_JULIAN_DAY for d in dates]
+
+def format_seconds(seconds: float) -> str:
+    minutes, rest = divmod(round(seconds, 2), 60)
+    return f"{int(minutes)}:{rest:05.2f}" if minutes else f"{rest:.2f}"
+
+def _label(score: float) -> str:
+    return "high" if score >= 0.7 else "medium" if score >= 0.4 else "low"
+
+def _segment_sums(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    return np.add.reduceat(values, starts)
+
+def predict(rows: Sequence[tuple], target_days: Sequence[float]) -> Dict[str, Dict[str, Any]]:
+    """Fit both models for every swimmer in ``rows`` and predict.
+    
+    ``rows`` come from ``SwimmerDatabase.get_record_columns``;
+    ``target_days`` are julian days of upcoming meets. Returns per-tiref
+    ``models``, ``untried`` and ``upcoming`` lists.
+    """
+    if not rows:
+        return {}
+    
+    tirefs, strokes, distances, pools, times, days, _ = (np.asarray(c) for c in zip(*rows))
+    times = times.astype(float)
+    days = days.astype(float)
+    distances = distances.astype(int)
+    targets = np.asarray(target_days, dtype=float)
+    
+    # Events: contiguous (tiref, stroke, distance, pool) runs in date order
+    starts = segment_starts(tirefs, strokes, distances, pools)
+    ends = np.append(starts[1:], len(times))
+    group = np.repeat(np.arange(len(starts)), ends - starts)
+    
+    # Recency-weighted least squares of time against date, per event
+    last_day = days[ends - 1]
+    x = days - last_day[group]
+    w = 0.5 ** (-x / TREND_HALF_LIFE_DAYS)
+    sw = _segment_sums(w, starts)
+    sw2 = _segment_sums(w * w, starts)
+    mean_x = _segment_sums(w * x, starts) / sw
+    mean_y = _segment_sums(w * times, starts) / sw
+    dx = x - mean_x[group]
+    dy = times - mean_y[group]
+    sxx = _segment_sums(w * dx * dx, starts)
+    sxy = _segment_sums(w * dx * dy, starts)
+    has_spread = sxx > 1e-9
+    slope = np.where(has_spread, sxy / np.where(has_spread, sxx, 1.0), 0.0)
+    max_slope = MAX_TREND_FRACTION_PER_YEAR * mean_y / DAYS_PER_YEAR
+    slope = np.clip(slope, -max_slope, max_slope)
+    residual = dy - slope[group] * dx
+    sigma = np.sqrt(_segment_sums(w * residual * residual, starts) / sw)
+    effective_n = sw * sw / sw2
+    best = np.minimum.reduceat(times, starts)
+    
+    # Predicted time at each (event, target date); never faster than 90% of the PB
+    horizon = targets[None, :] - last_day[:, None]
+    predicted = mean_y[:, None] + slope[:, None] * (horizon - mean_x[:, None])
+    predicted = np.maximum(predicted, 0.9 * best[:, None])
+    # Interval widens with fewer effective swims and with distance into the future
+    spread = 1.96 * np.maximum(sigma, 0.005 * mean_y)[:, None] * np.sqrt(
+        1 + 1 / effective_n[:, None] + (horizon / DAYS_PER_YEAR) ** 2
+    )
+    trend_confidence = np.clip(
+        (1 - np.exp(-effective_n / 3)) * (1 - np.minimum(sigma / mean_y, 0.05) / 0.05 * 0.5), 0.0, 1.0
+    )
+    # Confidence in each dated prediction also decays with the time since the last swim
+    target_confidence = trend_confidence[:, None] * np.exp(-np.maximum(horizon, 0) / DAYS_PER_YEAR)
+    
+    # Riegel exponent per (tiref, stroke, pool): regress log best on log distance
+    g_tirefs, g_strokes, g_distances, g_pools = tirefs[starts], strokes[starts], distances[starts], pools[starts]
+    order = np.lexsort((g_distances, g_pools, g_strokes, g_tirefs))
+    m_starts = segment_starts(g_tirefs[order], g_strokes[order], g_pools[order])
+    m_counts = np.diff(np.append(m_starts, len(order)))
+    model = np.repeat(np.arange(len(m_starts)), m_counts)
+    log_d = np.log(g_distances[order].astype(float))
+    log_t = np.log(best[order])
+    mean_ld = _segment_sums(log_d, m_starts) / m_counts
+    mean_lt = _segment_sums(log_t, m_starts) / m_counts
+    d_ld = log_d - mean_ld[model]
+    s_dd = _segment_sums(d_ld * d_ld, m_starts)
+    s_dt = _segment_sums(d_ld * (log_t - mean_lt[model]), m_starts)
+    fitted = (m_counts >= 2) & (s_dd > 1e-9)
+    exponent = np.where(fitted, s_dt / np.where(fitted, s_dd, 1.0), DEFAULT_RIEGEL_EXPONENT)
+    exponent = np.clip(exponent, *RIEGEL_EXPONENT_RANGE)
+    log_residual = log_t - (mean_lt[model] + exponent[model] * d_ld)
+    fit_error = np.sqrt(_segment_sums(log_residual ** 2, m_starts) / np.maximum(m_counts - 2, 1))
+    fit_error = np.where(m_counts >= 3, fit_error, 0.02)
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    for g in range(len(starts)):
+        entry = results.setdefault(str(tirefs[starts[g]]), {"models": [], "untried": [], "upcoming": []})
+        entry["upcoming"].append({
+            "event": f"{g_distances[g]} {g_strokes[g]}",
+            "stroke": str(g_strokes[g]),
+            "distance": int(g_distances[g]),
+            "pool_type": str(g_pools[g]),
+            "races": int(ends[g] - starts[g]),
+            "best_time_seconds": round(float(best[g]), 2),
+            "trend_seconds_per_year": round(float(-slope[g] * DAYS_PER_YEAR), 3),
+            "confidence": _label(trend_confidence[g]),
+            "confidence_score": round(float(trend_confidence[g]), 2),
+            "predictions": [
+                {
+                    "date": julian_day_to_datetime(targets[t]).date().isoformat(),
+                    "predicted_time_seconds": round(float(predicted[g, t]), 2),
+                    "predicted_time": format_seconds(float(predicted[g, t])),
+                    "low_seconds": round(float(predicted[g, t] - spread[g, t]), 2),
+                    "high_seconds": round(float(predicted[g, t] + spread[g, t]), 2),
+                    "confidence": _label(target_confidence[g, t]),
+                    "confidence_score": round(float(target_confidence[g, t]), 2)
+                }
+                for t in range(len(targets))
+            ]
+        })
+    
+    for m, start in enumerate(m_starts.tolist()):
+        members = order[start:start + m_counts[m]]
+        tiref, stroke, pool_type = str(g_tirefs[members[0]]), str(g_strokes[members[0]]), str(g_pools[members[0]])
+        entry = results[tiref]
+        entry["models"].append({
+            "stroke": stroke,
+            "pool_type": pool_type,
+            "riegel_exponent": round(float(exponent[m]), 3),
+            "fitted": bool(fitted[m]),
+            "distances_used": g_distances[members].tolist()
+        })
+        
+        tried = g_distances[members]
+        candidates = np.array([d for d in STANDARD_DISTANCES.get(stroke, []) if d not in tried], dtype=float)
+        if not len(candidates):
+            continue
+        # Scale from the tried distance nearest in log space
+        nearest = np.abs(np.log(candidates)[:, None] - np.log(tried.astype(float))[None, :]).argmin(axis=1)
+        reference = members[nearest]
+        ratio = candidates / g_distances[reference]
+        estimate = best[reference] * ratio ** exponent[m]
+        relative_error = fit_error[m] + 0.02 * np.abs(np.log2(ratio)) * (1.0 if fitted[m] else 2.0)
+        score = np.clip(1 - relative_error / 0.1, 0.0, 1.0)
+        for i in range(len(candidates)):
+            entry["untried"].append({
+                "event": f"{int(candidates[i])} {stroke}",
+                "stroke": stroke,
+                "distance": int(candidates[i]),
+                "pool_type": pool_type,
+                "predicted_time_seconds": round(float(estimate[i]), 2),
+                "predicted_time": format_seconds(float(estimate[i])),
+                "based_on": {"distance": int(g_distances[reference[i]]), "time_seconds": round(float(best[reference[i]]), 2)},
+                "confidence": _label(score[i]),
+                "confidence_score": round(float(score[i]), 2)
+            })
+    return results
@@ -0,0 +1,132 @@
+"""Chart-ready progression series for one event.
+
+A swimmer's races in an event are reduced to a bounded number of points
+with Largest-Triangle-Three-Buckets (LTTB) downsampling, which keeps the
+visual shape (peaks, dips, PB drops) of the full history. The PB step line
+comes from a running minimum and the rolling-best envelope from a sparse
+table of range minima, so both are array operations over the whole history.
+"""
+from typing import Any, Dict, List, Sequence
+import logging
+
+import numpy as np
+
+from app.analytics.cache import VersionedCache
+from app.analytics.performance import UNIX_EPOCH_JULIAN_DAY, segment_starts
+
+logger = logging.getLogger(__name__)
+
+# Trailing window for the rolling-best envelope
+ENVELOPE_DAYS = 365
+
+# Built progressions keyed by (tiref, stroke, distance, pool type, points)
+progression_cache = VersionedCache("progression", maxsize=512)
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the points LTTB keeps when reducing (x, y) to ``threshold`` points.
+    
+    The first and last points are always kept; the rest are split into
+    ``threshold - 2`` buckets and each bucket keeps the point forming the
+    largest triangle with the previously kept point and the next bucket's
+    centroid.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+    counts = ends - starts
+    centroid_x = np.add.reduceat(x[:n - 1], starts) / counts
+    centroid_y = np.add.reduceat(y[:n - 1], starts) / counts
+    next_x = np.append(centroid_x[1:], x[-1])
+    next_y = np.append(centroid_y[1:], y[-1])
+    
+    selected = np.empty(threshold, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = n - 1
+    anchor = 0
+    for k in range(len(starts)):
+        lo, hi = starts[k], ends[k]
+        area = np.abs(
+            (x[anchor] - next_x[k]) * (y[lo:hi] - y[anchor])
+            - (x[anchor] - x[lo:hi]) * (next_y[k] - y[anchor])
+        )
+        anchor = lo + int(np.argmax(area))
+        selected[k + 1] = anchor
+    return selected
+
+def trailing_min(days: np.ndarray, values: np.ndarray, window_days: float) -> np.ndarray:
+    """Minimum of ``values`` over the trailing ``window_days`` at every point.
+    
+    ``days`` must be sorted. Range minima come from a sparse table, so every
+    window is answered by two overlapping power-of-two blocks.
+    """
+    n = len(values)
+    if n == 0:
+        return values.copy()
+    lo = np.searchsorted(days, days - window_days, side="left")
+    hi = np.arange(n)
+    
+    table = [values]
+    while (1 << len(table)) <= n:
+        half = 1 << (len(table) - 1)
+        previous = table[-1]
+        table.append(np.minimum(previous[:-half], previous[half:]))
+    
+    level = np.floor(np.log2(hi - lo + 1)).astype(int)
+    result = np.empty(n)
+    for j in np.unique(level).tolist():
+        mask = level == j
+        block = table[j]
+        result[mask] = np.minimum(block[lo[mask]], block[hi[mask] - (1 << j) + 1])
+    return result
+
+def _dates(days: np.ndarray) -> List[str]:
+    seconds = np.round((days - UNIX_EPOCH_JULIAN_DAY) * 86400).astype("int64")
+    return np.datetime_as_string(seconds.astype("datetime64[s]"), unit="D").tolist()
+
+def _points(days: np.ndarray, times: np.ndarray) -> List[Dict[str, Any]]:
+    return [
+        {"date": date, "time_seconds": round(time_seconds, 2)}
+        for date, time_seconds in zip(_dates(days), times.tolist())
+    ]
+
+def build_progression(rows: Sequence[tuple], points: int, envelope_days: int = ENVELOPE_DAYS) -> List[Dict[str, Any]]:
+    """Downsampled series, PB steps and rolling-best envelope per pool type.
+    
+    ``rows`` come from ``SwimmerDatabase.get_record_columns`` for a single
+    swimmer and event. Each returned series has at most ``points`` points.
+    """
+    if not rows:
+        return []
+    
+    _, _, _, pools, times, days, _ = (np.asarray(c) for c in zip(*rows))
+    times = times.astype(float)
+    days = days.astype(float)
+    bounds = np.append(segment_starts(pools), len(times))
+    
+    courses = []
+    for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        pool_days = days[lo:hi]
+        pool_times = times[lo:hi]
+        
+        kept = lttb(pool_days, pool_times, points)
+        
+        running_best = np.minimum.accumulate(pool_times)
+        is_step = np.ones(len(pool_times), dtype=bool)
+        is_step[1:] = running_best[1:] < running_best[:-1]
+        steps = np.flatnonzero(is_step)
+        steps = steps[lttb(pool_days[steps], pool_times[steps], points)]
+        
+        envelope = trailing_min(pool_days, pool_times, envelope_days)
+        
+        courses.append({
+            "pool_type": str(pools[lo]),
+            "total_races": hi - lo,
+            "best_time_seconds": round(float(running_best[-1]), 2),
+            "series": _points(pool_days[kept], pool_times[kept]),
+            "pb_steps": _points(pool_days[steps], pool_times[steps]),
+            "envelope": _points(pool_days[kept], envelope[kept])
+        })
+    return courses
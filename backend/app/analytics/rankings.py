@@ -0,0 +1,142 @@
+"""In-memory event leaderboards with bisect-based rank lookup.
+
+Best times are indexed per (stroke, distance, pool type, club, age group),
+where club and age group may also be ``ALL``. Each leaderboard is a sorted
+list of ``(time_seconds, tiref)`` tuples, so a rank is a binary search and
+an update is an insort. The index is built from ``personal_bests`` on first
+use and then refreshed one swimmer at a time through the database change
+listener, so writes never trigger a full rebuild.
+"""
+from bisect import bisect_left, insort
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+import threading
+
+from app.database.database import db
+from app.analytics.conversion import convert_times, other_pool
+
+logger = logging.getLogger(__name__)
+
+# Wildcard used for the club / age group dimensions
+ALL = "*"
+
+BoardKey = Tuple[str, int, str, str, str]
+
+def board_key(stroke: str, distance: int, pool_type: str, club: Optional[str] = None,
+              age_group: Optional[str] = None) -> BoardKey:
+    return (stroke, int(distance), pool_type, club or ALL, age_group or ALL)
+
+class RankingIndex:
+    """Sorted leaderboards for every event, club and age group"""
+    
+    def __init__(self):
+        self._boards: Dict[BoardKey, List[Tuple[float, str]]] = {}
+        self._entries: Dict[str, List[Tuple[BoardKey, Tuple[float, str]]]] = {}
+        self._swimmers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = db.get_ranking_entries()
+            for row in rows:
+                self._add_row(row)
+            for board in self._boards.values():
+                board.sort()
+            self._loaded = True
+            logger.info(f"Built rankings index from {len(rows)} personal bests across {len(self._boards)} leaderboards")
+    
+    def _add_row(self, row, keep_sorted: bool = False):
+        tiref = row['tiref']
+        swimmer = self._swimmers.setdefault(tiref, {
+            "name": row['name'],
+            "club": row['club'],
+            "age_group": row['age_group'],
+            "times": {}
+        })
+        swimmer["times"][(row['stroke'], int(row['distance']), row['pool_type'])] = row['best_time']
+        entry = (row['best_time_seconds'], tiref)
+        for club in {row['club'] or ALL, ALL}:
+            for age_group in {row['age_group'] or ALL, ALL}:
+                key = board_key(row['stroke'], row['distance'], row['pool_type'], club, age_group)
+                board = self._boards.setdefault(key, [])
+                if keep_sorted:
+                    insort(board, entry)
+                else:
+                    board.append(entry)
+                self._entries.setdefault(tiref, []).append((key, entry))
+    
+    def _remove_swimmer(self, tiref: str):
+        for key, entry in self._entries.pop(tiref, []):
+            board = self._boards.get(key)
+            if not board:
+                continue
+            position = bisect_left(board, entry)
+            if position < len(board) and board[position] == entry:
+                del board[position]
+        self._swimmers.pop(tiref, None)
+    
+    def refresh_swimmer(self, tiref: str):
+        """Re-index one swimmer's personal bests (change listener callback)"""
+        if not self._loaded:
+            return  # The first lookup builds the index from current data
+        rows = db.get_ranking_entries(tiref)
+        with self._lock:
+            self._remove_swimmer(tiref)
+            for row in rows:
+                self._add_row(row, keep_sorted=True)
+    
+    def rank(self, stroke: str, distance: int, pool_type: str, time_seconds: float,
+             club: Optional[str] = None, age_group: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Rank a time within a leaderboard (ties share the better rank)"""
+        self._ensure_loaded()
+        with self._lock:
+            board = self._boards.get(board_key(stroke, distance, pool_type, club, age_group))
+            if not board:
+                return None
+            rank = bisect_left(board, (time_seconds, "")) + 1
+            total = len(board)
+        return {
+            "rank": rank,
+            "total": total,
+            "percentile": round(100.0 * (total - rank + 1) / total, 1)
+        }
+    
+    def leaderboard(self, stroke: str, distance: int, pool_type: str, club: Optional[str] = None,
+                    age_group: Optional[str] = None, offset: int = 0, limit: int = 50) -> Tuple[int, List[Dict[str, Any]]]:
+        """Get a page of a leaderboard as (total, entries).
+        
+        Each entry also carries its time converted to the other pool type,
+        converted for the whole page in one array operation.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            board = self._boards.get(board_key(stroke, distance, pool_type, club, age_group), [])
+            total = len(board)
+            page = board[offset:offset + limit]
+            entries = []
+            for time_seconds, tiref in page:
+                swimmer = self._swimmers.get(tiref, {})
+                entries.append({
+                    "rank": bisect_left(board, (time_seconds, "")) + 1,
+                    "tiref": tiref,
+                    "name": swimmer.get("name"),
+                    "club": swimmer.get("club"),
+                    "age_group": swimmer.get("age_group"),
+                    "time": swimmer.get("times", {}).get((stroke, int(distance), pool_type)),
+                    "time_seconds": time_seconds
+                })
+        
+        equivalent_pool = other_pool(pool_type)
+        equivalents = convert_times([e["time_seconds"] for e in entries], stroke, distance, pool_type, equivalent_pool)
+        for entry, equivalent in zip(entries, equivalents.tolist()):
+            entry["equivalent_time_seconds"] = round(equivalent, 2)
+        return total, entries
+
+# Create a global rankings index kept in sync with personal best writes
+rankings = RankingIndex()
+db.add_change_listener(rankings.refresh_swimmer)
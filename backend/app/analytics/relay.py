@@ -0,0 +1,145 @@
+"""Relay lineup optimisation over stored personal bests.
+
+Finds the k fastest assignments of distinct swimmers to relay legs with an
+exact branch-and-bound search. Before searching, each leg keeps only its
+``k + legs - 1`` fastest candidates (plus any required swimmers): any
+lineup using a slower swimmer on a leg can be improved by swapping in one of
+those candidates not already used elsewhere, so at least k lineups at least
+as fast exist without it. The search space therefore depends on k, not on
+club size, and clubs with hundreds of swimmers stay fast.
+
+Mixed relays cap the legs per gender (two men and two women). The shortlist
+then keeps ``k + legs - 1`` candidates of each gender per leg, since a
+swapped-in swimmer must be of the same gender to keep the lineup valid.
+"""
+from heapq import heappush, heapreplace
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Leg order for a medley relay
+MEDLEY_LEGS = ["Backstroke", "Breaststroke", "Butterfly", "Freestyle"]
+FREESTYLE_LEGS = ["Freestyle"] * 4
+
+Candidate = Tuple[float, str]  # (time_seconds, tiref)
+
+# Legs each gender swims in a mixed relay
+MIXED_QUOTA = {"M": 2, "F": 2}
+
+def _shortlist(candidates: List[Candidate], keep: int, required: Set[str],
+               genders: Optional[Dict[str, str]] = None) -> List[Candidate]:
+    ordered = sorted(candidates)
+    kept_per_gender: Dict[Optional[str], int] = {}
+    kept = []
+    for c in ordered:
+        gender = genders.get(c[1]) if genders else None
+        if kept_per_gender.get(gender, 0) < keep or c[1] in required:
+            kept.append(c)
+            kept_per_gender[gender] = kept_per_gender.get(gender, 0) + 1
+    return kept
+
+def optimize_relay(legs: Sequence[Sequence[Candidate]], top_k: int = 5,
+                   required: Optional[Set[str]] = None, genders: Optional[Dict[str, str]] = None,
+                   quota: Optional[Dict[str, int]] = None) -> List[Tuple[float, List[Candidate]]]:
+    """Return up to ``top_k`` (total_time, [leg candidate, ...]) lineups, fastest first.
+    
+    ``legs`` holds the candidate times for each leg. Identical consecutive leg
+    lists (a freestyle relay) are treated as interchangeable so the same four
+    swimmers are not returned in every order. ``quota`` limits the legs per
+    gender, with each swimmer's gender looked up in ``genders``.
+    """
+    required = set(required or ())
+    leg_count = len(legs)
+    shortlists = [
+        _shortlist(list(c), top_k + leg_count - 1, required, genders if quota else None) for c in legs
+    ]
+    if any(not leg for leg in shortlists):
+        return []
+    
+    # Interchangeable legs must pick candidates in increasing shortlist order
+    symmetric = [i > 0 and legs[i] is legs[i - 1] for i in range(leg_count)]
+    
+    # Lower bound for the legs still to fill, ignoring distinctness
+    remaining_bound = [0.0] * (leg_count + 1)
+    for i in range(leg_count - 1, -1, -1):
+        remaining_bound[i] = remaining_bound[i + 1] + shortlists[i][0][0]
+    
+    best: List[Tuple[float, int, List[Candidate]]] = []  # Max-heap via negated totals
+    counter = 0
+    chosen: List[Candidate] = []
+    used: Set[str] = set()
+    positions: List[int] = []
+    filled: Dict[str, int] = {}
+    
+    def search(leg: int, total: float):
+        nonlocal counter
+        if len(best) == top_k and total + remaining_bound[leg] >= -best[0][0]:
+            return
+        missing = len(required - used)
+        if missing > leg_count - leg:
+            return
+        if leg == leg_count:
+            if missing:
+                return
+            counter += 1
+            entry = (-total, counter, list(chosen))
+            if len(best) < top_k:
+                heappush(best, entry)
+            else:
+                heapreplace(best, entry)
+            return
+        
+        start = positions[-1] + 1 if symmetric[leg] else 0
+        for index in range(start, len(shortlists[leg])):
+            time_seconds, tiref = shortlists[leg][index]
+            if len(best) == top_k and total + time_seconds + remaining_bound[leg + 1] >= -best[0][0]:
+                break  # Shortlists are sorted, so later candidates are no better
+            if tiref in used:
+                continue
+            gender = genders.get(tiref) if quota else None
+            if quota and filled.get(gender, 0) >= quota.get(gender, 0):
+                continue
+            chosen.append((time_seconds, tiref))
+            used.add(tiref)
+            positions.append(index)
+            if quota:
+                filled[gender] = filled.get(gender, 0) + 1
+            search(leg + 1, total + time_seconds)
+            if quota:
+                filled[gender] -= 1
+            positions.pop()
+            used.discard(tiref)
+            chosen.pop()
+    
+    search(0, 0.0)
+    return [(-total, lineup) for total, _, lineup in sorted(best, key=lambda e: (-e[0], e[1]))]
+
+def leg_strokes(relay_type: str) -> List[str]:
+    return MEDLEY_LEGS if relay_type == "medley" else FREESTYLE_LEGS
+
+def optimize_squads(candidates_by_stroke: Dict[str, List[Candidate]], relay_type: str, top_k: int = 5,
+                    squads: int = 1, required: Optional[Set[str]] = None,
+                    excluded: Optional[Set[str]] = None, genders: Optional[Dict[str, str]] = None,
+                    mixed: bool = False) -> List[List[Tuple[float, List[Candidate]]]]:
+    """Pick disjoint squads in priority order (A team first, then B, ...).
+    
+    Each squad's top-k lineups are searched after removing the swimmers in
+    the fastest lineup of every earlier squad. Required swimmers only
+    constrain the first squad. Mixed squads are two men and two women.
+    """
+    taken = set(excluded or ())
+    results = []
+    for squad in range(squads):
+        pools = {
+            stroke: [c for c in candidates if c[1] not in taken]
+            for stroke, candidates in candidates_by_stroke.items()
+        }
+        legs = [pools.get(stroke, []) for stroke in leg_strokes(relay_type)]
+        lineups = optimize_relay(legs, top_k, required if squad == 0 else None,
+                                 genders, MIXED_QUOTA if mixed else None)
+        if not lineups:
+            break
+        results.append(lineups)
+        taken.update(tiref for _, tiref in lineups[0][1])
+    return results
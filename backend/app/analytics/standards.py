@@ -0,0 +1,268 @@
+"""Qualifying standards evaluation.
+
+Qualifying-time tables are read from every CSV in ``app/data/standards/``
+(columns: meet, level, gender, age_min, age_max, pool_type, stroke,
+distance, time; blank ages mean an open band). Files named ``sample_*.csv``
+are illustrative tables derived from the WA points base times, not
+published qualifying times; every result carries its ``source`` file and a
+``sample`` flag so clients can say so. Standards are held as
+column arrays sorted by event, with an (stroke, distance, pool type) index
+of contiguous slices. Personal bests are matched to the standards for their
+event by expanding (best, standard) pairs with ``np.repeat``, and gender,
+age band and time checks are array masks, so a whole club is evaluated in
+one pass. Age is the age at 31 December this year from the swimmer's year
+of birth, or is read from the age group when the year is not recorded. A
+swimmer whose gender or age is unknown is shown every band, but no
+standard is marked achieved for them, and the club report counts them as
+not evaluated. Results are cached per swimmer and per club and dropped
+through the database change listener whenever personal bests change.
+"""
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import csv
+import logging
+import re
+import threading
+
+import numpy as np
+
+from app.database.database import db
+from app.analytics.engine import convert_time_to_seconds
+from app.monitoring.metrics import record_cache
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the qualifying-time tables
+STANDARDS_DIR = Path(__file__).resolve().parent.parent / "data" / "standards"
+
+# Order in which levels are reported
+LEVEL_ORDER = {"county": 1, "regional": 2, "national": 3}
+
+# File name prefix of the bundled illustrative (not published) tables
+SAMPLE_PREFIX = "sample_"
+
+EventKey = Tuple[str, int, str]
+
+def parse_age(age_group: Optional[str]) -> Optional[int]:
+    """Read a swimmer's age from an age group label such as '13' or '13-14'"""
+    if not age_group:
+        return None
+    match = re.search(r"\d+", str(age_group))
+    return int(match.group()) if match else None
+
+def swimmer_age(year_of_birth: Optional[int], age_group: Optional[str]) -> Optional[int]:
+    """Age at 31 December this year from the year of birth, else from the age group"""
+    if year_of_birth:
+        return date.today().year - int(year_of_birth)
+    return parse_age(age_group)
+
+def age_band_label(age_min: float, age_max: float) -> str:
+    if np.isinf(age_min) and np.isinf(age_max):
+        return "Open"
+    if np.isinf(age_min):
+        return f"{int(age_max)} & under"
+    if np.isinf(age_max):
+        return f"{int(age_min)} & over"
+    return f"{int(age_min)}-{int(age_max)}"
+
+class StandardsIndex:
+    """Qualifying times indexed by event, pool type, gender, age band and meet"""
+    
+    def __init__(self, directory: Path = STANDARDS_DIR):
+        self.directory = directory
+        self._events: Dict[EventKey, Tuple[int, int]] = {}
+        self._swimmer_cache: Dict[str, List[Dict[str, Any]]] = {}
+        self._club_cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+        self._loaded = False
+    
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            rows = []
+            for path in sorted(self.directory.glob("*.csv")):
+                with open(path, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        seconds = convert_time_to_seconds(row["time"])
+                        if seconds is None:
+                            logger.warning(f"Skipping standard with unreadable time {row['time']!r} in {path.name}")
+                            continue
+                        rows.append((
+                            row["stroke"], int(row["distance"]), row["pool_type"],
+                            LEVEL_ORDER.get(row["level"], len(LEVEL_ORDER) + 1), row["meet"], row["level"],
+                            row["gender"],
+                            float(row["age_min"]) if row["age_min"] else -np.inf,
+                            float(row["age_max"]) if row["age_max"] else np.inf,
+                            row["time"], seconds, path.name
+                        ))
+            rows.sort(key=lambda r: r[:5])
+            
+            columns = list(zip(*rows)) if rows else [()] * 12
+            self.meets = np.array(columns[4], dtype=object)
+            self.levels = np.array(columns[5], dtype=object)
+            self.genders = np.array(columns[6], dtype=str)
+            self.age_min = np.array(columns[7], dtype=float)
+            self.age_max = np.array(columns[8], dtype=float)
+            self.times = np.array(columns[9], dtype=object)
+            self.seconds = np.array(columns[10], dtype=float)
+            self.sources = np.array(columns[11], dtype=object)
+            
+            self._events = {}
+            for i, row in enumerate(rows):
+                start, _ = self._events.get(row[:3], (i, i))
+                self._events[row[:3]] = (start, i + 1)
+            self._loaded = True
+            logger.info(f"Loaded {len(rows)} qualifying standards for {len(self._events)} events from {self.directory}")
+    
+    @property
+    def has_samples(self) -> bool:
+        """Whether any loaded table is an illustrative sample rather than published times"""
+        self._ensure_loaded()
+        return any(source.startswith(SAMPLE_PREFIX) for source in self.sources)
+    
+    def evaluate(self, entries: Sequence, age: Optional[int] = None,
+                 gender: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Check personal best rows against every applicable standard.
+        
+        ``entries`` are rows with tiref, stroke, distance, pool_type,
+        best_time, best_time_seconds, gender, year_of_birth and age_group. ``age`` and
+        ``gender`` override the stored values. When either is unknown every
+        band is reported with ``achieved`` set to None and the missing
+        fields listed in ``unknown``. Returns results grouped by tiref.
+        """
+        self._ensure_loaded()
+        if not entries:
+            return {}
+        
+        slices = np.array([
+            self._events.get((e['stroke'], int(e['distance']), e['pool_type']), (0, 0)) for e in entries
+        ], dtype=np.intp).reshape(-1, 2)
+        counts = slices[:, 1] - slices[:, 0]
+        total = int(counts.sum())
+        if total == 0:
+            return {}
+        
+        # One (best, standard) pair for every standard in the best's event
+        best_index = np.repeat(np.arange(len(entries)), counts)
+        pair_offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        standard_index = np.repeat(slices[:, 0], counts) + pair_offsets
+        
+        best_seconds = np.array([e['best_time_seconds'] for e in entries], dtype=float)[best_index]
+        best_genders = np.array([gender or e['gender'] or "" for e in entries], dtype=str)[best_index]
+        best_ages = np.array([
+            age if age is not None else swimmer_age(e['year_of_birth'], e['age_group']) for e in entries
+        ], dtype=float)[best_index]
+        
+        standard_seconds = self.seconds[standard_index]
+        applicable = (
+            ((best_genders == "") | (best_genders == self.genders[standard_index]))
+            & (np.isnan(best_ages) | ((self.age_min[standard_index] <= best_ages) & (best_ages <= self.age_max[standard_index])))
+        )
+        margin = standard_seconds - best_seconds  # Positive = inside the standard
+        gender_unknown = best_genders == ""
+        age_unknown = np.isnan(best_ages)
+        
+        results: Dict[str, List[Dict[str, Any]]] = {}
+        for pair in np.flatnonzero(applicable).tolist():
+            entry = entries[best_index[pair]]
+            s = standard_index[pair]
+            unknown = [field for field, missing in (("gender", gender_unknown[pair]), ("age", age_unknown[pair])) if missing]
+            results.setdefault(entry['tiref'], []).append({
+                "meet": self.meets[s],
+                "level": self.levels[s],
+                "event": f"{entry['distance']} {entry['stroke']}",
+                "stroke": entry['stroke'],
+                "distance": int(entry['distance']),
+                "pool_type": entry['pool_type'],
+                "gender": str(self.genders[s]),
+                "age_band": age_band_label(self.age_min[s], self.age_max[s]),
+                "qualifying_time": self.times[s],
+                "qualifying_time_seconds": float(standard_seconds[pair]),
+                "best_time": entry['best_time'],
+                "best_time_seconds": entry['best_time_seconds'],
+                # The band is a guess when gender or age is unknown, so it cannot be claimed
+                "achieved": None if unknown else bool(margin[pair] >= 0),
+                "unknown": unknown,
+                "margin_seconds": round(float(margin[pair]), 2),
+                "source": self.sources[s],
+                "sample": self.sources[s].startswith(SAMPLE_PREFIX)
+            })
+        return results
+    
+    def for_swimmer(self, tiref: str) -> List[Dict[str, Any]]:
+        """Every applicable standard for a swimmer's stored PBs (cached)"""
+        with self._lock:
+            cached = self._swimmer_cache.get(tiref)
+        record_cache("qualifications", cached is not None)
+        if cached is not None:
+            return cached
+        result = self.evaluate(db.get_ranking_entries(tiref)).get(tiref, [])
+        with self._lock:
+            self._swimmer_cache[tiref] = result
+        return result
+    
+    def club_report(self, club: str) -> Dict[str, Any]:
+        """Achieved standards for every swimmer in a club, and who could not be evaluated (cached)"""
+        with self._lock:
+            cached = self._club_cache.get(club)
+        record_cache("club_qualifications", cached is not None)
+        if cached is not None:
+            return cached
+        
+        entries = db.get_ranking_entries(club=club)
+        results = self.evaluate(entries)
+        names = {e['tiref']: e['name'] for e in entries}
+        # Details missing per swimmer; their standards cannot be marked achieved
+        unknown = {
+            e['tiref']: [
+                field for field, missing in (
+                    ("gender", not e['gender']),
+                    ("age", swimmer_age(e['year_of_birth'], e['age_group']) is None)
+                ) if missing
+            ]
+            for e in entries
+        }
+        swimmers = []
+        qualified_by_meet: Dict[str, int] = {}
+        not_evaluated = {"total": 0, "by_reason": {"gender": 0, "age": 0}}
+        for tiref in sorted(names, key=lambda t: names[t] or ""):
+            achieved = [q for q in results.get(tiref, []) if q["achieved"]]
+            swimmers.append({
+                "tiref": tiref,
+                "name": names[tiref],
+                "evaluated": not unknown[tiref],
+                "unknown": unknown[tiref],
+                "qualifications": achieved
+            })
+            for meet in {q["meet"] for q in achieved}:
+                qualified_by_meet[meet] = qualified_by_meet.get(meet, 0) + 1
+            if unknown[tiref]:
+                not_evaluated["total"] += 1
+                for field in unknown[tiref]:
+                    not_evaluated["by_reason"][field] += 1
+        report = {
+            "club": club,
+            "total_swimmers": len(names),
+            "sample_standards": self.has_samples,
+            "not_evaluated": not_evaluated,
+            "qualified_by_meet": qualified_by_meet,
+            "swimmers": swimmers
+        }
+        
+        with self._lock:
+            self._club_cache[club] = report
+        return report
+    
+    def invalidate(self, tiref: str):
+        """Drop cached results after a swimmer's data changes (change listener callback)"""
+        with self._lock:
+            self._swimmer_cache.pop(tiref, None)
+            self._club_cache.clear()
+
+# Create a global standards index kept in sync with personal best writes
+standards = StandardsIndex()
+db.add_change_listener(standards.invalidate)
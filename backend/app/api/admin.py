@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from fastapi.responses import FileResponse
+from typing import Optional
+import logging
+
+from app.monitoring.profiling import profile_store, check_admin_token
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject requests without the configured admin token"""
+    if not check_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@router.get("/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """Stored request profiles, newest first"""
+    try:
+        profiles = profile_store.list()
+        return {"total": len(profiles), "max_files": profile_store.max_files, "profiles": profiles}
+    except Exception as e:
+        logger.error(f"Error listing profiles: {e}")
+        raise HTTPException(status_code=500, detail="Failed to list profiles")
+
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_admin)])
+async def get_profile(
+    profile_id: str,
+    sort: str = Query("cumulative", pattern="^(cumulative|tottime|calls)$", description="Column to rank functions by"),
+    limit: int = Query(30, ge=1, le=500, description="Number of functions to return")
+):
+    """Request details and hottest functions of a stored profile"""
+    try:
+        return {
+            **profile_store.metadata(profile_id),
+            "functions": profile_store.top_functions(profile_id, sort, limit)
+        }
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+    except Exception as e:
+        logger.error(f"Error reading profile {profile_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to read profile")
+
+@router.get("/profiles/{profile_id}/download", dependencies=[Depends(require_admin)])
+async def download_profile(profile_id: str):
+    """Raw pstats file, for snakeviz or ``python -m pstats``"""
+    try:
+        return FileResponse(
+            profile_store.path(profile_id),
+            media_type="application/octet-stream",
+            filename=f"{profile_id}.prof"
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
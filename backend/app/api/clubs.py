@@ -0,0 +1,202 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.models.schemas import PerformanceAnalysis, RelayOptimizerRequest, RelayType, RelayGender
+from app.database.database import db
+from app.analytics.performance import analyze_columns
+from app.analytics.relay import optimize_squads, leg_strokes, MIXED_QUOTA
+from app.analytics.standards import standards
+from app.analytics.predictions import predict, club_prediction_cache, target_dates, to_julian_days
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/{club}/analysis")
+async def get_club_analysis(club: str):
+    """Analyse every event for every swimmer in a club with one query and one vectorized pass"""
+    try:
+        analyses = analyze_columns(db.get_record_columns(club=club))
+        return {
+            "club": club,
+            "total_swimmers": len({a["tiref"] for a in analyses}),
+            "events": [PerformanceAnalysis(**a) for a in analyses]
+        }
+    except Exception as e:
+        logger.error(f"Error analysing club {club}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to analyse club performance")
+
+@router.get("/{club}/qualifications")
+async def get_club_qualifications(
+    club: str,
+    meet: Optional[str] = Query(None, description="Only report standards for this meet")
+):
+    """Get the qualifying standards achieved by every swimmer in a club"""
+    try:
+        report = standards.club_report(club)
+        if not meet:
+            return report
+        
+        swimmers = [
+            {**swimmer, "qualifications": [q for q in swimmer["qualifications"] if q["meet"] == meet]}
+            for swimmer in report["swimmers"]
+        ]
+        return {
+            **report,
+            "qualified_by_meet": {m: n for m, n in report["qualified_by_meet"].items() if m == meet},
+            "swimmers": [swimmer for swimmer in swimmers if swimmer["qualifications"] or not swimmer["evaluated"]]
+        }
+    except Exception as e:
+        logger.error(f"Error building qualifications report for club {club}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to build qualifications report")
+
+@router.get("/{club}/predictions")
+async def get_club_predictions(
+    club: str,
+    dates: Optional[str] = Query(None, description="Comma-separated upcoming meet dates (YYYY-MM-DD)")
+):
+    """Predict times for every swimmer in a club with one batched fit"""
+    try:
+        try:
+            targets = target_dates(dates)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be comma-separated YYYY-MM-DD values")
+        
+        predictions = club_prediction_cache.get_or_compute(
+            (club, tuple(targets)),
+            db.get_data_version(),
+            lambda: predict(db.get_record_columns(club=club), to_julian_days(targets))
+        )
+        
+        return {
+            "club": club,
+            "dates": [d.isoformat() for d in targets],
+            "total_swimmers": len(predictions),
+            "swimmers": [{"tiref": tiref, **result} for tiref, result in sorted(predictions.items())]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error predicting times for club {club}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to predict club times")
+
+# Leg distances accepted for each relay type
+RELAY_LEG_DISTANCES = {
+    RelayType.MEDLEY: [50, 100],
+    RelayType.FREESTYLE: [50, 100, 200]
+}
+
+@router.post("/{club}/relay-optimizer")
+async def optimize_club_relay(club: str, request: RelayOptimizerRequest):
+    """Find the fastest relay lineups for a club from stored personal bests"""
+    try:
+        if request.distance not in RELAY_LEG_DISTANCES[request.relay_type]:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{request.relay_type.value.title()} relay legs must be one of {RELAY_LEG_DISTANCES[request.relay_type]}m"
+            )
+        
+        conflicting = set(request.required) & set(request.excluded)
+        if conflicting:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Swimmers cannot be both required and excluded: {', '.join(sorted(conflicting))}"
+            )
+        leg_names = leg_strokes(request.relay_type.value)
+        if len(set(request.required)) > len(leg_names):
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {len(leg_names)} swimmers can be required in a relay, got {len(set(request.required))}"
+            )
+        
+        strokes = sorted(set(leg_names))
+        mixed = request.gender == RelayGender.MIXED
+        genders = ["M", "F"] if mixed else [request.gender.value]
+        rows = db.get_club_personal_bests(club, request.distance, request.pool_type.value, strokes, genders,
+                                          request.age_group)
+        unknown_gender = {row['tiref'] for row in rows if row['gender'] is None}
+        rows = [row for row in rows if row['gender'] is not None]
+        if not rows and unknown_gender:
+            raise HTTPException(
+                status_code=422,
+                detail=f"{len(unknown_gender)} swimmers in {club} have times for this relay but no recorded gender; "
+                       f"set it with PATCH /api/swimmers/{{tiref}}"
+            )
+        
+        candidates_by_stroke = {}
+        details = {}
+        for row in rows:
+            candidates_by_stroke.setdefault(row['stroke'], []).append((row['best_time_seconds'], row['tiref']))
+            details[(row['tiref'], row['stroke'])] = row
+        
+        unknown_required = set(request.required) & unknown_gender
+        if unknown_required:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Required swimmers have no recorded gender: {', '.join(sorted(unknown_required))}"
+            )
+        missing_required = set(request.required) - {row['tiref'] for row in rows}
+        if missing_required:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Required swimmers have no eligible times: {', '.join(sorted(missing_required))}"
+            )
+        if mixed:
+            required_genders = {row['tiref']: row['gender'] for row in rows if row['tiref'] in request.required}
+            for gender, legs in MIXED_QUOTA.items():
+                if sum(1 for g in required_genders.values() if g == gender) > legs:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"A mixed relay has {legs} legs per gender; more than {legs} required swimmers are {gender}"
+                    )
+        
+        squads = optimize_squads(
+            candidates_by_stroke,
+            request.relay_type.value,
+            top_k=request.top_k,
+            squads=request.squads,
+            required=set(request.required),
+            excluded=set(request.excluded),
+            genders={row['tiref']: row['gender'] for row in rows},
+            mixed=mixed
+        )
+        
+        return {
+            "club": club,
+            "relay_type": request.relay_type.value,
+            "gender": request.gender.value,
+            "event": f"4x{request.distance} {request.relay_type.value.title()} Relay",
+            "pool_type": request.pool_type.value,
+            "age_group": request.age_group,
+            "eligible_swimmers": len({row['tiref'] for row in rows}),
+            "unknown_gender_swimmers": len(unknown_gender),
+            "squads": [
+                {
+                    "squad": chr(ord("A") + index),
+                    "lineups": [
+                        {
+                            "total_time_seconds": round(total, 2),
+                            "legs": [
+                                {
+                                    "leg": position + 1,
+                                    "stroke": stroke,
+                                    "tiref": tiref,
+                                    "name": details[(tiref, stroke)]['name'],
+                                    "gender": details[(tiref, stroke)]['gender'],
+                                    "time": details[(tiref, stroke)]['best_time'],
+                                    "time_seconds": time_seconds
+                                }
+                                for position, (stroke, (time_seconds, tiref)) in enumerate(zip(leg_names, lineup))
+                            ]
+                        }
+                        for total, lineup in lineups
+                    ]
+                }
+                for index, lineups in enumerate(squads)
+            ]
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error optimizing relay for club {club}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to optimize relay")
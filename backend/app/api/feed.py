@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.models.schemas import ActivityEventType, FeedResponse
+from app.database.database import db
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("", response_model=FeedResponse)
+@router.get("/", response_model=FeedResponse, include_in_schema=False)
+async def get_feed(
+    after: int = Query(0, ge=0, description="Cursor returned by the previous page (0 for the beginning)"),
+    club: Optional[str] = Query(None, description="Only events for swimmers in this club"),
+    tiref: Optional[str] = Query(None, description="Only events for this swimmer"),
+    types: Optional[str] = Query(None, description="Comma-separated event types (race, new_pb, pb_improvement)"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum events per page")
+):
+    """Read new races and personal bests across all swimmers, oldest first"""
+    try:
+        event_types = None
+        if types:
+            event_types = [t.strip() for t in types.split(",") if t.strip()]
+            valid_types = {t.value for t in ActivityEventType}
+            unknown = set(event_types) - valid_types
+            if unknown:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown event types: {', '.join(sorted(unknown))}. Valid types: {', '.join(sorted(valid_types))}"
+                )
+        
+        # Fetch one extra event to know whether another page exists
+        events = db.get_activity_events(after, club, tiref, event_types, limit + 1)
+        has_more = len(events) > limit
+        events = events[:limit]
+        
+        return FeedResponse(
+            events=events,
+            next_cursor=events[-1].id if events else after,
+            has_more=has_more
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error reading activity feed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve activity feed")
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+import logging
+
+from app.monitoring.metrics import registry
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Content type of the Prometheus text exposition format (charset is appended)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+@router.get("", response_class=PlainTextResponse)
+@router.get("/", response_class=PlainTextResponse, include_in_schema=False)
+async def get_metrics():
+    """Expose request, database, upstream and cache metrics for Prometheus"""
+    return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import logging
+
+from app.models.schemas import StrokeType, PoolType
+from app.database.database import db
+from app.analytics.rankings import rankings
+from app.analytics.conversion import other_pool
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("")
+@router.get("/", include_in_schema=False)
+async def get_rankings(
+    stroke: StrokeType,
+    distance: int,
+    pool_type: PoolType,
+    club: Optional[str] = Query(None, description="Restrict to swimmers in this club"),
+    age_group: Optional[str] = Query(None, description="Restrict to this age group"),
+    tiref: Optional[str] = Query(None, description="Also report this swimmer's rank"),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500)
+):
+    """Get the leaderboard of personal bests for an event"""
+    try:
+        total, entries = rankings.leaderboard(
+            stroke.value, distance, pool_type.value, club, age_group, offset, limit
+        )
+        response = {
+            "event": f"{distance} {stroke.value}",
+            "stroke": stroke.value,
+            "distance": distance,
+            "pool_type": pool_type.value,
+            "equivalent_pool_type": other_pool(pool_type.value),
+            "club": club,
+            "age_group": age_group,
+            "total": total,
+            "entries": entries
+        }
+        
+        if tiref:
+            best = next(
+                (pb for pb in db.get_personal_bests(tiref)
+                 if pb.stroke == stroke and pb.distance == distance and pb.pool_type == pool_type),
+                None
+            )
+            response["swimmer"] = {
+                "tiref": tiref,
+                "time_seconds": best.best_time_seconds,
+                **rankings.rank(stroke.value, distance, pool_type.value, best.best_time_seconds, club, age_group)
+            } if best and total else None
+        
+        return response
+    except Exception as e:
+        logger.error(f"Error getting rankings for {distance} {stroke.value} {pool_type.value}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve rankings")
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
 from pydantic import BaseModel
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 
 from app.models.schemas import ScrapeRequest, ScrapeResponse, ErrorResponse
-from app.scraper.swimming_scraper import scraper
+from app.scraper import get_scraper
 from app.database.database import db
+from app.monitoring.metrics import record_cache
+from app.monitoring.tracing import ScrapeTrace, trace_scrape, stage, count, summarize_runs
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -13,6 +16,13 @@ logger = logging.getLogger(__name__)
 class ValidateRequest(BaseModel):
     tiref: str
 
+def _record_run(trace: ScrapeTrace, success: bool, error_message: str = None) -> Dict[str, Any]:
+    """Store a finished scrape's stage breakdown and return it"""
+    trace.finish()
+    run_timings = trace.to_dict()
+    db.save_scrape_run(trace.tiref, run_timings, success, error_message)
+    return run_timings
+
 @router.post("/validate", response_model=dict)
 async def validate_tiref(request: ValidateRequest):
     """Validate if a tiref exists on the swimming results website"""
@@ -28,7 +38,7 @@ async def validate_tiref(request: ValidateRequest):
             }
         
         # Check with the website
-        is_valid = scraper.validate_tiref(tiref)
+        is_valid = get_scraper().validate_tiref(tiref)
         
         return {
             "valid": is_valid,
@@ -45,8 +55,8 @@ async def validate_tiref(request: ValidateRequest):
         }
 
 @router.post("/scrape/{tiref}", response_model=ScrapeResponse)
-async def scrape_swimmer_data(tiref: str, force_refresh: bool = False):
-    """Scrape fresh swimming data for a swimmer"""
+async def scrape_swimmer_data(tiref: str, force_refresh: bool = False, timings: bool = False):
+    """Scrape fresh swimming data for a swimmer; ``timings`` adds the stage breakdown of a fresh scrape"""
     try:
         tiref = tiref.strip()
         
@@ -68,6 +78,7 @@ async def scrape_swimmer_data(tiref: str, force_refresh: bool = False):
                 
                 # Use cache if it's less than 24 hours old, or immediately return for very recent cache
                 if cache_age_hours < 24:
+                    record_cache("scrape", True)
                     records_count = cache_info['records_count']
                     return ScrapeResponse(
                         success=True,
@@ -82,6 +93,7 @@ async def scrape_swimmer_data(tiref: str, force_refresh: bool = False):
                     logger.info(f"Cache for {tiref} is {cache_age_hours:.1f}h old, refreshing...")
             elif swimmer and not force_refresh:
                 # Even if no cache metadata, if we have swimmer data, return it quickly
+                record_cache("scrape", True)
                 records = db.get_swim_records(tiref)
                 return ScrapeResponse(
                     success=True,
@@ -94,72 +106,83 @@ async def scrape_swimmer_data(tiref: str, force_refresh: bool = False):
                 )
         
         # Scrape fresh data
+        record_cache("scrape", False)
         logger.info(f"Starting fresh scrape for tiref: {tiref}")
         
-        try:
-            swimmer_info, swim_records = scraper.scrape_swimmer_data(tiref)
-            
-            if not swimmer_info:
-                # Update cache with failure
-                db.update_cache_metadata(tiref, 0, False, "Swimmer not found or invalid tiref")
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Swimmer with tiref {tiref} not found"
-                )
-            
-            # Save swimmer info
-            success_swimmer = db.save_swimmer(swimmer_info)
-            if not success_swimmer:
-                raise HTTPException(
-                    status_code=500,
-                    detail="Failed to save swimmer information"
-                )
-            
-            # Save swim records
-            saved_records = 0
-            if swim_records:
-                saved_records = db.save_swim_records(swim_records)
-            
-            # Update personal bests
-            db.update_personal_bests(tiref)
-            
-            # Update cache metadata
-            db.update_cache_metadata(tiref, saved_records, True)
-            
-            return ScrapeResponse(
-                success=True,
-                message=f"Successfully scraped {saved_records} records",
-                tiref=tiref,
-                records_found=saved_records,
-                swimmer_info=swimmer_info,
-                last_updated=datetime.now(),
-                from_cache=False
-            )
-            
-        except Exception as scrape_error:
-            # Update cache with failure
-            error_message = str(scrape_error)
-            db.update_cache_metadata(tiref, 0, False, error_message)
-            logger.error(f"Scraping failed for {tiref}: {error_message}")
-            
-            # Check if we have any cached data to fall back to
-            swimmer = db.get_swimmer(tiref)
-            if swimmer:
-                records = db.get_swim_records(tiref)
+        with trace_scrape(tiref) as trace:
+            try:
+                swimmer_info, swim_records = get_scraper().scrape_swimmer_data(tiref)
+                
+                if not swimmer_info:
+                    # Update cache with failure
+                    db.update_cache_metadata(tiref, 0, False, "Swimmer not found or invalid tiref")
+                    raise HTTPException(
+                        status_code=404,
+                        detail=f"Swimmer with tiref {tiref} not found"
+                    )
+                
+                # Save swimmer info
+                with stage("save_swimmer"):
+                    success_swimmer = db.save_swimmer(swimmer_info)
+                if not success_swimmer:
+                    raise HTTPException(
+                        status_code=500,
+                        detail="Failed to save swimmer information"
+                    )
+                
+                # Save swim records
+                saved_records = 0
+                if swim_records:
+                    with stage("save_records"):
+                        saved_records = db.save_swim_records(swim_records)
+                    count("rows_inserted", saved_records)
+                
+                # Update personal bests
+                with stage("update_personal_bests"):
+                    db.update_personal_bests(tiref)
+                
+                # Update cache metadata
+                with stage("cache_metadata"):
+                    db.update_cache_metadata(tiref, saved_records, True)
+                
+                run_timings = _record_run(trace, True)
                 return ScrapeResponse(
-                    success=False,
-                    message=f"Scraping failed: {error_message}. Showing cached data.",
+                    success=True,
+                    message=f"Successfully scraped {saved_records} records",
                     tiref=tiref,
-                    records_found=len(records),
-                    swimmer_info=swimmer,
-                    last_updated=swimmer.last_updated,
-                    from_cache=True
-                )
-            else:
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Scraping failed and no cached data available: {error_message}"
+                    records_found=saved_records,
+                    swimmer_info=swimmer_info,
+                    last_updated=datetime.now(),
+                    from_cache=False,
+                    timings=run_timings if timings else None
                 )
+                
+            except Exception as scrape_error:
+                # Update cache with failure
+                error_message = str(scrape_error)
+                db.update_cache_metadata(tiref, 0, False, error_message)
+                logger.error(f"Scraping failed for {tiref}: {error_message}")
+                run_timings = _record_run(trace, False, error_message)
+                
+                # Check if we have any cached data to fall back to
+                swimmer = db.get_swimmer(tiref)
+                if swimmer:
+                    records = db.get_swim_records(tiref)
+                    return ScrapeResponse(
+                        success=False,
+                        message=f"Scraping failed: {error_message}. Showing cached data.",
+                        tiref=tiref,
+                        records_found=len(records),
+                        swimmer_info=swimmer,
+                        last_updated=swimmer.last_updated,
+                        from_cache=True,
+                        timings=run_timings if timings else None
+                    )
+                else:
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Scraping failed and no cached data available: {error_message}"
+                    )
     
     except HTTPException:
         raise
@@ -171,15 +194,36 @@ async def scrape_swimmer_data(tiref: str, force_refresh: bool = False):
         )
 
 @router.post("/refresh/{tiref}", response_model=ScrapeResponse)
-async def refresh_swimmer_data(tiref: str):
+async def refresh_swimmer_data(tiref: str, timings: bool = False):
     """Force refresh swimmer data (same as scrape with force_refresh=True)"""
-    return await scrape_swimmer_data(tiref, force_refresh=True)
+    return await scrape_swimmer_data(tiref, force_refresh=True, timings=timings)
+
+@router.get("/runs/report")
+async def scrape_runs_report(
+    hours: Optional[int] = Query(None, ge=1, description="Only include scrapes from the last N hours"),
+    tiref: Optional[str] = Query(None, description="Only include scrapes of one swimmer"),
+    limit: int = Query(1000, ge=1, le=10000, description="Most recent scrapes to include")
+):
+    """Percentile breakdown of where fresh scrapes spend their time"""
+    try:
+        since = datetime.now() - timedelta(hours=hours) if hours else None
+        runs = db.get_scrape_runs(since=since, tiref=tiref, limit=limit)
+        report = summarize_runs(runs)
+        report["slowest"] = [
+            {key: run[key] for key in ("id", "tiref", "started_at", "success", "wall_seconds", "stages")}
+            for run in sorted(runs, key=lambda run: run['wall_seconds'], reverse=True)[:5]
+        ]
+        return report
+    except Exception as e:
+        logger.error(f"Error building scrape runs report: {e}")
+        raise HTTPException(status_code=500, detail="Failed to build scrape runs report")
 
 @router.get("/health")
 async def scraper_health():
     """Check scraper health and connectivity"""
     try:
         # Test connectivity to the swimming results website
+        scraper = get_scraper()
         test_response = scraper._make_request(scraper.BASE_URL)
         
         if test_response and test_response.status_code == 200:
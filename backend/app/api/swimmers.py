@@ -1,14 +1,30 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Set, Iterable, Iterator
+import csv
+import io
+import json
 import logging
+import zlib
 
 from app.models.schemas import (
     SwimmerInfo, 
     SwimmerListResponse, 
     ScrapeResponse,
-    ErrorResponse
+    ErrorResponse,
+    BatchSwimmersRequest,
+    SwimmerProfileUpdate,
+    PerformanceAnalysis,
+    StrokeType,
+    PoolType
 )
-from app.database.database import db
+from app.database.database import db, EXPORT_COLUMNS
+from app.analytics.engine import analyze_records, convert_time_to_seconds, get_stroke_info, empty_stats
+from app.analytics.performance import analyze_columns
+from app.analytics.rankings import rankings
+from app.analytics.standards import standards, LEVEL_ORDER
+from app.analytics.progression import build_progression, progression_cache
+from app.analytics.predictions import predict, prediction_cache, target_dates, to_julian_days
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,6 +42,156 @@ async def list_swimmers():
         logger.error(f"Error listing swimmers: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve swimmers")
 
+# Upper bound on swimmers per batch read (keeps IN (...) lists within SQLite limits)
+MAX_BATCH_TIREFS = 500
+
+def parse_batch_tirefs(tirefs: List[str]) -> List[str]:
+    """Normalise a batch of tirefs, dropping blanks and duplicates"""
+    unique_tirefs = list(dict.fromkeys(t.strip() for t in tirefs if t and t.strip()))
+    
+    if not unique_tirefs:
+        raise HTTPException(status_code=400, detail="At least one tiref is required")
+    if len(unique_tirefs) > MAX_BATCH_TIREFS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many tirefs: {len(unique_tirefs)} (maximum {MAX_BATCH_TIREFS})"
+        )
+    return unique_tirefs
+
+def get_batch_swimmer_summaries(tirefs: List[str]):
+    """Build compact per-swimmer summaries using a fixed number of queries"""
+    swimmers = db.get_swimmers_batch(tirefs)
+    found = [tiref for tiref in tirefs if tiref in swimmers]
+    personal_bests = db.get_personal_bests_batch(found)
+    stats = db.get_record_stats_batch(found)
+    
+    summaries = []
+    for tiref in found:
+        swimmer = swimmers[tiref]
+        summaries.append({
+            "tiref": swimmer.tiref,
+            "name": swimmer.name,
+            "club": swimmer.club,
+            "ageGroup": swimmer.age_group,
+            "lastUpdated": swimmer.last_updated.isoformat() if swimmer.last_updated else None,
+            "personalBests": [format_personal_best_for_frontend(pb) for pb in personal_bests[tiref]],
+            "stats": format_stats_for_frontend(stats[tiref])
+        })
+    
+    return {
+        "swimmers": summaries,
+        "total": len(summaries),
+        "missing": [tiref for tiref in tirefs if tiref not in swimmers]
+    }
+
+@router.get("/batch")
+async def get_swimmers_batch(tirefs: str = Query(..., description="Comma-separated swimmer membership IDs")):
+    """Get swimmer info, personal bests and summary stats for many swimmers in one request"""
+    try:
+        return get_batch_swimmer_summaries(parse_batch_tirefs(tirefs.split(",")))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting swimmer batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve swimmers")
+
+@router.post("/batch")
+async def post_swimmers_batch(request: BatchSwimmersRequest):
+    """Same as GET /batch, for tiref lists too long for a query string"""
+    try:
+        return get_batch_swimmer_summaries(parse_batch_tirefs(request.tirefs))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting swimmer batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve swimmers")
+
+# Supported export formats and their media types
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Number of rows encoded into each streamed chunk
+EXPORT_CHUNK_ROWS = 500
+
+def encode_export_rows(rows: Iterable[tuple], export_format: str) -> Iterator[bytes]:
+    """Encode export rows as CSV or NDJSON, yielding one chunk per EXPORT_CHUNK_ROWS rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer:
+        writer.writerow(EXPORT_COLUMNS)
+    
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow(row)
+        else:
+            buffer.write(json.dumps(dict(zip(EXPORT_COLUMNS, row))))
+            buffer.write("\n")
+        
+        pending += 1
+        if pending >= EXPORT_CHUNK_ROWS:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Compress a chunk stream into a single gzip member on the fly"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+def build_export_response(rows: Iterable[tuple], export_format: str, compress: bool, filename: str) -> StreamingResponse:
+    """Wrap a row iterator in a constant-memory streaming response"""
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format: {export_format}. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    
+    body = encode_export_rows(rows, export_format)
+    filename = f"{filename}.{export_format}"
+    headers = {}
+    if compress:
+        body = gzip_chunks(body)
+        headers["Content-Encoding"] = "gzip"
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    
+    return StreamingResponse(body, media_type=EXPORT_FORMATS[export_format], headers=headers)
+
+@router.get("/export")
+async def export_records(
+    tirefs: Optional[str] = Query(None, description="Comma-separated swimmer membership IDs"),
+    club: Optional[str] = Query(None, description="Export every swimmer in this club"),
+    format: str = Query("ndjson", description="Export format (ndjson or csv)"),
+    gzip: bool = Query(False, description="Gzip-compress the stream")
+):
+    """Stream swim records for several swimmers or a whole club as NDJSON or CSV"""
+    try:
+        tiref_list = parse_batch_tirefs(tirefs.split(",")) if tirefs else None
+        if not tiref_list and not club:
+            raise HTTPException(status_code=400, detail="Either tirefs or club is required")
+        
+        return build_export_response(
+            db.iter_export_rows(tirefs=tiref_list, club=club),
+            format,
+            gzip,
+            "swim_records"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting records: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export swim records")
+
 @router.get("/{tiref}", response_model=SwimmerInfo)
 async def get_swimmer(tiref: str):
     """Get swimmer information by tiref"""
@@ -41,126 +207,123 @@ async def get_swimmer(tiref: str):
         logger.error(f"Error getting swimmer {tiref}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve swimmer")
 
+@router.patch("/{tiref}", response_model=SwimmerInfo)
+async def update_swimmer(tiref: str, update: SwimmerProfileUpdate):
+    """Record details the results site does not always show, such as gender and year of birth"""
+    try:
+        if not db.get_swimmer(tiref):
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        fields = {"gender": update.gender.value if update.gender else None, "year_of_birth": update.year_of_birth}
+        if not any(value is not None for value in fields.values()):
+            raise HTTPException(status_code=400, detail="No fields to update")
+        if not db.update_swimmer_profile(tiref, **fields):
+            raise HTTPException(status_code=500, detail="Failed to update swimmer")
+        
+        return db.get_swimmer(tiref)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update swimmer")
+
+# Sections of the /complete payload that can be requested individually
+COMPLETE_SECTIONS = ("records", "personalBests", "stats")
+
+def parse_complete_sections(*values: Optional[str]) -> Set[str]:
+    """Parse comma-separated section lists, defaulting to every section"""
+    requested = set()
+    for value in values:
+        if value:
+            requested.update(part.strip() for part in value.split(",") if part.strip())
+    
+    if not requested:
+        return set(COMPLETE_SECTIONS)
+    
+    unknown = requested - set(COMPLETE_SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown sections: {', '.join(sorted(unknown))}. Valid sections: {', '.join(COMPLETE_SECTIONS)}"
+        )
+    return requested
+
 @router.get("/{tiref}/complete")
-async def get_complete_swimmer_data(tiref: str):
-    """Get complete swimmer data including records, personal bests, and statistics"""
+async def get_complete_swimmer_data(
+    tiref: str,
+    fields: Optional[str] = Query(None, description="Comma-separated sections to return (records, personalBests, stats)"),
+    include: Optional[str] = Query(None, description="Alias for fields"),
+    records_limit: Optional[int] = Query(None, ge=1, description="Maximum number of most recent records to return")
+):
+    """Get complete swimmer data including records, personal bests, and statistics.
+    
+    Only the requested sections are queried and computed, so lightweight views
+    such as the home card can ask for ``fields=stats,personalBests``.
+    """
     try:
+        sections = parse_complete_sections(fields, include)
+        
         # Get swimmer info
         swimmer = db.get_swimmer(tiref)
         if not swimmer:
             raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
         
-        # Get records
-        records = db.get_swim_records(tiref)
-        
-        # Get personal bests
-        personal_bests = db.get_personal_bests(tiref)
-        
-        # Calculate statistics
-        stats = calculate_swimmer_stats(records)
-        
         # Format data for frontend
-        return {
+        data = {
             "tiref": swimmer.tiref,
             "name": swimmer.name,
             "club": swimmer.club,
             "age": None,  # Not available in current data
             "ageGroup": swimmer.age_group,
-            "records": [format_record_for_frontend(r) for r in records],
-            "personalBests": [format_personal_best_for_frontend(pb) for pb in personal_bests],
-            "stats": stats,
             "lastUpdated": swimmer.last_updated.isoformat() if swimmer.last_updated else None,
             "cacheExpiry": None  # Could calculate based on last update + 24 hours
         }
+        
+        if "records" in sections:
+            records = db.get_swim_records(tiref, records_limit)
+            data["records"] = [format_record_for_frontend(r) for r in records]
+        
+        if "personalBests" in sections:
+            personal_bests = db.get_personal_bests(tiref)
+            data["personalBests"] = [format_personal_best_for_frontend(pb) for pb in personal_bests]
+        
+        if "stats" in sections:
+            # Aggregated in SQL so stats never require loading the full history
+            data["stats"] = format_stats_for_frontend(db.get_record_stats(tiref))
+        
+        return data
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting complete swimmer data {tiref}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve complete swimmer data")
 
-def calculate_swimmer_stats(records):
-    """Calculate swimmer statistics from records"""
-    if not records:
-        return {
-            "totalRaces": 0,
-            "personalBests": 0,
-            "averageWAPoints": 0,
-            "mostCommonStroke": "Freestyle",
-            "mostCommonDistance": 50,
-            "currentSeason": "2024-25",
-            "seasonsCompeted": [],
-            "recentImprovements": 0,
-            "competitionSpan": {
-                "firstRace": None,
-                "lastRace": None,
-                "yearsActive": 0
-            }
-        }
-    
-    # Calculate stats
-    total_races = len(records)
-    
-    # Get strokes and distances
-    strokes = []
-    distances = []
-    wa_points = []
-    seasons = []
-    dates = []
-    
-    for r in records:
-        # Handle stroke
-        if hasattr(r.stroke, 'value'):
-            strokes.append(r.stroke.value)
-        else:
-            strokes.append(str(r.stroke))
-        
-        # Handle distance
-        distances.append(r.distance)
-        
-        # Handle WA points
-        if r.wa_points and r.wa_points > 0:
-            wa_points.append(r.wa_points)
-        
-        # Handle season
-        if r.season:
-            seasons.append(r.season)
-        
-        # Handle dates
-        if hasattr(r, 'meet_date') and r.meet_date:
-            dates.append(r.meet_date)
-    
-    # Most common stroke and distance
-    most_common_stroke = max(set(strokes), key=strokes.count) if strokes else "Freestyle"
-    most_common_distance = max(set(distances), key=distances.count) if distances else 50
-    
-    # Calculate average WA points
-    average_wa_points = int(sum(wa_points) / len(wa_points)) if wa_points else 0
-    
-    # Get seasons
-    unique_seasons = list(set(seasons))
-    current_season = max(unique_seasons) if unique_seasons else "2024-25"
-    
-    # Date range
-    first_race = min(dates).isoformat() if dates else None
-    last_race = max(dates).isoformat() if dates else None
-    years_active = len(set([d.year for d in dates])) if dates else 0
+def format_stats_for_frontend(summary):
+    """Format aggregated record statistics the same way as calculate_swimmer_stats"""
+    if not summary or not summary['total_races']:
+        return empty_stats()
     
+    seasons = summary['seasons']
     return {
-        "totalRaces": total_races,
-        "personalBests": 0,  # Would need to calculate based on best times per event
-        "averageWAPoints": average_wa_points,
-        "mostCommonStroke": most_common_stroke,
-        "mostCommonDistance": most_common_distance,
-        "currentSeason": current_season,
-        "seasonsCompeted": sorted(unique_seasons, reverse=True),
-        "recentImprovements": 0,  # Would need to calculate improvements
+        "totalRaces": summary['total_races'],
+        "personalBests": summary['personal_bests'],
+        "averageWAPoints": int(summary['average_wa_points']) if summary['average_wa_points'] else 0,
+        "mostCommonStroke": summary['most_common_stroke'] or "Freestyle",
+        "mostCommonDistance": summary['most_common_distance'] or 50,
+        "currentSeason": max(seasons) if seasons else "2024-25",
+        "seasonsCompeted": sorted(seasons, reverse=True),
+        "recentImprovements": summary['recent_improvements'],
         "competitionSpan": {
-            "firstRace": first_race,
-            "lastRace": last_race,
-            "yearsActive": years_active
+            "firstRace": summary['first_race'].isoformat() if summary['first_race'] else None,
+            "lastRace": summary['last_race'].isoformat() if summary['last_race'] else None,
+            "yearsActive": summary['years_active']
         }
     }
 
+def calculate_swimmer_stats(records):
+    """Calculate swimmer statistics from records"""
+    return analyze_records(records)["stats"]
+
 def format_record_for_frontend(record):
     """Format a database record for frontend consumption"""
     return {
@@ -219,6 +382,31 @@ async def get_swimmer_records(tiref: str, limit: int = None):
         logger.error(f"Error getting records for swimmer {tiref}: {e}")
         raise HTTPException(status_code=500, detail="Failed to retrieve swim records")
 
+@router.get("/{tiref}/records/export")
+async def export_swimmer_records(
+    tiref: str,
+    format: str = Query("ndjson", description="Export format (ndjson or csv)"),
+    gzip: bool = Query(False, description="Gzip-compress the stream")
+):
+    """Stream all swim records for a swimmer as NDJSON or CSV"""
+    try:
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        return build_export_response(
+            db.iter_export_rows(tirefs=[tiref]),
+            format,
+            gzip,
+            f"swim_records_{tiref}"
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting records for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to export swim records")
+
 @router.get("/{tiref}/personal-bests-cards")
 async def get_personal_bests_cards(tiref: str):
     """Get personal bests formatted for card display with comparisons"""
@@ -255,271 +443,308 @@ async def get_personal_bests_cards(tiref: str):
 
 def calculate_personal_bests_for_cards(records, swimmer):
     """Calculate personal bests for card display with LC/SC comparison"""
-    from collections import defaultdict
-    import datetime
-    
-    # Group records by stroke and distance
-    event_records = defaultdict(list)
-    
-    for record in records:
-        # Create event key (stroke_distance)
-        stroke = record.stroke.value if hasattr(record.stroke, 'value') else str(record.stroke)
-        key = f"{stroke}_{record.distance}"
-        event_records[key].append(record)
-    
-    personal_bests = []
-    
-    for event_key, event_record_list in event_records.items():
-        stroke, distance = event_key.split('_', 1)
-        distance = int(distance)
-        
-        # Separate LC and SC records
-        lc_records = [r for r in event_record_list if (hasattr(r.pool_type, 'value') and r.pool_type.value == 'LC') or str(r.pool_type) == 'LC']
-        sc_records = [r for r in event_record_list if (hasattr(r.pool_type, 'value') and r.pool_type.value == 'SC') or str(r.pool_type) == 'SC']
-        
-        # Find best LC and SC times
-        best_lc = None
-        best_sc = None
-        
-        if lc_records:
-            # Sort by time (assuming time_to_seconds method exists or we convert)
-            lc_times = []
-            for r in lc_records:
-                try:
-                    time_seconds = r.time_seconds if hasattr(r, 'time_seconds') and r.time_seconds else convert_time_to_seconds(r.time)
-                    if time_seconds:
-                        lc_times.append((time_seconds, r))
-                except:
-                    continue
-            
-            if lc_times:
-                lc_times.sort(key=lambda x: x[0])
-                best_lc = lc_times[0][1]
-        
-        if sc_records:
-            sc_times = []
-            for r in sc_records:
-                try:
-                    time_seconds = r.time_seconds if hasattr(r, 'time_seconds') and r.time_seconds else convert_time_to_seconds(r.time)
-                    if time_seconds:
-                        sc_times.append((time_seconds, r))
-                except:
-                    continue
-            
-            if sc_times:
-                sc_times.sort(key=lambda x: x[0])
-                best_sc = sc_times[0][1]
-        
-        # Determine overall best time
-        primary_best = None
-        secondary_best = None
-        
-        if best_lc and best_sc:
-            lc_seconds = best_lc.time_seconds if hasattr(best_lc, 'time_seconds') and best_lc.time_seconds else convert_time_to_seconds(best_lc.time)
-            sc_seconds = best_sc.time_seconds if hasattr(best_sc, 'time_seconds') and best_sc.time_seconds else convert_time_to_seconds(best_sc.time)
-            
-            if lc_seconds and sc_seconds:
-                if lc_seconds <= sc_seconds:
-                    primary_best = best_lc
-                    secondary_best = best_sc
-                else:
-                    primary_best = best_sc
-                    secondary_best = best_lc
-        elif best_lc:
-            primary_best = best_lc
-        elif best_sc:
-            primary_best = best_sc
-        
-        if primary_best:
-            # Calculate improvement data
-            improvement_data = calculate_improvement_data(event_record_list, primary_best)
-            
-            # Get stroke icon/color
-            stroke_info = get_stroke_info(stroke)
-            
-            card_data = {
-                "event_name": f"{distance} {stroke}",
-                "stroke": stroke,
-                "distance": distance,
-                "stroke_color": stroke_info["color"],
-                "stroke_icon": stroke_info["icon"],
-                "primary_best": {
-                    "time": primary_best.time,
-                    "time_seconds": primary_best.time_seconds if hasattr(primary_best, 'time_seconds') and primary_best.time_seconds else convert_time_to_seconds(primary_best.time),
-                    "pool_type": primary_best.pool_type.value if hasattr(primary_best.pool_type, 'value') else str(primary_best.pool_type),
-                    "date": primary_best.meet_date.isoformat() if primary_best.meet_date else None,
-                    "meet_name": primary_best.meet_name or "Unknown Meet",
-                    "venue": primary_best.venue or "Unknown Venue",
-                    "wa_points": primary_best.wa_points or 0,
-                    "round_type": primary_best.round_type.value if hasattr(primary_best.round_type, 'value') else str(primary_best.round_type)
-                },
-                "secondary_best": None,
-                "improvement": improvement_data,
-                "total_races": len(event_record_list),
-                "seasons_competed": get_seasons_for_event(event_record_list)
-            }
-            
-            # Add secondary best if different pool type
-            if secondary_best:
-                card_data["secondary_best"] = {
-                    "time": secondary_best.time,
-                    "time_seconds": secondary_best.time_seconds if hasattr(secondary_best, 'time_seconds') and secondary_best.time_seconds else convert_time_to_seconds(secondary_best.time),
-                    "pool_type": secondary_best.pool_type.value if hasattr(secondary_best.pool_type, 'value') else str(secondary_best.pool_type),
-                    "date": secondary_best.meet_date.isoformat() if secondary_best.meet_date else None,
-                    "meet_name": secondary_best.meet_name or "Unknown Meet",
-                    "venue": secondary_best.venue or "Unknown Venue",
-                    "wa_points": secondary_best.wa_points or 0
-                }
-            
-            personal_bests.append(card_data)
-    
-    # Sort by stroke type order and distance
-    stroke_order = {"Freestyle": 1, "Backstroke": 2, "Breaststroke": 3, "Butterfly": 4, "Individual Medley": 5}
-    personal_bests.sort(key=lambda x: (stroke_order.get(x["stroke"], 6), x["distance"]))
-    
-    return personal_bests
+    cards = analyze_records(records)["personal_best_cards"]
+    for card in cards:
+        for best in (card["primary_best"], card["secondary_best"]):
+            if best:
+                best["ranking"] = get_best_ranking(card["stroke"], card["distance"], best, swimmer)
+    return cards
 
-def convert_time_to_seconds(time_str):
-    """Convert time string to seconds"""
-    if not time_str:
-        return None
-    
+def get_best_ranking(stroke, distance, best, swimmer):
+    """Overall, club and age group rank and percentile for a card's best time"""
+    ranking = {
+        "overall": rankings.rank(stroke, distance, best["pool_type"], best["time_seconds"])
+    }
+    if swimmer and swimmer.club:
+        ranking["club"] = rankings.rank(stroke, distance, best["pool_type"], best["time_seconds"], club=swimmer.club)
+    if swimmer and swimmer.age_group:
+        ranking["age_group"] = rankings.rank(stroke, distance, best["pool_type"], best["time_seconds"], age_group=swimmer.age_group)
+    return ranking
+
+@router.get("/{tiref}/personal-bests")
+async def get_personal_bests(tiref: str):
+    """Get personal best records for a swimmer"""
     try:
-        time_str = str(time_str).strip()
-        
-        if ':' in time_str:
-            # Format: MM:SS.sss or H:MM:SS.sss
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                # MM:SS.sss
-                minutes = float(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            elif len(parts) == 3:
-                # H:MM:SS.sss
-                hours = float(parts[0])
-                minutes = float(parts[1])
-                seconds = float(parts[2])
-                return hours * 3600 + minutes * 60 + seconds
-        else:
-            # Format: SS.sss
-            return float(time_str)
-    except:
-        return None
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        personal_bests = db.get_personal_bests(tiref)
+        return {
+            "tiref": tiref,
+            "total_personal_bests": len(personal_bests),
+            "personal_bests": personal_bests
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting personal bests for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve personal bests")
 
-def calculate_improvement_data(event_records, best_record):
-    """Calculate improvement data for an event"""
+@router.get("/{tiref}/analysis")
+async def get_performance_analysis(
+    tiref: str,
+    stroke: Optional[StrokeType] = None,
+    distance: Optional[int] = None,
+    pool_type: Optional[PoolType] = None
+):
+    """Get per-event trend, consistency, PB progression and season-over-season analysis"""
     try:
-        # Sort records by date
-        dated_records = [r for r in event_records if r.meet_date]
-        dated_records.sort(key=lambda x: x.meet_date)
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
         
-        if len(dated_records) < 2:
-            return {
-                "recent_improvement": 0,
-                "season_improvement": 0,
-                "all_time_improvement": 0,
-                "trend": "stable"
-            }
+        analyses = [
+            a for a in analyze_columns(db.get_record_columns(tirefs=[tiref]))
+            if (not stroke or a["stroke"] == stroke.value)
+            and (not distance or a["distance"] == distance)
+            and (not pool_type or a["pool_type"] == pool_type.value)
+        ]
+        
+        # Attach recent swims and the stored PB for each analysed event
+        recent_by_event = {}
+        for record in db.get_recent_records_by_event(tiref):
+            key = (record.stroke.value, record.distance, record.pool_type.value)
+            recent_by_event.setdefault(key, []).append(record)
+        bests_by_event = {}
+        for pb in db.get_personal_bests(tiref):
+            bests_by_event.setdefault((pb.stroke.value, pb.distance, pb.pool_type.value), []).append(pb)
+        
+        events = []
+        for analysis in analyses:
+            key = (analysis["stroke"], analysis["distance"], analysis["pool_type"])
+            events.append(PerformanceAnalysis(
+                **analysis,
+                recent_performance=recent_by_event.get(key, []),
+                personal_bests=bests_by_event.get(key, [])
+            ))
         
-        # Get times in seconds
-        times_with_dates = []
-        for r in dated_records:
-            time_seconds = r.time_seconds if hasattr(r, 'time_seconds') and r.time_seconds else convert_time_to_seconds(r.time)
-            if time_seconds:
-                times_with_dates.append((r.meet_date, time_seconds))
+        return {
+            "tiref": tiref,
+            "swimmer_name": swimmer.name,
+            "events": events
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error analysing performance for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to analyse performance")
+
+def parse_event(event: str):
+    """Split an event name such as '100 Freestyle' into (stroke, distance)"""
+    distance, _, stroke = event.strip().partition(" ")
+    try:
+        return StrokeType(stroke.strip()), int(distance.rstrip("mM"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Unknown event '{event}', expected e.g. '100 Freestyle'")
+
+@router.get("/{tiref}/progression")
+async def get_progression(
+    tiref: str,
+    event: str = Query(..., description="Event name, e.g. '100 Freestyle'"),
+    pool_type: Optional[PoolType] = None,
+    points: int = Query(200, ge=10, le=2000, description="Maximum points per series")
+):
+    """Get a downsampled progression chart series with PB steps and a rolling-best envelope"""
+    try:
+        stroke, distance = parse_event(event)
         
-        if len(times_with_dates) < 2:
-            return {
-                "recent_improvement": 0,
-                "season_improvement": 0,
-                "all_time_improvement": 0,
-                "trend": "stable"
-            }
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
         
-        # Calculate improvements
-        latest_time = times_with_dates[-1][1]
-        previous_time = times_with_dates[-2][1] if len(times_with_dates) > 1 else latest_time
-        first_time = times_with_dates[0][1]
-        
-        recent_improvement = previous_time - latest_time  # Positive = improvement
-        all_time_improvement = first_time - latest_time
-        
-        # Determine trend
-        if len(times_with_dates) >= 3:
-            last_three = [t[1] for t in times_with_dates[-3:]]
-            if last_three[0] > last_three[1] > last_three[2]:
-                trend = "improving"
-            elif last_three[0] < last_three[1] < last_three[2]:
-                trend = "declining"
-            else:
-                trend = "stable"
-        else:
-            trend = "improving" if recent_improvement > 0 else "stable"
+        courses = progression_cache.get_or_compute(
+            (tiref, stroke.value, distance, points),
+            db.get_data_version(tiref),
+            lambda: build_progression(db.get_record_columns(tirefs=[tiref], stroke=stroke.value, distance=distance), points)
+        )
         
         return {
-            "recent_improvement": round(recent_improvement, 2),
-            "season_improvement": 0,  # Would need season-specific calculation
-            "all_time_improvement": round(all_time_improvement, 2),
-            "trend": trend
+            "tiref": tiref,
+            "event": f"{distance} {stroke.value}",
+            "stroke": stroke.value,
+            "distance": distance,
+            "points": points,
+            "courses": [c for c in courses if not pool_type or c["pool_type"] == pool_type.value]
         }
-    except:
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building progression for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to build progression")
+
+@router.get("/{tiref}/predictions")
+async def get_predictions(
+    tiref: str,
+    dates: Optional[str] = Query(None, description="Comma-separated upcoming meet dates (YYYY-MM-DD)")
+):
+    """Predict times for untried distances and upcoming meet dates"""
+    try:
+        try:
+            targets = target_dates(dates)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Dates must be comma-separated YYYY-MM-DD values")
+        
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        predictions = prediction_cache.get_or_compute(
+            (tiref, tuple(targets)),
+            db.get_data_version(tiref),
+            lambda: predict(db.get_record_columns(tirefs=[tiref]), to_julian_days(targets)).get(tiref)
+        )
+        
         return {
-            "recent_improvement": 0,
-            "season_improvement": 0,
-            "all_time_improvement": 0,
-            "trend": "stable"
+            "tiref": tiref,
+            "swimmer_name": swimmer.name,
+            "dates": [d.isoformat() for d in targets],
+            **(predictions or {"models": [], "untried": [], "upcoming": []})
         }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error predicting times for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to predict times")
 
-def get_stroke_info(stroke):
-    """Get color and icon information for strokes"""
-    stroke_map = {
-        "Freestyle": {"color": "#3B82F6", "icon": "🏊"},  # Blue
-        "Backstroke": {"color": "#10B981", "icon": "🤿"},  # Green
-        "Breaststroke": {"color": "#F59E0B", "icon": "🐸"},  # Amber
-        "Butterfly": {"color": "#8B5CF6", "icon": "🦋"},  # Purple
-        "Individual Medley": {"color": "#EF4444", "icon": "🎯"}  # Red
-    }
-    return stroke_map.get(stroke, {"color": "#6B7280", "icon": "🏊"})
-
-def get_seasons_for_event(event_records):
-    """Get list of seasons competed in for this event"""
-    seasons = set()
-    for record in event_records:
-        if record.season:
-            seasons.add(record.season)
-        elif record.meet_date:
-            # Calculate season from date
-            year = record.meet_date.year
-            month = record.meet_date.month
-            if month >= 9:  # Sept-Dec
-                season = f"{year}-{year+1}"
-            else:  # Jan-Aug
-                season = f"{year-1}-{year}"
-            seasons.add(season)
-    
-    return sorted(list(seasons), reverse=True)
+@router.get("/{tiref}/qualifications")
+async def get_qualifications(
+    tiref: str,
+    meet: Optional[str] = Query(None, description="Only report standards for this meet"),
+    level: Optional[str] = Query(None, description="Only report county, regional or national standards"),
+    achieved_only: bool = Query(False, description="Only report standards the swimmer has achieved"),
+    age: Optional[int] = Query(None, ge=5, le=99, description="Evaluate for this age instead of the stored year of birth or age group"),
+    gender: Optional[str] = Query(None, pattern="^[MF]$", description="Evaluate for this gender instead of the stored one")
+):
+    """Get the qualifying standards a swimmer's personal bests have achieved or are chasing"""
+    try:
+        # Check if swimmer exists
+        swimmer = db.get_swimmer(tiref)
+        if not swimmer:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        if age is None and gender is None:
+            qualifications = standards.for_swimmer(tiref)
+        else:
+            qualifications = standards.evaluate(db.get_ranking_entries(tiref), age=age, gender=gender).get(tiref, [])
+        
+        qualifications = sorted(
+            (
+                q for q in qualifications
+                if (not meet or q["meet"] == meet)
+                and (not level or q["level"] == level)
+                and (q["achieved"] or not achieved_only)
+            ),
+            key=lambda q: (LEVEL_ORDER.get(q["level"], len(LEVEL_ORDER) + 1), q["meet"], q["stroke"], q["distance"], q["pool_type"])
+        )
+        
+        return {
+            "tiref": tiref,
+            "swimmer_name": swimmer.name,
+            "achieved": sum(1 for q in qualifications if q["achieved"]),
+            "sample_standards": standards.has_samples,
+            "qualifications": qualifications
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error checking qualifications for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to check qualifications")
 
-@router.get("/{tiref}/personal-bests")
-async def get_personal_bests(tiref: str):
-    """Get personal best records for a swimmer"""
+@router.get("/{tiref}/seasons")
+async def get_season_bests(
+    tiref: str,
+    stroke: Optional[StrokeType] = None,
+    distance: Optional[int] = None,
+    pool_type: Optional[PoolType] = None
+):
+    """Get season-by-season bests and race counts for each event"""
     try:
         # Check if swimmer exists
         swimmer = db.get_swimmer(tiref)
         if not swimmer:
             raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
         
-        personal_bests = db.get_personal_bests(tiref)
+        rows = db.get_season_bests(
+            tiref,
+            stroke.value if stroke else None,
+            distance,
+            pool_type.value if pool_type else None
+        )
+        
+        events = []
+        for row in rows:
+            if not events or (events[-1]["stroke"], events[-1]["distance"], events[-1]["pool_type"]) != (row['stroke'], row['distance'], row['pool_type']):
+                events.append({
+                    "event": f"{row['distance']} {row['stroke']}",
+                    "stroke": row['stroke'],
+                    "distance": row['distance'],
+                    "pool_type": row['pool_type'],
+                    "seasons": []
+                })
+            seasons = events[-1]["seasons"]
+            previous_best = seasons[-1]["best_time_seconds"] if seasons else None
+            seasons.append({
+                "season": row['season'],
+                "best_time": row['best_time'],
+                "best_time_seconds": row['best_time_seconds'],
+                "races": row['races'],
+                "first_swim": row['first_swim'],
+                "last_swim": row['last_swim'],
+                "improvement_seconds": round(previous_best - row['best_time_seconds'], 2)
+                if previous_best is not None and row['best_time_seconds'] is not None else None
+            })
+        
         return {
             "tiref": tiref,
-            "total_personal_bests": len(personal_bests),
-            "personal_bests": personal_bests
+            "swimmer_name": swimmer.name,
+            "events": events
         }
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting personal bests for swimmer {tiref}: {e}")
-        raise HTTPException(status_code=500, detail="Failed to retrieve personal bests")
+        logger.error(f"Error getting season bests for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve season bests")
+
+@router.get("/{tiref}/changes")
+async def get_swimmer_changes(
+    tiref: str,
+    since: int = Query(0, ge=0, description="Last data version the client has seen (0 for a full sync)")
+):
+    """Get records and personal bests added, changed or deleted since a data version"""
+    try:
+        # A deleted swimmer still reports its deletions to clients that synced before it
+        swimmer = db.get_swimmer(tiref)
+        changes = db.get_changes(tiref, since)
+        deleted = changes['deleted']
+        if not swimmer and not deleted['swimmer']:
+            raise HTTPException(status_code=404, detail=f"Swimmer with tiref {tiref} not found")
+        
+        return {
+            "tiref": tiref,
+            "since": since,
+            "version": changes['version'],
+            "records": [format_record_for_frontend(r) for r in changes['records']],
+            "personalBests": [format_personal_best_for_frontend(pb) for pb in changes['personal_bests']],
+            "deleted": {
+                "swimmer": deleted['swimmer'],
+                "records": [str(record_id) for record_id in deleted['records']],
+                "personalBests": [
+                    {"stroke": pb['stroke'], "distance": pb['distance'], "poolType": pb['pool_type']}
+                    for pb in deleted['personal_bests']
+                ]
+            },
+            "lastUpdated": swimmer.last_updated.isoformat() if swimmer and swimmer.last_updated else None
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting changes for swimmer {tiref}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to retrieve changes")
 
 @router.get("/{tiref}/cache-info")
 async def get_cache_info(tiref: str):
@@ -1,20 +1,33 @@
 import sqlite3
 import logging
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Callable
 from datetime import datetime
 import json
 
-from app.models.schemas import SwimmerInfo, SwimRecord, PersonalBest, SwimmerStats
+import numpy as np
+
+from app.analytics.engine import RECENT_IMPROVEMENT_DAYS, season_for_date
+from app.analytics.points import points_table
+from app.monitoring.metrics import instrument_methods
+from app.monitoring.queries import TrackedConnection
+from app.models.schemas import SwimmerInfo, SwimRecord, PersonalBest, SwimmerStats, ActivityEvent, ActivityEventType
 
 logger = logging.getLogger(__name__)
 
 # Database file path
 DB_PATH = Path("swimbuddy.db")
 
-def get_db_connection():
-    """Get database connection with row factory"""
-    conn = sqlite3.connect(str(DB_PATH))
+# Columns emitted by record exports, in output order
+EXPORT_COLUMNS = (
+    'tiref', 'swimmer_name', 'club', 'event_name', 'stroke', 'distance', 'pool_type',
+    'time', 'time_seconds', 'wa_points', 'ranking', 'meet_date', 'venue', 'meet_name',
+    'round_type', 'season'
+)
+
+def get_db_connection(check_same_thread: bool = True):
+    """Get database connection with row factory (queries are counted for /api debug stats)"""
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=check_same_thread, factory=TrackedConnection)
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -95,11 +108,114 @@ def init_db():
             )
         """)
         
+        # Stage timing breakdown of every fresh scrape
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tiref TEXT NOT NULL,
+                started_at TIMESTAMP NOT NULL,
+                success BOOLEAN NOT NULL,
+                wall_seconds REAL NOT NULL,
+                bytes_fetched INTEGER DEFAULT 0,
+                pages INTEGER DEFAULT 0,
+                rows_parsed INTEGER DEFAULT 0,
+                rows_inserted INTEGER DEFAULT 0,
+                stages TEXT NOT NULL,
+                error_message TEXT
+            )
+        """)
+        
+        # Global change counter used to stamp row versions for delta sync
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        cursor.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+        
+        # Append-only activity log feeding /api/feed
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS activity_events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tiref TEXT NOT NULL,
+                club TEXT,
+                event_type TEXT NOT NULL,
+                event_name TEXT NOT NULL,
+                stroke TEXT NOT NULL,
+                distance INTEGER NOT NULL,
+                pool_type TEXT NOT NULL,
+                time TEXT NOT NULL,
+                time_seconds REAL,
+                previous_time_seconds REAL,
+                improvement_seconds REAL,
+                meet_date TIMESTAMP,
+                meet_name TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (tiref) REFERENCES swimmers (tiref)
+            )
+        """)
+        
+        # Tombstones of deleted records and personal bests for delta sync
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS deletions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                tiref TEXT NOT NULL,
+                table_name TEXT NOT NULL,
+                row_id INTEGER NOT NULL,
+                stroke TEXT,
+                distance INTEGER,
+                pool_type TEXT,
+                row_version INTEGER NOT NULL,
+                deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Per-season rollup of each event, maintained by save_swim_records
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS season_bests (
+                tiref TEXT NOT NULL,
+                stroke TEXT NOT NULL,
+                distance INTEGER NOT NULL,
+                pool_type TEXT NOT NULL,
+                season TEXT NOT NULL,
+                best_time TEXT,
+                best_time_seconds REAL,
+                races INTEGER NOT NULL DEFAULT 0,
+                first_swim TIMESTAMP,
+                last_swim TIMESTAMP,
+                PRIMARY KEY (tiref, stroke, distance, pool_type, season),
+                FOREIGN KEY (tiref) REFERENCES swimmers (tiref)
+            ) WITHOUT ROWID
+        """)
+        
+        # Row versions for databases created before change tracking existed
+        _ensure_column(cursor, "swim_records", "row_version", "INTEGER NOT NULL DEFAULT 0")
+        _ensure_column(cursor, "personal_bests", "row_version", "INTEGER NOT NULL DEFAULT 0")
+        
+        # Gender selects the base times used for WA points
+        _ensure_column(cursor, "swimmers", "gender", "TEXT")
+        
+        # Year of birth gives the age used for qualifying standard age bands
+        _ensure_column(cursor, "swimmers", "year_of_birth", "INTEGER")
+        
         # Create indexes for better performance
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_swim_records_tiref ON swim_records(tiref)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_swim_records_date ON swim_records(meet_date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_personal_bests_tiref ON personal_bests(tiref)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cache_metadata_scraped ON cache_metadata(last_scraped)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_scrape_runs_started ON scrape_runs(started_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_swim_records_version ON swim_records(tiref, row_version)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_personal_bests_version ON personal_bests(tiref, row_version)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_club ON activity_events(club, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_activity_events_tiref ON activity_events(tiref, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_deletions_version ON deletions(tiref, row_version)")
+        
+        # Build the season rollup for databases created before it existed
+        cursor.execute("SELECT EXISTS(SELECT 1 FROM season_bests), EXISTS(SELECT 1 FROM swim_records)")
+        has_rollup, has_records = cursor.fetchone()
+        if has_records and not has_rollup:
+            _backfill_season_bests(cursor)
         
         conn.commit()
         logger.info("Database initialized successfully")
@@ -111,16 +227,200 @@ def init_db():
     finally:
         conn.close()
 
+def _ensure_column(cursor, table: str, column: str, definition: str):
+    """Add a column to an existing table if it is missing"""
+    cursor.execute(f"PRAGMA table_info({table})")
+    if column not in {row['name'] for row in cursor.fetchall()}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def _next_version(cursor) -> int:
+    """Advance the global change counter inside the current transaction"""
+    cursor.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+    cursor.execute("SELECT version FROM data_version WHERE id = 1")
+    return cursor.fetchone()[0]
+
+def _swimmer_club(cursor, tiref: str) -> Optional[str]:
+    """Look up a swimmer's club for denormalising into the activity log"""
+    cursor.execute("SELECT club FROM swimmers WHERE tiref = ?", (tiref,))
+    row = cursor.fetchone()
+    return row['club'] if row else None
+
+# Season of a swim_records row (September to August) when it was not scraped
+_SEASON_SQL = """
+    COALESCE(season, CASE
+        WHEN CAST(strftime('%m', meet_date) AS INTEGER) >= 9
+        THEN strftime('%Y', meet_date) || '-' || (CAST(strftime('%Y', meet_date) AS INTEGER) + 1)
+        ELSE (CAST(strftime('%Y', meet_date) AS INTEGER) - 1) || '-' || strftime('%Y', meet_date)
+    END)
+"""
+
+def _backfill_season_bests(cursor, tiref: Optional[str] = None):
+    """Rebuild the season rollup from swim_records with one grouped query"""
+    where = "WHERE tiref = ?" if tiref else ""
+    params = (tiref,) if tiref else ()
+    cursor.execute(f"DELETE FROM season_bests {where}", params)
+    cursor.execute(f"""
+        INSERT INTO season_bests
+        (tiref, stroke, distance, pool_type, season, best_time, best_time_seconds, races, first_swim, last_swim)
+        SELECT tiref, stroke, distance, pool_type, season,
+               MAX(CASE WHEN best_rank = 1 AND time_seconds IS NOT NULL THEN time END),
+               MIN(time_seconds), COUNT(*), MIN(meet_date), MAX(meet_date)
+        FROM (
+            SELECT tiref, stroke, distance, pool_type, {_SEASON_SQL} AS season,
+                   time, time_seconds, meet_date,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY tiref, stroke, distance, pool_type, {_SEASON_SQL}
+                       ORDER BY time_seconds IS NULL, time_seconds, meet_date
+                   ) AS best_rank
+            FROM swim_records
+            {where}
+        )
+        GROUP BY tiref, stroke, distance, pool_type, season
+    """, params)
+    logger.info(f"Backfilled {cursor.rowcount} season bests")
+
+def _swimmer_gender(cursor, tiref: str) -> str:
+    """Look up a swimmer's gender for picking WA points base times ('' if unknown, which scores 0)"""
+    cursor.execute("SELECT gender FROM swimmers WHERE tiref = ?", (tiref,))
+    row = cursor.fetchone()
+    return (row['gender'] if row else None) or ""
+
+def _rescore_wa_points(conn, recompute_all: bool = False, batch_size: int = 5000,
+                       tiref: Optional[str] = None) -> Dict[str, int]:
+    """Score stored swims and personal bests in id-ordered batches, return rows changed per table.
+    
+    Rows of swimmers whose gender is unknown are skipped, so they are never
+    scored against the wrong gender's base times.
+    """
+    cursor = conn.cursor()
+    updated = {}
+    for table, time_column in (("swim_records", "time_seconds"), ("personal_bests", "best_time_seconds")):
+        missing_only = "" if recompute_all else "AND (t.wa_points IS NULL OR t.wa_points = 0)"
+        swimmer_only = "AND t.tiref = ?" if tiref else ""
+        updated[table] = 0
+        last_id = 0
+        
+        while True:
+            cursor.execute(f"""
+                SELECT t.id, t.wa_points, t.stroke, t.distance, t.pool_type, t.{time_column}, s.gender
+                FROM {table} t
+                JOIN swimmers s ON s.tiref = t.tiref
+                WHERE t.id > ? AND s.gender IS NOT NULL {missing_only} {swimmer_only}
+                ORDER BY t.id
+                LIMIT ?
+            """, (last_id, *([tiref] if tiref else []), batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            last_id = rows[-1]['id']
+            
+            ids, current, strokes, distances, pools, times, genders = zip(*rows)
+            points = points_table.points(np.array(times, dtype=float), strokes, distances, pools, genders).tolist()
+            changes = [
+                (new or old, row_id)
+                for row_id, old, new in zip(ids, current, points)
+                if (new or old) != old
+            ]
+            
+            if changes:
+                version = _next_version(cursor)
+                cursor.executemany(
+                    f"UPDATE {table} SET wa_points = ?, row_version = {version} WHERE id = ?",
+                    changes
+                )
+                updated[table] += len(changes)
+            conn.commit()
+    return updated
+
+def _log_activity(cursor, events: List[tuple]):
+    """Append events to the activity log inside the current transaction"""
+    if events:
+        cursor.executemany("""
+            INSERT INTO activity_events
+            (tiref, club, event_type, event_name, stroke, distance, pool_type, time,
+             time_seconds, previous_time_seconds, improvement_seconds, meet_date, meet_name)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, events)
+
+def _row_to_swim_record(row) -> SwimRecord:
+    """Build a SwimRecord from a swim_records row"""
+    return SwimRecord(
+        id=row['id'],
+        tiref=row['tiref'],
+        event_name=row['event_name'],
+        stroke=row['stroke'],
+        distance=row['distance'],
+        pool_type=row['pool_type'],
+        time=row['time'],
+        time_seconds=row['time_seconds'],
+        wa_points=row['wa_points'],
+        ranking=row['ranking'],
+        meet_date=datetime.fromisoformat(row['meet_date']),
+        venue=row['venue'],
+        meet_name=row['meet_name'],
+        round_type=row['round_type'],
+        season=row['season'],
+        created_at=datetime.fromisoformat(row['created_at'])
+    )
+
+def _placeholders(values) -> str:
+    """Build a ``?, ?, ?`` placeholder list for an IN (...) clause"""
+    return ", ".join("?" for _ in values)
+
+def _row_to_personal_best(row) -> Optional[PersonalBest]:
+    """Build a PersonalBest from a personal_bests row, skipping invalid rows"""
+    try:
+        # Handle potentially invalid date data
+        meet_date = None
+        if row['meet_date']:
+            try:
+                meet_date = datetime.fromisoformat(row['meet_date'])
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Invalid meet_date '{row['meet_date']}' for PB {row['tiref']}: {e}")
+                meet_date = None
+        
+        return PersonalBest(
+            tiref=row['tiref'],
+            event_name=row['event_name'],
+            stroke=row['stroke'],
+            distance=row['distance'],
+            pool_type=row['pool_type'],
+            best_time=row['best_time'],
+            best_time_seconds=row['best_time_seconds'],
+            wa_points=row['wa_points'],
+            meet_date=meet_date,
+            venue=row['venue'],
+            meet_name=row['meet_name'],
+            improvement_from_previous=row['improvement_from_previous']
+        )
+    except Exception as e:
+        logger.error(f"Error creating PersonalBest object for row {dict(row)}: {e}")
+        return None
+
 class SwimmerDatabase:
     """Database operations for swimmers and records"""
     
+    def __init__(self):
+        self._change_listeners: List[Callable[[str], None]] = []
+    
+    def add_change_listener(self, listener: Callable[[str], None]):
+        """Register a callback run with a tiref after its profile or personal bests change"""
+        self._change_listeners.append(listener)
+    
+    def _notify_changed(self, tiref: str):
+        for listener in self._change_listeners:
+            try:
+                listener(tiref)
+            except Exception as e:
+                logger.error(f"Change listener {listener} failed for {tiref}: {e}")
+    
     def get_swimmer(self, tiref: str) -> Optional[SwimmerInfo]:
         """Get swimmer information by tiref"""
         conn = get_db_connection()
         try:
             cursor = conn.cursor()
             cursor.execute("""
-                SELECT tiref, name, club, age_group, last_updated
+                SELECT tiref, name, club, age_group, gender, year_of_birth, last_updated
                 FROM swimmers WHERE tiref = ?
             """, (tiref,))
             
@@ -131,12 +431,42 @@ class SwimmerDatabase:
                     name=row['name'],
                     club=row['club'],
                     age_group=row['age_group'],
+                    gender=row['gender'],
+                    year_of_birth=row['year_of_birth'],
                     last_updated=datetime.fromisoformat(row['last_updated'])
                 )
             return None
         finally:
             conn.close()
     
+    def get_swimmers_batch(self, tirefs: List[str]) -> Dict[str, SwimmerInfo]:
+        """Get swimmer information for several tirefs in one query"""
+        if not tirefs:
+            return {}
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT tiref, name, club, age_group, gender, year_of_birth, last_updated
+                FROM swimmers WHERE tiref IN ({_placeholders(tirefs)})
+            """, tirefs)
+            
+            return {
+                row['tiref']: SwimmerInfo(
+                    tiref=row['tiref'],
+                    name=row['name'],
+                    club=row['club'],
+                    age_group=row['age_group'],
+                    gender=row['gender'],
+                    year_of_birth=row['year_of_birth'],
+                    last_updated=datetime.fromisoformat(row['last_updated'])
+                )
+                for row in cursor.fetchall()
+            }
+        finally:
+            conn.close()
+    
     def save_swimmer(self, swimmer: SwimmerInfo) -> bool:
         """Save or update swimmer information"""
         conn = get_db_connection()
@@ -144,16 +474,25 @@ class SwimmerDatabase:
             cursor = conn.cursor()
             cursor.execute("""
                 INSERT OR REPLACE INTO swimmers 
-                (tiref, name, club, age_group, last_updated)
-                VALUES (?, ?, ?, ?, ?)
+                (tiref, name, club, age_group, gender, year_of_birth, last_updated)
+                VALUES (?, ?, ?, ?, COALESCE(?, (SELECT gender FROM swimmers WHERE tiref = ?)),
+                        COALESCE(?, (SELECT year_of_birth FROM swimmers WHERE tiref = ?)), ?)
             """, (
                 swimmer.tiref,
                 swimmer.name,
                 swimmer.club,
                 swimmer.age_group,
+                swimmer.gender,
+                swimmer.tiref,
+                swimmer.year_of_birth,
+                swimmer.tiref,
                 swimmer.last_updated
             ))
             conn.commit()
+            if swimmer.gender:
+                # Score swims stored while the gender was unknown
+                _rescore_wa_points(conn, tiref=swimmer.tiref)
+            self._notify_changed(swimmer.tiref)
             return True
         except Exception as e:
             conn.rollback()
@@ -162,6 +501,34 @@ class SwimmerDatabase:
         finally:
             conn.close()
     
+    def update_swimmer_profile(self, tiref: str, **fields: Any) -> bool:
+        """Set the given swimmer columns (e.g. gender), leaving the others as they are"""
+        fields = {column: value for column, value in fields.items() if value is not None}
+        if not fields:
+            return False
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE swimmers SET {', '.join(f'{column} = ?' for column in fields)} WHERE tiref = ?",
+                [*fields.values(), tiref]
+            )
+            conn.commit()
+            if cursor.rowcount == 0:
+                return False
+            if fields.get("gender"):
+                # Score swims stored while the gender was unknown
+                _rescore_wa_points(conn, tiref=tiref)
+            self._notify_changed(tiref)
+            return True
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to update swimmer {tiref}: {e}")
+            return False
+        finally:
+            conn.close()
+    
     def get_swim_records(self, tiref: str, limit: Optional[int] = None) -> List[SwimRecord]:
         """Get swim records for a swimmer"""
         conn = get_db_connection()
@@ -178,28 +545,197 @@ class SwimmerDatabase:
             cursor.execute(query, (tiref,))
             rows = cursor.fetchall()
             
-            records = []
-            for row in rows:
-                records.append(SwimRecord(
-                    id=row['id'],
-                    tiref=row['tiref'],
-                    event_name=row['event_name'],
-                    stroke=row['stroke'],
-                    distance=row['distance'],
-                    pool_type=row['pool_type'],
-                    time=row['time'],
-                    time_seconds=row['time_seconds'],
-                    wa_points=row['wa_points'],
-                    ranking=row['ranking'],
-                    meet_date=datetime.fromisoformat(row['meet_date']),
-                    venue=row['venue'],
-                    meet_name=row['meet_name'],
-                    round_type=row['round_type'],
-                    season=row['season'],
-                    created_at=datetime.fromisoformat(row['created_at'])
-                ))
+            return [_row_to_swim_record(row) for row in rows]
+        finally:
+            conn.close()
+    
+    def get_record_columns(self, tirefs: Optional[List[str]] = None, club: Optional[str] = None,
+                           stroke: Optional[str] = None, distance: Optional[int] = None) -> List[tuple]:
+        """Get timed records as plain tuples for vectorized analysis.
+        
+        Rows are ``(tiref, stroke, distance, pool_type, time_seconds,
+        julian_day, season)`` ordered by swimmer, event, pool type and date;
+        seasons missing from the results site are derived from the meet date.
+        """
+        conditions = ["r.time_seconds IS NOT NULL"]
+        params: List[Any] = []
+        if tirefs:
+            conditions.append(f"r.tiref IN ({_placeholders(tirefs)})")
+            params.extend(tirefs)
+        if club:
+            conditions.append("r.tiref IN (SELECT tiref FROM swimmers WHERE club = ?)")
+            params.append(club)
+        if stroke:
+            conditions.append("r.stroke = ?")
+            params.append(stroke)
+        if distance:
+            conditions.append("r.distance = ?")
+            params.append(distance)
+        
+        conn = get_db_connection()
+        conn.row_factory = None
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT r.tiref, r.stroke, r.distance, r.pool_type, r.time_seconds,
+                       julianday(r.meet_date), {_SEASON_SQL}
+                FROM swim_records r
+                WHERE {' AND '.join(conditions)}
+                ORDER BY r.tiref, r.stroke, r.distance, r.pool_type, r.meet_date, r.id
+            """, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    def get_recent_records_by_event(self, tiref: str, per_event: int = 3) -> List[SwimRecord]:
+        """Get the most recent records for each event and pool type"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM (
+                    SELECT r.*, ROW_NUMBER() OVER (
+                        PARTITION BY stroke, distance, pool_type
+                        ORDER BY meet_date DESC, id DESC
+                    ) AS recency
+                    FROM swim_records r WHERE tiref = ?
+                ) WHERE recency <= ?
+                ORDER BY meet_date DESC
+            """, (tiref, per_event))
+            return [_row_to_swim_record(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+    
+    def get_record_stats(self, tiref: str) -> Dict[str, Any]:
+        """Get aggregate race statistics for a swimmer without loading the records"""
+        return self.get_record_stats_batch([tiref])[tiref]
+    
+    def get_record_stats_batch(self, tirefs: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get aggregate race statistics for several swimmers in a fixed number of queries"""
+        stats = {
+            tiref: {
+                'total_races': 0,
+                'average_wa_points': None,
+                'most_common_stroke': None,
+                'most_common_distance': None,
+                'seasons': [],
+                'first_race': None,
+                'last_race': None,
+                'years_active': 0,
+                'personal_bests': 0,
+                'recent_improvements': 0
+            }
+            for tiref in tirefs
+        }
+        if not tirefs:
+            return stats
+        
+        placeholders = _placeholders(tirefs)
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT tiref,
+                       COUNT(*) AS total_races,
+                       AVG(CASE WHEN wa_points > 0 THEN wa_points END) AS average_wa_points,
+                       MIN(meet_date) AS first_race,
+                       MAX(meet_date) AS last_race,
+                       COUNT(DISTINCT substr(meet_date, 1, 4)) AS years_active,
+                       COUNT(DISTINCT CASE WHEN time_seconds IS NOT NULL
+                                           THEN stroke || '|' || distance || '|' || pool_type END) AS personal_bests
+                FROM swim_records WHERE tiref IN ({placeholders})
+                GROUP BY tiref
+            """, tirefs)
+            for row in cursor.fetchall():
+                summary = stats[row['tiref']]
+                summary['total_races'] = row['total_races']
+                summary['average_wa_points'] = row['average_wa_points']
+                summary['first_race'] = datetime.fromisoformat(row['first_race']) if row['first_race'] else None
+                summary['last_race'] = datetime.fromisoformat(row['last_race']) if row['last_race'] else None
+                summary['years_active'] = row['years_active']
+                summary['personal_bests'] = row['personal_bests']
+            
+            # PB improvements (beating every earlier swim in the same event and pool)
+            # within RECENT_IMPROVEMENT_DAYS of each swimmer's latest race
+            cursor.execute(f"""
+                SELECT tiref, COUNT(*) AS recent_improvements
+                FROM (
+                    SELECT tiref, meet_date, time_seconds,
+                           MIN(time_seconds) OVER (
+                               PARTITION BY tiref, stroke, distance, pool_type
+                               ORDER BY meet_date, id
+                               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+                           ) AS previous_best,
+                           MAX(meet_date) OVER (PARTITION BY tiref) AS last_race
+                    FROM swim_records WHERE tiref IN ({placeholders})
+                )
+                WHERE time_seconds < previous_best
+                  AND meet_date >= datetime(last_race, '-{RECENT_IMPROVEMENT_DAYS} days')
+                GROUP BY tiref
+            """, tirefs)
+            for row in cursor.fetchall():
+                stats[row['tiref']]['recent_improvements'] = row['recent_improvements']
+            
+            # Most common stroke and distance: rows arrive highest count first per swimmer
+            for column, key in (('stroke', 'most_common_stroke'), ('distance', 'most_common_distance')):
+                cursor.execute(f"""
+                    SELECT tiref, {column}, COUNT(*) AS races
+                    FROM swim_records WHERE tiref IN ({placeholders})
+                    GROUP BY tiref, {column}
+                    ORDER BY tiref, races DESC
+                """, tirefs)
+                for row in cursor.fetchall():
+                    if stats[row['tiref']][key] is None:
+                        stats[row['tiref']][key] = row[column]
+            
+            cursor.execute(f"""
+                SELECT DISTINCT tiref, season FROM swim_records
+                WHERE tiref IN ({placeholders}) AND season IS NOT NULL AND season != ''
+            """, tirefs)
+            for row in cursor.fetchall():
+                stats[row['tiref']]['seasons'].append(row['season'])
+            
+            return stats
+        finally:
+            conn.close()
+    
+    def iter_export_rows(self, tirefs: Optional[List[str]] = None, club: Optional[str] = None,
+                         batch_size: int = 1000) -> Iterator[tuple]:
+        """Stream raw record rows (EXPORT_COLUMNS order) straight from the cursor.
+        
+        Rows are fetched in batches so memory stays constant regardless of the
+        export size. The connection may be consumed from a different thread
+        than the one that created it, as happens with streaming responses.
+        """
+        conditions = []
+        params: List[Any] = []
+        if tirefs:
+            conditions.append(f"r.tiref IN ({_placeholders(tirefs)})")
+            params.extend(tirefs)
+        if club:
+            conditions.append("s.club = ?")
+            params.append(club)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        
+        conn = get_db_connection(check_same_thread=False)
+        conn.row_factory = None  # Plain tuples are all the exporters need
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT r.tiref, s.name, s.club, r.event_name, r.stroke, r.distance, r.pool_type,
+                       r.time, r.time_seconds, r.wa_points, r.ranking, r.meet_date, r.venue,
+                       r.meet_name, r.round_type, r.season
+                FROM swim_records r
+                JOIN swimmers s ON s.tiref = r.tiref
+                {where}
+                ORDER BY r.tiref, r.meet_date DESC
+            """, params)
             
-            return records
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
         finally:
             conn.close()
     
@@ -213,17 +749,29 @@ class SwimmerDatabase:
         
         try:
             cursor = conn.cursor()
+            version = _next_version(cursor)
+            clubs = {}
+            events = []
+            season_rows = []
+            
+            # Score swims the results site did not give WA points for, in one batch
+            times = [record.time_to_seconds() for record in records]
+            genders = {tiref: _swimmer_gender(cursor, tiref) for tiref in {record.tiref for record in records}}
+            computed_points = points_table.points(
+                [t if t is not None else np.nan for t in times],
+                [record.stroke.value for record in records],
+                [record.distance for record in records],
+                [record.pool_type.value for record in records],
+                [genders[record.tiref] for record in records]
+            ).tolist()
             
-            for record in records:
+            for record, time_seconds, points in zip(records, times, computed_points):
                 try:
-                    # Calculate time in seconds
-                    time_seconds = record.time_to_seconds()
-                    
                     cursor.execute("""
                         INSERT OR IGNORE INTO swim_records 
                         (tiref, event_name, stroke, distance, pool_type, time, time_seconds,
-                         wa_points, ranking, meet_date, venue, meet_name, round_type, season)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                         wa_points, ranking, meet_date, venue, meet_name, round_type, season, row_version)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                     """, (
                         record.tiref,
                         record.event_name,
@@ -232,22 +780,70 @@ class SwimmerDatabase:
                         record.pool_type.value,
                         record.time,
                         time_seconds,
-                        record.wa_points,
+                        record.wa_points or points or None,
                         record.ranking,
                         record.meet_date,
                         record.venue,
                         record.meet_name,
                         record.round_type.value,
-                        record.season
+                        record.season,
+                        version
                     ))
                     
                     if cursor.rowcount > 0:
                         saved_count += 1
+                        season_rows.append((
+                            record.tiref,
+                            record.stroke.value,
+                            record.distance,
+                            record.pool_type.value,
+                            record.season or season_for_date(record.meet_date),
+                            record.time if time_seconds is not None else None,
+                            time_seconds,
+                            record.meet_date,
+                            record.meet_date
+                        ))
+                        
+                        if record.tiref not in clubs:
+                            clubs[record.tiref] = _swimmer_club(cursor, record.tiref)
+                        events.append((
+                            record.tiref,
+                            clubs[record.tiref],
+                            ActivityEventType.RACE.value,
+                            record.event_name,
+                            record.stroke.value,
+                            record.distance,
+                            record.pool_type.value,
+                            record.time,
+                            time_seconds,
+                            None,
+                            None,
+                            record.meet_date,
+                            record.meet_name
+                        ))
                         
                 except Exception as e:
                     logger.warning(f"Failed to save record: {e}")
                     continue
             
+            # Fold the new swims into the season rollup
+            cursor.executemany("""
+                INSERT INTO season_bests
+                (tiref, stroke, distance, pool_type, season, best_time, best_time_seconds, races, first_swim, last_swim)
+                VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(tiref, stroke, distance, pool_type, season) DO UPDATE SET
+                    best_time = CASE
+                        WHEN best_time_seconds IS NULL OR excluded.best_time_seconds < best_time_seconds
+                        THEN COALESCE(excluded.best_time, best_time) ELSE best_time END,
+                    best_time_seconds = CASE
+                        WHEN best_time_seconds IS NULL OR excluded.best_time_seconds < best_time_seconds
+                        THEN COALESCE(excluded.best_time_seconds, best_time_seconds) ELSE best_time_seconds END,
+                    races = races + 1,
+                    first_swim = MIN(first_swim, excluded.first_swim),
+                    last_swim = MAX(last_swim, excluded.last_swim)
+            """, season_rows)
+            
+            _log_activity(cursor, events)
             conn.commit()
             logger.info(f"Saved {saved_count} new records for swimmer {records[0].tiref}")
             
@@ -259,6 +855,30 @@ class SwimmerDatabase:
         
         return saved_count
     
+    def get_season_bests(self, tiref: str, stroke: Optional[str] = None, distance: Optional[int] = None,
+                         pool_type: Optional[str] = None) -> List[sqlite3.Row]:
+        """Get a swimmer's season rollup rows, ordered by event then season"""
+        conditions = ["tiref = ?"]
+        params: List[Any] = [tiref]
+        for column, value in (("stroke", stroke), ("distance", distance), ("pool_type", pool_type)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT stroke, distance, pool_type, season, best_time, best_time_seconds,
+                       races, first_swim, last_swim
+                FROM season_bests
+                WHERE {' AND '.join(conditions)}
+                ORDER BY stroke, distance, pool_type, season
+            """, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
     def get_personal_bests(self, tiref: str) -> List[PersonalBest]:
         """Get personal best records for a swimmer"""
         conn = get_db_connection()
@@ -274,103 +894,163 @@ class SwimmerDatabase:
             bests = []
             
             for row in rows:
-                try:
-                    # Handle potentially invalid date data
-                    meet_date = None
-                    if row['meet_date']:
-                        try:
-                            meet_date = datetime.fromisoformat(row['meet_date'])
-                        except (ValueError, TypeError) as e:
-                            logger.warning(f"Invalid meet_date '{row['meet_date']}' for PB {row['tiref']}: {e}")
-                            meet_date = None
-                    
-                    bests.append(PersonalBest(
-                        tiref=row['tiref'],
-                        event_name=row['event_name'],
-                        stroke=row['stroke'],
-                        distance=row['distance'],
-                        pool_type=row['pool_type'],
-                        best_time=row['best_time'],
-                        best_time_seconds=row['best_time_seconds'],
-                        wa_points=row['wa_points'],
-                        meet_date=meet_date,
-                        venue=row['venue'],
-                        meet_name=row['meet_name'],
-                        improvement_from_previous=row['improvement_from_previous']
-                    ))
-                except Exception as e:
-                    logger.error(f"Error creating PersonalBest object for row {row}: {e}")
-                    continue
+                personal_best = _row_to_personal_best(row)
+                if personal_best:
+                    bests.append(personal_best)
+            
+            return bests
+        finally:
+            conn.close()
+    
+    def get_personal_bests_batch(self, tirefs: List[str]) -> Dict[str, List[PersonalBest]]:
+        """Get personal best records for several swimmers in one query"""
+        bests = {tiref: [] for tiref in tirefs}
+        if not tirefs:
+            return bests
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM personal_bests 
+                WHERE tiref IN ({_placeholders(tirefs)}) 
+                ORDER BY tiref, stroke, distance
+            """, tirefs)
+            
+            for row in cursor.fetchall():
+                personal_best = _row_to_personal_best(row)
+                if personal_best:
+                    bests[row['tiref']].append(personal_best)
             
             return bests
         finally:
             conn.close()
     
     def update_personal_bests(self, tiref: str) -> int:
-        """Recalculate and update personal bests for a swimmer"""
+        """Recalculate personal bests for a swimmer, returning how many changed.
+        
+        Best times for every event are found in a single query and only new or
+        changed PBs are written, stamped with a fresh row version for delta sync.
+        """
         conn = get_db_connection()
         try:
             cursor = conn.cursor()
             
-            # Get all unique events for this swimmer
+            # Best record per event (earliest swim wins ties)
             cursor.execute("""
-                SELECT DISTINCT event_name, stroke, distance, pool_type
-                FROM swim_records 
-                WHERE tiref = ?
+                SELECT * FROM (
+                    SELECT r.*, ROW_NUMBER() OVER (
+                        PARTITION BY event_name, pool_type
+                        ORDER BY time_seconds ASC, meet_date ASC
+                    ) AS best_rank
+                    FROM swim_records r
+                    WHERE tiref = ? AND time_seconds IS NOT NULL
+                ) WHERE best_rank = 1
             """, (tiref,))
+            best_records = cursor.fetchall()
             
-            events = cursor.fetchall()
+            cursor.execute("""
+                SELECT event_name, pool_type, best_time_seconds, meet_date, improvement_from_previous
+                FROM personal_bests WHERE tiref = ?
+            """, (tiref,))
+            existing = {(row['event_name'], row['pool_type']): row for row in cursor.fetchall()}
+            club = _swimmer_club(cursor, tiref)
+            
+            version = None
             updated_count = 0
+            events = []
             
-            for event in events:
-                # Find the best time for this event
-                cursor.execute("""
-                    SELECT * FROM swim_records 
-                    WHERE tiref = ? AND event_name = ? AND pool_type = ?
-                    ORDER BY time_seconds ASC 
-                    LIMIT 1
-                """, (tiref, event['event_name'], event['pool_type']))
-                
-                best_record = cursor.fetchone()
-                if best_record:
-                    # Validate and format the meet_date
-                    meet_date_value = best_record['meet_date']
-                    try:
-                        # Try to parse and format the date properly
-                        if meet_date_value:
-                            # If it's already a proper datetime string, parse and re-format
-                            parsed_date = datetime.fromisoformat(str(meet_date_value).replace('Z', '+00:00'))
-                            formatted_date = parsed_date.isoformat()
-                        else:
-                            formatted_date = None
-                    except (ValueError, TypeError) as e:
-                        logger.warning(f"Invalid meet_date '{meet_date_value}' for record {best_record['tiref']}: {e}")
+            for best_record in best_records:
+                # Validate and format the meet_date
+                meet_date_value = best_record['meet_date']
+                try:
+                    # Try to parse and format the date properly
+                    if meet_date_value:
+                        # If it's already a proper datetime string, parse and re-format
+                        parsed_date = datetime.fromisoformat(str(meet_date_value).replace('Z', '+00:00'))
+                        formatted_date = parsed_date.isoformat()
+                    else:
                         formatted_date = None
-                    
-                    # Insert or update personal best
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO personal_bests 
-                        (tiref, event_name, stroke, distance, pool_type, best_time,
-                         best_time_seconds, wa_points, meet_date, venue, meet_name, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        best_record['tiref'],
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Invalid meet_date '{meet_date_value}' for record {best_record['tiref']}: {e}")
+                    formatted_date = None
+                
+                previous = existing.get((best_record['event_name'], best_record['pool_type']))
+                improvement = None
+                event_type = ActivityEventType.NEW_PB
+                if previous:
+                    if (previous['best_time_seconds'] == best_record['time_seconds']
+                            and previous['meet_date'] == formatted_date):
+                        continue  # Unchanged
+                    if best_record['time_seconds'] < previous['best_time_seconds']:
+                        improvement = round(previous['best_time_seconds'] - best_record['time_seconds'], 2)
+                        event_type = ActivityEventType.PB_IMPROVEMENT
+                    else:
+                        event_type = None  # Rewritten without getting faster
+                
+                if event_type:
+                    events.append((
+                        tiref,
+                        club,
+                        event_type.value,
                         best_record['event_name'],
                         best_record['stroke'],
                         best_record['distance'],
                         best_record['pool_type'],
                         best_record['time'],
                         best_record['time_seconds'],
-                        best_record['wa_points'],
+                        previous['best_time_seconds'] if previous else None,
+                        improvement,
                         formatted_date,
-                        best_record['venue'],
-                        best_record['meet_name'],
-                        datetime.now()
+                        best_record['meet_name']
                     ))
-                    updated_count += 1
+                
+                if version is None:
+                    version = _next_version(cursor)
+                
+                # Insert or update personal best, keeping the row identity stable
+                cursor.execute("""
+                    INSERT INTO personal_bests 
+                    (tiref, event_name, stroke, distance, pool_type, best_time,
+                     best_time_seconds, wa_points, meet_date, venue, meet_name,
+                     improvement_from_previous, updated_at, row_version)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(tiref, event_name, pool_type) DO UPDATE SET
+                        stroke = excluded.stroke,
+                        distance = excluded.distance,
+                        best_time = excluded.best_time,
+                        best_time_seconds = excluded.best_time_seconds,
+                        wa_points = excluded.wa_points,
+                        meet_date = excluded.meet_date,
+                        venue = excluded.venue,
+                        meet_name = excluded.meet_name,
+                        improvement_from_previous = excluded.improvement_from_previous,
+                        updated_at = excluded.updated_at,
+                        row_version = excluded.row_version
+                """, (
+                    best_record['tiref'],
+                    best_record['event_name'],
+                    best_record['stroke'],
+                    best_record['distance'],
+                    best_record['pool_type'],
+                    best_record['time'],
+                    best_record['time_seconds'],
+                    best_record['wa_points'],
+                    formatted_date,
+                    best_record['venue'],
+                    best_record['meet_name'],
+                    improvement,
+                    datetime.now(),
+                    version
+                ))
+                updated_count += 1
+            
+            _log_activity(cursor, events)
             
             conn.commit()
             logger.info(f"Updated {updated_count} personal bests for swimmer {tiref}")
+            if updated_count:
+                self._notify_changed(tiref)
             return updated_count
             
         except Exception as e:
@@ -380,6 +1060,203 @@ class SwimmerDatabase:
         finally:
             conn.close()
     
+    def backfill_wa_points(self, recompute_all: bool = False, batch_size: int = 5000) -> Dict[str, int]:
+        """Recompute stored WA points in id-ordered batches, return rows changed per table.
+        
+        By default only rows without points are scored; ``recompute_all``
+        rescores every row. Rows the base-time table cannot score keep their
+        points, rows of swimmers with no recorded gender are left untouched,
+        and changed rows get a new row version for delta sync.
+        """
+        conn = get_db_connection()
+        try:
+            updated = _rescore_wa_points(conn, recompute_all, batch_size)
+            for table, count in updated.items():
+                logger.info(f"Backfilled WA points for {count} rows in {table}")
+            return updated
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to backfill WA points: {e}")
+            raise
+        finally:
+            conn.close()
+    
+    def get_data_version(self, tiref: Optional[str] = None) -> int:
+        """Get the latest row version across a swimmer's records, personal bests and deletions.
+        
+        Without a tiref, returns the global change counter.
+        """
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            if not tiref:
+                cursor.execute("SELECT version FROM data_version WHERE id = 1")
+                return cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT MAX(
+                    COALESCE((SELECT MAX(row_version) FROM swim_records WHERE tiref = ?), 0),
+                    COALESCE((SELECT MAX(row_version) FROM personal_bests WHERE tiref = ?), 0),
+                    COALESCE((SELECT MAX(row_version) FROM deletions WHERE tiref = ?), 0)
+                )
+            """, (tiref, tiref, tiref))
+            return cursor.fetchone()[0]
+        finally:
+            conn.close()
+    
+    def get_changes(self, tiref: str, since: int = 0) -> Dict[str, Any]:
+        """Get records and personal bests inserted, updated or deleted after a row version.
+        
+        ``since=0`` returns everything, including rows stored before change
+        tracking existed (which carry row version 0), and no deletions.
+        ``deleted`` holds the ids of deleted records, the events of deleted
+        personal bests and whether the swimmer itself was deleted.
+        """
+        after = since if since > 0 else -1
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT * FROM swim_records
+                WHERE tiref = ? AND row_version > ?
+                ORDER BY meet_date DESC
+            """, (tiref, after))
+            record_rows = cursor.fetchall()
+            
+            cursor.execute("""
+                SELECT * FROM personal_bests
+                WHERE tiref = ? AND row_version > ?
+                ORDER BY stroke, distance
+            """, (tiref, after))
+            personal_best_rows = cursor.fetchall()
+            
+            cursor.execute("""
+                SELECT table_name, row_id, stroke, distance, pool_type, row_version FROM deletions
+                WHERE tiref = ? AND row_version > ?
+                ORDER BY row_version, id
+            """, (tiref, since))
+            deletion_rows = cursor.fetchall() if since > 0 else []
+            
+            version = max(
+                [since] + [row['row_version'] for row in record_rows] + [row['row_version'] for row in personal_best_rows]
+                + [row['row_version'] for row in deletion_rows]
+            )
+            personal_bests = [_row_to_personal_best(row) for row in personal_best_rows]
+            
+            return {
+                'version': version,
+                'records': [_row_to_swim_record(row) for row in record_rows],
+                'personal_bests': [pb for pb in personal_bests if pb],
+                'deleted': {
+                    'swimmer': any(row['table_name'] == 'swimmers' for row in deletion_rows),
+                    'records': [row['row_id'] for row in deletion_rows if row['table_name'] == 'swim_records'],
+                    'personal_bests': [
+                        {'stroke': row['stroke'], 'distance': row['distance'], 'pool_type': row['pool_type']}
+                        for row in deletion_rows if row['table_name'] == 'personal_bests'
+                    ]
+                }
+            }
+        finally:
+            conn.close()
+    
+    def get_ranking_entries(self, tiref: Optional[str] = None, club: Optional[str] = None) -> List[sqlite3.Row]:
+        """Get personal bests joined with swimmer club/age group/gender/year of birth for rankings and standards"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            query = """
+                SELECT p.tiref, s.name, s.club, s.age_group, s.gender, s.year_of_birth, p.stroke, p.distance,
+                       p.pool_type, p.best_time, p.best_time_seconds
+                FROM personal_bests p
+                JOIN swimmers s ON s.tiref = p.tiref
+            """
+            if tiref:
+                cursor.execute(query + " WHERE p.tiref = ?", (tiref,))
+            elif club:
+                cursor.execute(query + " WHERE s.club = ?", (club,))
+            else:
+                cursor.execute(query)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    def get_club_personal_bests(self, club: str, distance: int, pool_type: str, strokes: List[str],
+                                genders: List[str], age_group: Optional[str] = None) -> List[sqlite3.Row]:
+        """Get personal bests at one distance for every swimmer of the given genders in a club.
+        
+        Swimmers with no recorded gender are included (gender None) so callers can report them.
+        """
+        conditions = [
+            "s.club = ?", "p.distance = ?", "p.pool_type = ?",
+            f"p.stroke IN ({_placeholders(strokes)})", f"(s.gender IN ({_placeholders(genders)}) OR s.gender IS NULL)",
+            "p.best_time_seconds IS NOT NULL"
+        ]
+        params: List[Any] = [club, distance, pool_type, *strokes, *genders]
+        if age_group:
+            conditions.append("s.age_group = ?")
+            params.append(age_group)
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT p.tiref, s.name, s.gender, p.stroke, p.best_time, p.best_time_seconds
+                FROM personal_bests p
+                JOIN swimmers s ON s.tiref = p.tiref
+                WHERE {' AND '.join(conditions)}
+            """, params)
+            return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    def get_activity_events(self, after: int = 0, club: Optional[str] = None, tiref: Optional[str] = None,
+                            event_types: Optional[List[str]] = None, limit: int = 100) -> List[ActivityEvent]:
+        """Read the activity log after a cursor position, oldest first"""
+        conditions = ["id > ?"]
+        params: List[Any] = [after]
+        if club:
+            conditions.append("club = ?")
+            params.append(club)
+        if tiref:
+            conditions.append("tiref = ?")
+            params.append(tiref)
+        if event_types:
+            conditions.append(f"event_type IN ({_placeholders(event_types)})")
+            params.extend(event_types)
+        params.append(limit)
+        
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT * FROM activity_events
+                WHERE {' AND '.join(conditions)}
+                ORDER BY id
+                LIMIT ?
+            """, params)
+            
+            return [
+                ActivityEvent(
+                    id=row['id'],
+                    tiref=row['tiref'],
+                    club=row['club'],
+                    event_type=row['event_type'],
+                    event_name=row['event_name'],
+                    stroke=row['stroke'],
+                    distance=row['distance'],
+                    pool_type=row['pool_type'],
+                    time=row['time'],
+                    time_seconds=row['time_seconds'],
+                    previous_time_seconds=row['previous_time_seconds'],
+                    improvement_seconds=row['improvement_seconds'],
+                    meet_date=datetime.fromisoformat(row['meet_date']) if row['meet_date'] else None,
+                    meet_name=row['meet_name'],
+                    created_at=datetime.fromisoformat(row['created_at'])
+                )
+                for row in cursor.fetchall()
+            ]
+        finally:
+            conn.close()
+    
     def update_cache_metadata(self, tiref: str, records_count: int, success: bool = True, error_message: str = None):
         """Update cache metadata for a swimmer"""
         conn = get_db_connection()
@@ -419,6 +1296,68 @@ class SwimmerDatabase:
         finally:
             conn.close()
     
+    def save_scrape_run(self, tiref: str, timings: Dict[str, Any], success: bool, error_message: str = None):
+        """Store the stage timing breakdown of one scrape"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT INTO scrape_runs
+                (tiref, started_at, success, wall_seconds, bytes_fetched, pages, rows_parsed, rows_inserted,
+                 stages, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                tiref, timings['started_at'], success, timings['wall_seconds'],
+                timings.get('bytes_fetched', 0), timings.get('pages', 0),
+                timings.get('rows_parsed', 0), timings.get('rows_inserted', 0),
+                json.dumps(timings['stages']), error_message
+            ))
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            logger.error(f"Failed to save scrape run for {tiref}: {e}")
+        finally:
+            conn.close()
+    
+    def get_scrape_runs(self, since: Optional[datetime] = None, tiref: Optional[str] = None,
+                        limit: int = 1000) -> List[Dict[str, Any]]:
+        """Most recent scrape runs, newest first"""
+        conn = get_db_connection()
+        try:
+            cursor = conn.cursor()
+            conditions, params = [], []
+            if since is not None:
+                conditions.append("started_at >= ?")
+                params.append(since)
+            if tiref:
+                conditions.append("tiref = ?")
+                params.append(tiref)
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            cursor.execute(f"""
+                SELECT * FROM scrape_runs {where}
+                ORDER BY started_at DESC, id DESC
+                LIMIT ?
+            """, params + [limit])
+            
+            return [
+                {
+                    'id': row['id'],
+                    'tiref': row['tiref'],
+                    'started_at': datetime.fromisoformat(row['started_at']),
+                    'success': bool(row['success']),
+                    'wall_seconds': row['wall_seconds'],
+                    'bytes_fetched': row['bytes_fetched'],
+                    'pages': row['pages'],
+                    'rows_parsed': row['rows_parsed'],
+                    'rows_inserted': row['rows_inserted'],
+                    'stages': json.loads(row['stages']),
+                    'error_message': row['error_message']
+                }
+                for row in cursor.fetchall()
+            ]
+        finally:
+            conn.close()
+    
     def list_swimmers(self) -> List[SwimmerInfo]:
         """Get all swimmers in the database"""
         conn = get_db_connection()
@@ -440,6 +1379,8 @@ class SwimmerDatabase:
                     name=row['name'],
                     club=row['club'],
                     age_group=row['age_group'],
+                    gender=row['gender'],
+                    year_of_birth=row['year_of_birth'],
                     last_updated=datetime.fromisoformat(row['last_updated'])
                 ))
             
@@ -448,19 +1389,34 @@ class SwimmerDatabase:
             conn.close()
     
     def delete_swimmer(self, tiref: str) -> bool:
-        """Delete a swimmer and all associated data"""
+        """Delete a swimmer and all associated data, leaving tombstones for delta sync"""
         conn = get_db_connection()
         try:
             cursor = conn.cursor()
             
+            # Record what is deleted so /changes can report it
+            version = _next_version(cursor)
+            for table in ("swim_records", "personal_bests"):
+                cursor.execute(f"""
+                    INSERT INTO deletions (tiref, table_name, row_id, stroke, distance, pool_type, row_version)
+                    SELECT tiref, '{table}', id, stroke, distance, pool_type, ? FROM {table} WHERE tiref = ?
+                """, (version, tiref))
+            cursor.execute("""
+                INSERT INTO deletions (tiref, table_name, row_id, row_version)
+                SELECT tiref, 'swimmers', rowid, ? FROM swimmers WHERE tiref = ?
+            """, (version, tiref))
+            
             # Delete in order due to foreign key constraints
             cursor.execute("DELETE FROM cache_metadata WHERE tiref = ?", (tiref,))
+            cursor.execute("DELETE FROM activity_events WHERE tiref = ?", (tiref,))
+            cursor.execute("DELETE FROM season_bests WHERE tiref = ?", (tiref,))
             cursor.execute("DELETE FROM personal_bests WHERE tiref = ?", (tiref,))
             cursor.execute("DELETE FROM swim_records WHERE tiref = ?", (tiref,))
             cursor.execute("DELETE FROM swimmers WHERE tiref = ?", (tiref,))
             
             conn.commit()
             logger.info(f"Deleted swimmer {tiref} and all associated data")
+            self._notify_changed(tiref)
             return True
             
         except Exception as e:
@@ -470,5 +1426,8 @@ class SwimmerDatabase:
         finally:
             conn.close()
 
+# Time every public database method for /api/metrics
+instrument_methods(SwimmerDatabase, exclude=("add_change_listener",))
+
 # Create a global database instance
 db = SwimmerDatabase()
@@ -1,21 +1,55 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse
 import uvicorn
 from contextlib import asynccontextmanager
+import asyncio
 import logging
 import os
+import time
 from pathlib import Path
 
 from app.database.database import init_db
 from app.api.swimmers import router as swimmers_router
 from app.api.scraper import router as scraper_router
+from app.api.feed import router as feed_router
+from app.api.clubs import router as clubs_router
+from app.api.rankings import router as rankings_router
+from app.api.metrics import router as metrics_router
+from app.api.admin import router as admin_router
+from app.monitoring.metrics import HTTP_REQUEST_SECONDS
+from app.monitoring.profiling import request_profiler
+from app.monitoring import queries
+from app import scraper
+from app.web.static_assets import SiteAssets
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Build the scraper in the background after startup instead of on the first scrape
+SCRAPER_WARMUP = os.getenv("SCRAPER_WARMUP", "true").lower() in ("1", "true", "yes")
+
+# Seconds to wait after startup before warming up, so the server is already accepting requests
+SCRAPER_WARMUP_DELAY = float(os.getenv("SCRAPER_WARMUP_DELAY", "1.0"))
+
+async def warm_up_scraper():
+    """Import the scraper's dependencies and build it off the event loop"""
+    await asyncio.sleep(SCRAPER_WARMUP_DELAY)
+    started = time.perf_counter()
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, scraper.warm_up)
+        logger.info(f"Scraper warmed up in {time.perf_counter() - started:.2f}s")
+    except Exception as e:
+        logger.warning(f"Scraper warm-up failed, it will be built on first use: {e}")
+
+async def preload_static_assets():
+    """Load the frontend build into memory off the event loop"""
+    try:
+        await asyncio.get_running_loop().run_in_executor(None, site_assets.preload)
+    except Exception as e:
+        logger.warning(f"Static asset preload failed, files will load on first request: {e}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -27,10 +61,16 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to initialize database: {e}")
         raise
     
+    warm_up = asyncio.create_task(warm_up_scraper()) if SCRAPER_WARMUP else None
+    preload = asyncio.create_task(preload_static_assets()) if site_assets.available else None
+    
     yield
     
     # Shutdown
     logger.info("Shutting down SwimBuddy Pro API...")
+    for task in (warm_up, preload):
+        if task and not task.done():
+            task.cancel()
 
 app = FastAPI(
     title="SwimBuddy Pro API",
@@ -48,25 +88,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Serve static files (frontend build)
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Record request latency labelled by route template"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            request.method,
+            getattr(route, "path", "unmatched"),
+            str(status)
+        )
+
+@app.middleware("http")
+async def profile_requests(request: Request, call_next):
+    """Profile requests on demand, by sampling or after a slow response"""
+    return await request_profiler.dispatch(request, call_next)
+
+@app.middleware("http")
+async def count_queries(request: Request, call_next):
+    """Report each request's database round trips and flag N+1 patterns"""
+    return await queries.dispatch(request, call_next)
+
+# Serve static files (frontend build) from memory
 static_dir = Path(__file__).parent.parent / "static"
+site_assets = SiteAssets(static_dir)
 if static_dir.exists():
-    app.mount("/assets", StaticFiles(directory=static_dir / "assets"), name="assets")
+    app.mount("/assets", site_assets.assets, name="assets")
     # Mount static files for other assets like favicon, etc.
-    app.mount("/static", StaticFiles(directory=static_dir), name="static")
+    app.mount("/static", site_assets.files, name="static")
 
 # Include routers
 app.include_router(swimmers_router, prefix="/api/swimmers", tags=["swimmers"])
 app.include_router(scraper_router, prefix="/api/scraper", tags=["scraper"])
+app.include_router(feed_router, prefix="/api/feed", tags=["feed"])
+app.include_router(clubs_router, prefix="/api/clubs", tags=["clubs"])
+app.include_router(rankings_router, prefix="/api/rankings", tags=["rankings"])
+app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
+app.include_router(admin_router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Serve the frontend application"""
-    static_dir = Path(__file__).parent.parent / "static"
-    index_file = static_dir / "index.html"
-    
-    if index_file.exists():
-        return FileResponse(index_file)
+    index = site_assets.index(request)
+    if index is not None:
+        return index
     else:
         return {
             "message": "SwimBuddy Pro API",
@@ -77,17 +149,15 @@ async def root():
 
 # Catch-all route for SPA routing (must be last)
 @app.get("/{path:path}")
-async def catch_all(path: str):
+async def catch_all(path: str, request: Request):
     """Serve the frontend application for all non-API routes"""
     # Don't serve SPA for API routes
     if path.startswith("api/"):
         raise HTTPException(status_code=404, detail="API endpoint not found")
     
-    static_dir = Path(__file__).parent.parent / "static"
-    index_file = static_dir / "index.html"
-    
-    if index_file.exists():
-        return FileResponse(index_file)
+    index = site_assets.index(request)
+    if index is not None:
+        return index
     else:
         raise HTTPException(status_code=404, detail="Page not found")
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 from enum import Enum
 
@@ -20,12 +20,32 @@ class RoundType(str, Enum):
     SEMI_FINALS = "SF"
     PRELIMINARY = "P"
 
+class RelayType(str, Enum):
+    MEDLEY = "medley"
+    FREESTYLE = "freestyle"
+
+class Gender(str, Enum):
+    MALE = "M"
+    FEMALE = "F"
+
+class RelayGender(str, Enum):
+    MALE = "M"
+    FEMALE = "F"
+    MIXED = "X"  # Two men and two women
+
+class ActivityEventType(str, Enum):
+    RACE = "race"
+    NEW_PB = "new_pb"
+    PB_IMPROVEMENT = "pb_improvement"
+
 class SwimmerInfo(BaseModel):
     """Swimmer personal information"""
     tiref: str = Field(..., description="Swimmer's membership ID")
     name: str = Field(..., description="Swimmer's full name")
     club: Optional[str] = Field(None, description="Swimming club")
     age_group: Optional[str] = Field(None, description="Age group category")
+    gender: Optional[str] = Field(None, description="'M' or 'F', used for WA points base times")
+    year_of_birth: Optional[int] = Field(None, description="Year of birth, used for age bands")
     last_updated: datetime = Field(default_factory=datetime.now)
 
 class SwimRecord(BaseModel):
@@ -130,6 +150,31 @@ class ScrapeResponse(BaseModel):
     swimmer_info: Optional[SwimmerInfo]
     last_updated: datetime
     from_cache: bool = Field(False, description="Whether data was loaded from cache")
+    timings: Optional[Dict[str, Any]] = Field(None, description="Per-stage timing breakdown of a fresh scrape, when requested")
+
+class ActivityEvent(BaseModel):
+    """Entry in the global activity feed (new race, new PB or PB improvement)"""
+    id: int = Field(..., description="Feed cursor position")
+    tiref: str
+    club: Optional[str] = None
+    event_type: ActivityEventType
+    event_name: str
+    stroke: StrokeType
+    distance: int
+    pool_type: PoolType
+    time: str
+    time_seconds: Optional[float] = None
+    previous_time_seconds: Optional[float] = Field(None, description="Previous PB for PB improvements")
+    improvement_seconds: Optional[float] = Field(None, description="Seconds taken off the previous PB")
+    meet_date: Optional[datetime] = None
+    meet_name: Optional[str] = None
+    created_at: datetime
+
+class FeedResponse(BaseModel):
+    """Response model for the activity feed"""
+    events: List[ActivityEvent]
+    next_cursor: int = Field(..., description="Pass as ?after= to continue reading")
+    has_more: bool
 
 class ErrorResponse(BaseModel):
     """Error response model"""
@@ -143,12 +188,53 @@ class SwimmerListResponse(BaseModel):
     swimmers: List[SwimmerInfo]
     total: int
 
+class BatchSwimmersRequest(BaseModel):
+    """Request model for reading several swimmers at once"""
+    tirefs: List[str] = Field(..., description="Swimmer membership IDs to fetch")
+
+class SwimmerProfileUpdate(BaseModel):
+    """Request model for recording swimmer details the results site may not show"""
+    gender: Optional[Gender] = Field(None, description="'M' or 'F'")
+    year_of_birth: Optional[int] = Field(None, ge=1900, le=2100, description="Year of birth")
+
+class RelayOptimizerRequest(BaseModel):
+    """Request model for the club relay optimizer"""
+    relay_type: RelayType = Field(RelayType.MEDLEY, description="Medley or freestyle relay")
+    gender: RelayGender = Field(..., description="'M' or 'F', or 'X' for a mixed relay of two men and two women")
+    distance: int = Field(50, description="Leg distance in meters")
+    pool_type: PoolType = Field(PoolType.LONG_COURSE, description="Pool type of the personal bests to use")
+    age_group: Optional[str] = Field(None, description="Only consider swimmers in this age group")
+    top_k: int = Field(5, ge=1, le=50, description="Number of lineups to return per squad")
+    squads: int = Field(1, ge=1, le=10, description="Number of disjoint squads (A, B, ...)")
+    required: List[str] = Field(default_factory=list, description="Tirefs that must swim in the A squad")
+    excluded: List[str] = Field(default_factory=list, description="Tirefs that are unavailable")
+
+class RollingBest(BaseModel):
+    """Point in an event's personal best progression"""
+    date: datetime
+    time_seconds: float
+
+class SeasonBest(BaseModel):
+    """Best time in one season for an event"""
+    season: Optional[str]
+    best_time_seconds: float
+    races: int
+    delta_seconds: Optional[float] = Field(None, description="Seconds faster than the previous season's best")
+
 class PerformanceAnalysis(BaseModel):
     """Performance analysis data"""
     tiref: str
     stroke: Optional[StrokeType]
     distance: Optional[int]
+    pool_type: Optional[PoolType] = None
+    races: int = 0
     improvement_trend: float  # Positive = improving, negative = declining
     consistency_score: float  # 0-100, higher = more consistent
-    recent_performance: List[SwimRecord]
-    personal_bests: List[PersonalBest]
+    best_time_seconds: Optional[float] = None
+    equivalent_pool_type: Optional[PoolType] = None
+    best_time_equivalent_seconds: Optional[float] = None  # Best time converted to the other pool type
+    latest_time_seconds: Optional[float] = None
+    rolling_bests: List[RollingBest] = Field(default_factory=list)
+    season_bests: List[SeasonBest] = Field(default_factory=list)
+    recent_performance: List[SwimRecord] = Field(default_factory=list)
+    personal_bests: List[PersonalBest] = Field(default_factory=list)
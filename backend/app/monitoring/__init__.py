@@ -0,0 +1 @@
+# Empty file to make this a Python package
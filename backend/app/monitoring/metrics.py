@@ -0,0 +1,228 @@
+"""In-process metrics rendered in the Prometheus text exposition format.
+
+Counters and histograms are kept in plain dictionaries guarded by a lock,
+so recording a sample is a dictionary update and no exporter process or
+client library is needed. ``GET /api/metrics`` renders the registry.
+"""
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, List, Sequence, Tuple
+import inspect
+import threading
+import time
+
+# Upper bounds (seconds) for latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Counter:
+    """Monotonically increasing value per label set"""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values: str, amount: float = 1.0):
+        key = tuple(str(v) for v in label_values)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def value(self, *label_values: str) -> float:
+        return self._values.get(tuple(str(v) for v in label_values), 0.0)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set"""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values: Dict[LabelValues, List[float]] = {}  # Per-bucket counts, then sum and count
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *label_values: str):
+        key = tuple(str(v) for v in label_values)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [0.0] * (len(self.buckets) + 3)
+            series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+    
+    def time(self, *label_values: str):
+        """Context manager observing the wall time of a block"""
+        return _Timer(self, label_values)
+    
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._values.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {int(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {int(series[-1])}")
+        return lines
+
+class _Timer:
+    def __init__(self, histogram: Histogram, label_values: Sequence[str]):
+        self.histogram = histogram
+        self.label_values = label_values
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, *self.label_values)
+        return False
+
+class RatioGauge:
+    """Hit ratio per cache, derived from a (cache, result) counter when rendered"""
+    
+    type_name = "gauge"
+    
+    def __init__(self, name: str, documentation: str, counter: Counter):
+        self.name = name
+        self.documentation = documentation
+        self.counter = counter
+    
+    def samples(self) -> List[str]:
+        with self.counter._lock:
+            values = dict(self.counter._values)
+        lines = []
+        for cache in sorted({cache for cache, _ in values}):
+            hits = values.get((cache, "hit"), 0.0)
+            total = hits + values.get((cache, "miss"), 0.0)
+            if total:
+                lines.append(f"{self.name}{_format_labels(('cache',), (cache,))} {_format_value(hits / total)}")
+        return lines
+
+class Registry:
+    """Collection of metrics rendered together"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+    
+    def register(self, metric):
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+    
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "swimbuddy_http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+))
+DB_CALL_SECONDS = registry.register(Histogram(
+    "swimbuddy_db_call_duration_seconds", "SwimmerDatabase method latency", ("method",)
+))
+DB_CALL_ERRORS = registry.register(Counter(
+    "swimbuddy_db_call_errors_total", "SwimmerDatabase method calls that raised", ("method",)
+))
+UPSTREAM_REQUESTS = registry.register(Counter(
+    "swimbuddy_upstream_requests_total", "Requests to the results site by HTTP status", ("status",)
+))
+UPSTREAM_REQUEST_SECONDS = registry.register(Histogram(
+    "swimbuddy_upstream_request_duration_seconds", "Latency of requests to the results site", ("status",)
+))
+UPSTREAM_RETRIES = registry.register(Counter(
+    "swimbuddy_upstream_retries_total", "Retried requests to the results site"
+))
+RATE_LIMIT_SLEEP_SECONDS = registry.register(Counter(
+    "swimbuddy_rate_limit_sleep_seconds_total", "Time spent sleeping in the scraper rate limiter"
+))
+CACHE_REQUESTS = registry.register(Counter(
+    "swimbuddy_cache_requests_total", "Cache lookups by cache and result (hit or miss)", ("cache", "result")
+))
+
+CACHE_HIT_RATIO = registry.register(RatioGauge(
+    "swimbuddy_cache_hit_ratio", "Fraction of cache lookups that hit", CACHE_REQUESTS
+))
+
+def record_cache(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+def instrument_methods(cls, histogram: Histogram = DB_CALL_SECONDS, errors: Counter = DB_CALL_ERRORS,
+                       exclude: Sequence[str] = ()):
+    """Time every public method of ``cls`` not in ``exclude``, labelled by method name.
+    
+    Generator methods are timed until they are exhausted or closed, so
+    streaming reads are measured end to end.
+    """
+    for name, method in list(vars(cls).items()):
+        if name.startswith("_") or name in exclude or not inspect.isfunction(method):
+            continue
+        setattr(cls, name, _timed(name, method, histogram, errors))
+    return cls
+
+def _timed(name: str, method: Callable, histogram: Histogram, errors: Counter) -> Callable:
+    if inspect.isgeneratorfunction(method):
+        @wraps(method)
+        def timed_generator(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                yield from method(*args, **kwargs)
+            except Exception:
+                errors.inc(name)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - start, name)
+        return timed_generator
+    
+    @wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception:
+            errors.inc(name)
+            raise
+        finally:
+            histogram.observe(time.perf_counter() - start, name)
+    return timed
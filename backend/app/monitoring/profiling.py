@@ -0,0 +1,209 @@
+"""On-demand request profiling.
+
+Requests are profiled with ``cProfile`` when they carry the admin token in
+the ``X-Profile`` header, when they fall inside ``PROFILE_SAMPLE_RATE``, or
+when their route was recently slow. A request slower than
+``SLOW_REQUEST_MS`` that was not being profiled arms its route, so the
+next ``PROFILE_ARMED_REQUESTS`` requests to it are profiled and kept if
+they are slow again. Profiles are written as pstats files with a JSON
+sidecar to ``PROFILE_DIR``, which is trimmed to ``PROFILE_MAX_FILES``.
+
+Only one request is profiled at a time, and the profiler follows the event
+loop thread. Async endpoints, which is all of them here, are captured in
+full, though work from other requests running at the same time on the
+loop can show up too.
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+# Token that enables profiling headers and the admin endpoints (unset disables both)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "profiles"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "50"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_ARMED_REQUESTS = int(os.getenv("PROFILE_ARMED_REQUESTS", "3"))
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "2000"))
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+def check_admin_token(token: Optional[str]) -> bool:
+    """Whether ``token`` matches the configured admin token"""
+    if not ADMIN_TOKEN or not token:
+        return False
+    return hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+class ProfileStore:
+    """Bounded ring of profiles on disk, oldest dropped first"""
+    
+    def __init__(self, directory: Path = PROFILE_DIR, max_files: int = PROFILE_MAX_FILES):
+        self.directory = directory
+        self.max_files = max_files
+        self._lock = threading.Lock()
+    
+    def _paths(self) -> List[Path]:
+        if not self.directory.exists():
+            return []
+        return sorted(self.directory.glob("*.json"))
+    
+    def _profile_path(self, profile_id: str) -> Path:
+        if not re.fullmatch(r"[\w-]+", profile_id):
+            raise KeyError(profile_id)
+        return self.directory / f"{profile_id}.prof"
+    
+    def save(self, profile: cProfile.Profile, metadata: Dict[str, Any]) -> str:
+        """Write a profile and its metadata, then trim the ring"""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r"[^\w]+", "_", metadata["route"]).strip("_")[:40] or "root"
+            profile_id = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{slug}"
+            metadata = {"id": profile_id, **metadata}
+            profile.dump_stats(str(self.directory / f"{profile_id}.prof"))
+            (self.directory / f"{profile_id}.json").write_text(json.dumps(metadata), encoding="utf-8")
+            
+            paths = self._paths()
+            for stale in paths[:max(len(paths) - self.max_files, 0)]:
+                stale.unlink(missing_ok=True)
+                stale.with_suffix(".prof").unlink(missing_ok=True)
+        return profile_id
+    
+    def list(self) -> List[Dict[str, Any]]:
+        """Metadata of every stored profile, newest first"""
+        profiles = []
+        for path in reversed(self._paths()):
+            try:
+                profiles.append(json.loads(path.read_text(encoding="utf-8")))
+            except (OSError, ValueError):
+                continue
+        return profiles
+    
+    def metadata(self, profile_id: str) -> Dict[str, Any]:
+        path = self._profile_path(profile_id).with_suffix(".json")
+        if not path.exists():
+            raise KeyError(profile_id)
+        return json.loads(path.read_text(encoding="utf-8"))
+    
+    def path(self, profile_id: str) -> Path:
+        path = self._profile_path(profile_id)
+        if not path.exists():
+            raise KeyError(profile_id)
+        return path
+    
+    def top_functions(self, profile_id: str, sort: str = "cumulative", limit: int = 30) -> List[Dict[str, Any]]:
+        """Hottest functions of a stored profile"""
+        stats = pstats.Stats(str(self.path(profile_id))).stats
+        column = {"cumulative": 3, "tottime": 2, "calls": 1}[sort]
+        rows = sorted(stats.items(), key=lambda item: item[1][column], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{filename}:{line}({name})",
+                "primitive_calls": primitive_calls,
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6)
+            }
+            for (filename, line, name), (primitive_calls, calls, tottime, cumtime, _) in rows
+        ]
+
+class RequestProfiler:
+    """Decides which requests to profile and stores the results"""
+    
+    def __init__(self, store: ProfileStore, sample_rate: float = PROFILE_SAMPLE_RATE,
+                 slow_ms: float = SLOW_REQUEST_MS, armed_requests: int = PROFILE_ARMED_REQUESTS):
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_ms / 1000
+        self.armed_requests = armed_requests
+        self._armed: Dict[str, int] = {}
+        self._active = threading.Lock()
+    
+    @staticmethod
+    def _route_path(request) -> str:
+        """Route template for a request that has not been routed yet"""
+        for route in request.app.router.routes:
+            match, _ = route.matches(request.scope)
+            if match == Match.FULL:
+                return getattr(route, "path", request.url.path)
+        return request.url.path
+    
+    def _reason(self, request) -> Optional[str]:
+        if check_admin_token(request.headers.get(PROFILE_HEADER)):
+            return "requested"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "sampled"
+        if self._armed:
+            route = self._route_path(request)
+            remaining = self._armed.get(route)
+            if remaining:
+                if remaining > 1:
+                    self._armed[route] = remaining - 1
+                else:
+                    self._armed.pop(route, None)
+                return "armed"
+        return None
+    
+    async def dispatch(self, request, call_next):
+        reason = self._reason(request)
+        if reason is None or not self._active.acquire(blocking=False):
+            start = time.perf_counter()
+            response = await call_next(request)
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.slow_seconds and self.armed_requests:
+                route = getattr(request.scope.get("route"), "path", request.url.path)
+                if route not in self._armed:
+                    logger.warning(f"Slow request {request.method} {request.url.path} took {elapsed * 1000:.0f}ms; "
+                                   f"profiling the next {self.armed_requests} requests to {route}")
+                    self._armed[route] = self.armed_requests
+            return response
+        
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                response = await call_next(request)
+            finally:
+                profile.disable()
+        finally:
+            self._active.release()
+        elapsed = time.perf_counter() - start
+        
+        slow = elapsed >= self.slow_seconds
+        if reason == "armed" and not slow:
+            return response
+        try:
+            profile_id = self.store.save(profile, {
+                "method": request.method,
+                "path": request.url.path,
+                "query": request.url.query,
+                "route": getattr(request.scope.get("route"), "path", request.url.path),
+                "status": response.status_code,
+                "duration_ms": round(elapsed * 1000, 2),
+                "reason": reason,
+                "slow": slow,
+                "created_at": datetime.now().isoformat()
+            })
+            response.headers[PROFILE_ID_HEADER] = profile_id
+        except Exception as e:
+            logger.error(f"Failed to save profile for {request.url.path}: {e}")
+        return response
+
+# Create the global profile store and request profiler
+profile_store = ProfileStore()
+request_profiler = RequestProfiler(profile_store)
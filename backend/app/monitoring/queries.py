@@ -0,0 +1,228 @@
+"""Per-request database query accounting.
+
+``get_db_connection`` opens ``TrackedConnection`` objects whose cursors
+report every statement to the ``QueryStats`` current in the context, when
+there is one. Stats count connections opened, statements executed, rows
+fetched and time spent in SQLite, and group statements by shape (the SQL
+with literals and ``IN`` lists collapsed) so that one shape repeated
+within a request can be flagged as an N+1 pattern. The HTTP middleware
+starts a ``QueryStats`` for each request and always logs N+1 patterns; it
+reports the stats in the ``X-Query-Stats`` header only when
+``QUERY_STATS_HEADER_ENABLED`` is set or the request carries the admin
+token in ``X-Admin-Token``. Streamed responses (no ``Content-Length``,
+such as the exports) run most of their queries after the headers are
+sent, so their header only says ``streamed`` and the final stats are
+logged when the body is finished. Tests can use ``track_queries``
+directly or check a buffered response with ``assert_query_budget``.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from app.monitoring.profiling import check_admin_token
+
+logger = logging.getLogger(__name__)
+
+# Times one statement shape may run in a request before it is reported as N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+QUERY_STATS_HEADER = "X-Query-Stats"
+
+# Send X-Query-Stats on every response (otherwise only to requests with the admin token)
+QUERY_STATS_HEADER_ENABLED = os.getenv("QUERY_STATS_HEADER_ENABLED", "false").lower() in ("1", "true", "yes")
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+
+# Header value for responses whose queries are still running when headers are sent
+STREAMED = "streamed"
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+def statement_shape(sql: str) -> str:
+    """SQL with whitespace normalized and literals and placeholder lists collapsed"""
+    shape = _WHITESPACE.sub(" ", sql).strip()
+    shape = _LITERAL.sub("?", shape)
+    return _IN_LIST.sub("(?+)", shape)
+
+class QueryStats:
+    """Database work done on behalf of one request or tracked block"""
+    
+    def __init__(self):
+        self.connections = 0
+        self.queries = 0
+        self.rows = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def record_query(self, sql: str, seconds: float):
+        shape = statement_shape(sql)
+        with self._lock:
+            self.queries += 1
+            self.seconds += seconds
+            self.shapes[shape] = self.shapes.get(shape, 0) + 1
+    
+    def record_rows(self, rows: int):
+        with self._lock:
+            self.rows += rows
+    
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+    
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> Dict[str, int]:
+        """Statement shapes executed at least ``threshold`` times"""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+    
+    def header_value(self) -> str:
+        return (f"queries={self.queries}; connections={self.connections}; rows={self.rows}; "
+                f"db_ms={self.seconds * 1000:.1f}; n_plus_one={len(self.repeated())}")
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "queries": self.queries,
+            "connections": self.connections,
+            "rows": self.rows,
+            "db_ms": round(self.seconds * 1000, 2),
+            "n_plus_one": self.repeated()
+        }
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+@contextmanager
+def track_queries():
+    """Collect query stats for the enclosed block (and tasks or threads started from its context)"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+class TrackedCursor(sqlite3.Cursor):
+    """Cursor that reports statements and fetched rows to the current QueryStats"""
+    
+    def _timed(self, method, sql: str, *args):
+        stats = _current_stats.get()
+        if stats is None:
+            return method(sql, *args)
+        start = time.perf_counter()
+        try:
+            return method(sql, *args)
+        finally:
+            stats.record_query(sql, time.perf_counter() - start)
+    
+    def execute(self, sql, parameters=()):
+        return self._timed(super().execute, sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(super().executemany, sql, seq_of_parameters)
+    
+    def _count_rows(self, rows):
+        stats = _current_stats.get()
+        if stats is not None and rows:
+            stats.record_rows(len(rows) if isinstance(rows, list) else 1)
+        return rows
+    
+    def fetchone(self):
+        return self._count_rows(super().fetchone())
+    
+    def fetchmany(self, size=None):
+        return self._count_rows(super().fetchmany(self.arraysize if size is None else size))
+    
+    def fetchall(self):
+        return self._count_rows(super().fetchall())
+    
+    def __next__(self):
+        return self._count_rows(super().__next__())
+
+class TrackedConnection(sqlite3.Connection):
+    """Connection whose cursors, including ``execute`` shortcuts, are tracked"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.record_connection()
+    
+    def cursor(self, factory=TrackedCursor):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+    
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def _report(request, stats: QueryStats, streamed: bool = False):
+    route = getattr(request.scope.get("route"), "path", request.url.path)
+    if streamed:
+        logger.info(f"Streamed {request.method} {route}: {stats.header_value()}")
+    for shape, n in stats.repeated().items():
+        logger.warning(f"Possible N+1 in {request.method} {route}: {n}x {shape[:200]}")
+
+async def _report_when_done(body, request, stats: QueryStats):
+    """Pass a streamed body through, then report the stats it accumulated"""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        _report(request, stats, streamed=True)
+
+async def dispatch(request, call_next):
+    """Middleware body: track a request's queries, log N+1 patterns and (if enabled) send the header"""
+    with track_queries() as stats:
+        response = await call_next(request)
+    send_header = QUERY_STATS_HEADER_ENABLED or check_admin_token(request.headers.get(ADMIN_TOKEN_HEADER))
+    # The endpoint's task copied the context, so a streamed body keeps counting into ``stats``
+    streamed = "content-length" not in response.headers and response.status_code not in (204, 304)
+    if streamed and hasattr(response, "body_iterator"):
+        if send_header:
+            response.headers[QUERY_STATS_HEADER] = STREAMED
+        response.body_iterator = _report_when_done(response.body_iterator, request, stats)
+        return response
+    if send_header:
+        response.headers[QUERY_STATS_HEADER] = stats.header_value()
+    _report(request, stats)
+    return response
+
+def parse_header(value: str) -> Dict[str, float]:
+    """Read an ``X-Query-Stats`` header back into numbers"""
+    fields = dict(part.strip().split("=", 1) for part in value.split(";") if "=" in part)
+    return {key: float(number) for key, number in fields.items()}
+
+def assert_query_budget(source, queries: Optional[int] = None, connections: Optional[int] = None,
+                        rows: Optional[int] = None, allow_n_plus_one: bool = False):
+    """Fail if a tracked block or a response's ``X-Query-Stats`` exceeds a budget.
+    
+    ``source`` is a ``QueryStats`` from ``track_queries`` or an HTTP response
+    from the test client.
+    """
+    if isinstance(source, QueryStats):
+        used = {
+            "queries": source.queries, "connections": source.connections,
+            "rows": source.rows, "n_plus_one": len(source.repeated())
+        }
+        detail = "; ".join(f"{n}x {shape}" for shape, n in source.shapes.items())
+    else:
+        header = source.headers.get(QUERY_STATS_HEADER)
+        assert header is not None, (f"Response has no {QUERY_STATS_HEADER} header; set QUERY_STATS_HEADER_ENABLED "
+                                    f"or send {ADMIN_TOKEN_HEADER}")
+        assert header != STREAMED, "Streamed responses are not measured; check the query in a track_queries() block"
+        used = parse_header(header)
+        detail = header
+    
+    problems: List[str] = []
+    for name, budget in (("queries", queries), ("connections", connections), ("rows", rows)):
+        if budget is not None and used[name] > budget:
+            problems.append(f"{int(used[name])} {name} (budget {budget})")
+    if not allow_n_plus_one and used["n_plus_one"]:
+        problems.append(f"{int(used['n_plus_one'])} repeated statement shapes")
+    assert not problems, f"Query budget exceeded: {', '.join(problems)} [{detail}]"
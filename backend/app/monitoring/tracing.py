@@ -0,0 +1,152 @@
+"""Per-scrape stage timing.
+
+A ``ScrapeTrace`` is started around a scrape and made current through a
+context variable. Code along the scrape pipeline wraps its work in
+``stage(name)`` spans (usable as a context manager or decorator) and adds
+counters such as bytes fetched with ``count``. Stage times are exclusive:
+time spent in a nested span is charged to the inner stage only, so the
+stages of one thread never double count. Worker threads see the trace
+when submitted with ``contextvars.copy_context().run``; their spans run in
+parallel with the submitting thread and are not subtracted from it.
+Outside a trace ``stage`` and ``count`` do nothing.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import threading
+import time
+
+import numpy as np
+
+# Counters every trace reports, even when zero
+TRACE_COUNTERS = ("bytes_fetched", "pages", "rows_parsed", "rows_inserted")
+
+# Percentiles reported by summarize_runs
+REPORT_PERCENTILES = (50, 90, 99)
+
+class _Span:
+    __slots__ = ("name", "thread", "child_seconds")
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.thread = threading.get_ident()
+        self.child_seconds = 0.0
+
+class ScrapeTrace:
+    """Accumulated stage times and counters for one scrape"""
+    
+    def __init__(self, tiref: str):
+        self.tiref = tiref
+        self.started_at = time.time()
+        self.wall_seconds = 0.0
+        self.stages: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {name: 0 for name in TRACE_COUNTERS}
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+    
+    def add_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+    
+    def finish(self):
+        self.wall_seconds = time.perf_counter() - self._start
+    
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: round(seconds, 4) for name, seconds in self.stages.items()}
+            counters = dict(self.counters)
+        return {
+            "started_at": datetime.fromtimestamp(self.started_at),
+            "wall_seconds": round(self.wall_seconds or time.perf_counter() - self._start, 4),
+            "stages": stages,
+            **counters
+        }
+
+_current_trace: ContextVar[Optional[ScrapeTrace]] = ContextVar("scrape_trace", default=None)
+_span_stack: ContextVar[Tuple[_Span, ...]] = ContextVar("scrape_span_stack", default=())
+
+def current_trace() -> Optional[ScrapeTrace]:
+    return _current_trace.get()
+
+@contextmanager
+def trace_scrape(tiref: str):
+    """Make a new trace current for the duration of a scrape"""
+    trace = ScrapeTrace(tiref)
+    trace_token = _current_trace.set(trace)
+    stack_token = _span_stack.set(())
+    try:
+        yield trace
+    finally:
+        trace.finish()
+        _span_stack.reset(stack_token)
+        _current_trace.reset(trace_token)
+
+@contextmanager
+def stage(name: str):
+    """Charge the enclosed work to a named stage of the current trace"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    
+    stack = _span_stack.get()
+    span = _Span(name)
+    token = _span_stack.set(stack + (span,))
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _span_stack.reset(token)
+        trace.add_stage(name, max(elapsed - span.child_seconds, 0.0))
+        if stack and stack[-1].thread == span.thread:
+            stack[-1].child_seconds += elapsed
+
+def count(name: str, amount: int = 1):
+    """Add to a counter of the current trace"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.count(name, amount)
+
+def _describe(values: Sequence[float]) -> Dict[str, float]:
+    array = np.asarray(values, dtype=float)
+    summary = {
+        f"p{p}": round(float(v), 4)
+        for p, v in zip(REPORT_PERCENTILES, np.percentile(array, REPORT_PERCENTILES))
+    }
+    summary["mean"] = round(float(array.mean()), 4)
+    summary["max"] = round(float(array.max()), 4)
+    return summary
+
+def summarize_runs(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Percentiles of wall time, stage times and counters over stored scrape runs.
+    
+    A stage missing from a run counts as zero for that run, so stage
+    percentiles describe every scrape rather than only those that hit it.
+    """
+    if not runs:
+        return {"runs": 0, "successful": 0, "wall_seconds": None, "stages": {}, "counters": {}}
+    
+    stage_names = sorted({name for run in runs for name in run['stages']})
+    stage_seconds = np.array([[run['stages'].get(name, 0.0) for name in stage_names] for run in runs], dtype=float)
+    wall = np.array([run['wall_seconds'] for run in runs], dtype=float)
+    
+    stages = {}
+    for column, name in enumerate(stage_names):
+        summary = _describe(stage_seconds[:, column])
+        # Share of all wall time spent in this stage
+        summary["share"] = round(float(stage_seconds[:, column].sum() / wall.sum()), 4) if wall.sum() else 0.0
+        stages[name] = summary
+    
+    return {
+        "runs": len(runs),
+        "successful": sum(1 for run in runs if run['success']),
+        "wall_seconds": _describe(wall),
+        "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["mean"])),
+        "counters": {name: _describe([run[name] for run in runs]) for name in TRACE_COUNTERS}
+    }
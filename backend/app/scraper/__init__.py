@@ -1 +1,25 @@
-# Empty file to make this a Python package
+"""Results-site scraper.
+
+``swimming_scraper`` pulls in requests, tenacity, BeautifulSoup and
+fake_useragent, so it is only imported, and the shared scraper built,
+on first use through ``get_scraper``. ``warm_up`` does that ahead of the
+first scrape; the app runs it in the background once it is serving.
+"""
+import threading
+
+_scraper = None
+_lock = threading.Lock()
+
+def get_scraper():
+    """Shared SwimmingResultsScraper, created on first call"""
+    global _scraper
+    if _scraper is None:
+        with _lock:
+            if _scraper is None:
+                from app.scraper.swimming_scraper import SwimmingResultsScraper
+                _scraper = SwimmingResultsScraper()
+    return _scraper
+
+def warm_up():
+    """Build the shared scraper and load its deferred dependencies"""
+    get_scraper().warm_up()
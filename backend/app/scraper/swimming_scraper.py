@@ -1,31 +1,71 @@
 import requests
-from bs4 import BeautifulSoup
 import logging
 import time
+import os
 import random
 import re
+from functools import lru_cache
+from pathlib import Path
 from typing import List, Optional, Dict, Any, Tuple
-from fake_useragent import UserAgent
 from tenacity import retry, stop_after_attempt, wait_exponential
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import contextvars
 
 from app.models.schemas import SwimmerInfo, SwimRecord, StrokeType, PoolType, RoundType
+from app.analytics.points import calculate_points
+from app.monitoring.metrics import (
+    UPSTREAM_REQUESTS, UPSTREAM_REQUEST_SECONDS, UPSTREAM_RETRIES, RATE_LIMIT_SLEEP_SECONDS
+)
+from app.monitoring.tracing import stage, count
 
 logger = logging.getLogger(__name__)
 
+# Offline user-agent list, used when fake_useragent is disabled or unavailable
+USER_AGENTS_PATH = Path(__file__).resolve().parent.parent / "data" / "user_agents.txt"
+
+# "bundled" rotates through USER_AGENTS_PATH only and never loads fake_useragent
+USER_AGENT_SOURCE = os.getenv("SCRAPER_USER_AGENTS", "fake_useragent")
+
+# Values of the biogs page's gender field, lowercased, and the code stored for them
+GENDER_VALUES = {"m": "M", "male": "M", "men": "M", "boys": "M", "f": "F", "female": "F", "women": "F", "girls": "F"}
+
+# Biogs page labels (lowercased) that may hold the year of birth
+BIRTH_LABELS = ("year of birth", "yob", "born", "date of birth", "birth year")
+
+@lru_cache(maxsize=1)
+def bundled_user_agents() -> List[str]:
+    """User agents shipped with the app, one per line"""
+    with open(USER_AGENTS_PATH, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+def _parse_html(content):
+    """Parse a page with BeautifulSoup (bs4 is only imported once a page is parsed)"""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(content, 'html.parser')
+
+def _traced_sleep(stage_name: str, seconds: float):
+    """Sleep, charging the time to a stage of the current scrape trace"""
+    with stage(stage_name):
+        time.sleep(seconds)
+
 class SwimmingResultsScraper:
     """Web scraper for swimmingresults.org"""
     
-    BASE_URL = "https://www.swimmingresults.org"
-    PERSONAL_BEST_URL = f"{BASE_URL}/individualbest/personal_best.php"
-    BIOGS_URL = f"{BASE_URL}/biogs/biogs_details.php"
+    DEFAULT_BASE_URL = "https://www.swimmingresults.org"
     
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None, min_delay: Optional[float] = None):
+        # Overridable so scrapes can run against a local stand-in (see benchmarks.upstream_server)
+        self.BASE_URL = (base_url or os.getenv("SCRAPER_BASE_URL") or self.DEFAULT_BASE_URL).rstrip("/")
+        self.PERSONAL_BEST_URL = f"{self.BASE_URL}/individualbest/personal_best.php"
+        self.EVENT_HISTORY_URL = f"{self.BASE_URL}/individualbest/personal_best_time_date.php"
+        self.BIOGS_URL = f"{self.BASE_URL}/biogs/biogs_details.php"
+        
         self.session = requests.Session()
-        self.ua = UserAgent()
+        self._ua = None  # fake_useragent generator, created on first use
         self.last_request_time = 0
-        self.min_delay = 0.8  # Reduced to 0.8 seconds between requests for better UX
+        # Seconds between requests (0.8 by default for better UX)
+        self.min_delay = min_delay if min_delay is not None else float(os.getenv("SCRAPER_MIN_DELAY", "0.8"))
         
         # Set default headers
         self.session.headers.update({
@@ -36,18 +76,30 @@ class SwimmingResultsScraper:
             'Upgrade-Insecure-Requests': '1',
         })
     
+    def _user_agent_generator(self):
+        """fake_useragent generator, or False when disabled or unavailable"""
+        if self._ua is None:
+            self._ua = False
+            if USER_AGENT_SOURCE != "bundled":
+                try:
+                    from fake_useragent import UserAgent
+                    self._ua = UserAgent()
+                except Exception as e:
+                    logger.warning(f"fake_useragent unavailable, using bundled user agents: {e}")
+        return self._ua
+    
     def _get_random_user_agent(self) -> str:
         """Get a random user agent"""
         try:
-            return self.ua.random
+            return self._user_agent_generator().random
         except:
             # Fallback user agents
-            agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            ]
-            return random.choice(agents)
+            return random.choice(bundled_user_agents())
+    
+    def warm_up(self):
+        """Load the user agents and HTML parser ahead of the first scrape"""
+        self._get_random_user_agent()
+        _parse_html(b"<html><body><table><tr><td></td></tr></table></body></html>")
     
     def _rate_limit(self):
         """Implement rate limiting between requests"""
@@ -57,11 +109,18 @@ class SwimmingResultsScraper:
         if time_since_last < self.min_delay:
             sleep_time = self.min_delay - time_since_last
             logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
+            with stage("rate_limit"):
+                time.sleep(sleep_time)
+            RATE_LIMIT_SLEEP_SECONDS.inc(amount=sleep_time)
         
         self.last_request_time = time.time()
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=1, min=4, max=10),
+        before_sleep=lambda retry_state: UPSTREAM_RETRIES.inc(),
+        sleep=lambda seconds: _traced_sleep("retry_wait", seconds)
+    )
     def _make_request(self, url: str, params: Dict[str, Any] = None) -> Optional[requests.Response]:
         """Make a rate-limited HTTP request with retries"""
         self._rate_limit()
@@ -69,9 +128,15 @@ class SwimmingResultsScraper:
         # Rotate user agent
         self.session.headers['User-Agent'] = self._get_random_user_agent()
         
+        start = time.perf_counter()
+        status = "error"
         try:
             logger.info(f"Making request to: {url}")
-            response = self.session.get(url, params=params, timeout=10)
+            with stage("fetch"):
+                response = self.session.get(url, params=params, timeout=10)
+            status = str(response.status_code)
+            count("pages")
+            count("bytes_fetched", len(response.content))
             response.raise_for_status()
             
             # Check if we got blocked or redirected
@@ -84,7 +149,11 @@ class SwimmingResultsScraper:
         except requests.exceptions.RequestException as e:
             logger.error(f"Request failed: {e}")
             raise
+        finally:
+            UPSTREAM_REQUESTS.inc(status)
+            UPSTREAM_REQUEST_SECONDS.observe(time.perf_counter() - start, status)
     
+    @stage("validate")
     def validate_tiref(self, tiref: str) -> bool:
         """Validate if a tiref exists with faster method"""
         try:
@@ -133,6 +202,7 @@ class SwimmingResultsScraper:
                 logger.error(f"Error validating tiref {tiref}: {e2}")
                 return False
     
+    @stage("parse")
     def scrape_swimmer_info(self, tiref: str) -> Optional[SwimmerInfo]:
         """Scrape swimmer biographical information from personal best page"""
         try:
@@ -141,75 +211,21 @@ class SwimmingResultsScraper:
             if not response:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract swimmer name and club from the specific pattern in HTML
-            name = None
-            club = None
+            name, club = self.parse_swimmer_heading(response.content, tiref, response.text)
             age_group = None
+            gender = None
+            year_of_birth = None
             
-            # Look for the specific pattern: "Name - (tiref) - Club"
-            # This appears in a <p class="rnk_sj"> element
-            rnk_sj_elements = soup.find_all('p', class_='rnk_sj')
-            for element in rnk_sj_elements:
-                text = element.get_text(strip=True)
-                # Look for pattern like "Khushi Rohit - (1507205) - Sutton & Cheam SC"
-                if tiref in text and '-' in text:
-                    # Split by dashes and extract components
-                    parts = text.split(' - ')
-                    if len(parts) >= 3:
-                        # First part should be the name
-                        potential_name = parts[0].strip()
-                        # Last part should be the club (remove any trailing content)
-                        potential_club = parts[-1].strip()
-                        
-                        # Clean up club name (remove trailing elements like search icons)
-                        if potential_club:
-                            # Find where club name ends (before "Search Again" or other elements)
-                            club_clean = potential_club.split('Search Again')[0].strip()
-                            if club_clean:
-                                potential_club = club_clean
-                        
-                        # Validate that this looks like a real name (not page text)
-                        if (potential_name and 
-                            len(potential_name) > 2 and 
-                            len(potential_name) < 80 and
-                            not any(skip in potential_name.lower() for skip in [
-                                'swimming', 'results', 'search', 'individual', 'best', 'times'
-                            ])):
-                            name = potential_name
-                            club = potential_club
-                            break
-            
-            # Fallback: try to extract from HTML source for the tiref pattern
-            if not name:
-                html_content = response.text
-                # Look for pattern in HTML source: >Name - (<a href...tiref=ID>ID</a>) - Club<
-                pattern = rf'([^<>]+?)\s*-\s*\(<a[^>]*tiref={tiref}[^>]*>{tiref}</a>\)\s*-\s*([^<>]+)'
-                match = re.search(pattern, html_content)
-                if match:
-                    name = match.group(1).strip()
-                    club = match.group(2).strip()
-                    # Clean up any HTML artifacts
-                    name = re.sub(r'[<>]', '', name)
-                    club = re.sub(r'[<>]', '', club)
-            
-            # If still no name found, try the biogs page as last resort
-            if not name:
-                try:
-                    biogs_response = self._make_request(self.BIOGS_URL, {'tiref': tiref})
-                    if biogs_response:
-                        biogs_soup = BeautifulSoup(biogs_response.content, 'html.parser')
-                        biogs_title = biogs_soup.title.string if biogs_soup.title else ""
-                        # Extract from title like "Biographical Data - Khushi Rohit (Sutton & Cheam SC)"
-                        if " - " in biogs_title and "(" in biogs_title:
-                            parts = biogs_title.split(" - ", 1)
-                            if len(parts) > 1:
-                                name_club_part = parts[1].split("(")[0].strip()
-                                if name_club_part and len(name_club_part) < 50:
-                                    name = name_club_part
-                except Exception:
-                    pass  # Biogs page failed, continue with fallback
+            # The biogs page has the gender and year of birth, and the name when the heading had none
+            try:
+                biogs_response = self._make_request(self.BIOGS_URL, {'tiref': tiref})
+                if biogs_response:
+                    biogs = self.parse_biogs_details(biogs_response.content)
+                    name = name or biogs["name"]
+                    gender = biogs["gender"]
+                    year_of_birth = biogs["year_of_birth"]
+            except Exception:
+                pass  # Biogs page failed, continue with fallback
             
             # Final fallback
             if not name:
@@ -227,18 +243,117 @@ class SwimmingResultsScraper:
                 club = re.sub(r'(Search Again.*|<.*)', '', club).strip()
                 club = re.sub(r'\s+', ' ', club)  # Normalize whitespace
             
-            return SwimmerInfo(
-                tiref=tiref,
-                name=name,
-                club=club,
-                age_group=age_group,
-                last_updated=datetime.now()
-            )
-            
+            with stage("models"):
+                return SwimmerInfo(
+                    tiref=tiref,
+                    name=name,
+                    club=club,
+                    age_group=age_group,
+                    gender=gender,
+                    year_of_birth=year_of_birth,
+                    last_updated=datetime.now()
+                )
+        
         except Exception as e:
             logger.error(f"Error scraping swimmer info for {tiref}: {e}")
             return None
     
+    def parse_swimmer_heading(self, content: bytes, tiref: str, text: Optional[str] = None) -> Tuple[Optional[str], Optional[str]]:
+        """Extract swimmer name and club from a personal best page"""
+        soup = _parse_html(content)
+        
+        # Extract swimmer name and club from the specific pattern in HTML
+        name = None
+        club = None
+        
+        # Look for the specific pattern: "Name - (tiref) - Club"
+        # This appears in a <p class="rnk_sj"> element
+        rnk_sj_elements = soup.find_all('p', class_='rnk_sj')
+        for element in rnk_sj_elements:
+            text_content = element.get_text(strip=True)
+            # Look for pattern like "Khushi Rohit - (1507205) - Sutton & Cheam SC"
+            if tiref in text_content and '-' in text_content:
+                # Split by dashes and extract components
+                parts = text_content.split(' - ')
+                if len(parts) >= 3:
+                    # First part should be the name
+                    potential_name = parts[0].strip()
+                    # Last part should be the club (remove any trailing content)
+                    potential_club = parts[-1].strip()
+                    
+                    # Clean up club name (remove trailing elements like search icons)
+                    if potential_club:
+                        # Find where club name ends (before "Search Again" or other elements)
+                        club_clean = potential_club.split('Search Again')[0].strip()
+                        if club_clean:
+                            potential_club = club_clean
+                    
+                    # Validate that this looks like a real name (not page text)
+                    if (potential_name and 
+                        len(potential_name) > 2 and 
+                        len(potential_name) < 80 and
+                        not any(skip in potential_name.lower() for skip in [
+                            'swimming', 'results', 'search', 'individual', 'best', 'times'
+                        ])):
+                        name = potential_name
+                        club = potential_club
+                        break
+        
+        # Fallback: try to extract from HTML source for the tiref pattern
+        if not name:
+            html_content = text if text is not None else content.decode('utf-8', errors='replace')
+            # Look for pattern in HTML source: >Name - (<a href...tiref=ID>ID</a>) - Club<
+            pattern = rf'([^<>]+?)\s*-\s*\(<a[^>]*tiref={tiref}[^>]*>{tiref}</a>\)\s*-\s*([^<>]+)'
+            match = re.search(pattern, html_content)
+            if match:
+                name = match.group(1).strip()
+                club = match.group(2).strip()
+                # Clean up any HTML artifacts
+                name = re.sub(r'[<>]', '', name)
+                club = re.sub(r'[<>]', '', club)
+        
+        return name, club
+    
+    def parse_biogs_name(self, content: bytes) -> Optional[str]:
+        """Extract the swimmer name from a biogs page title"""
+        return self.parse_biogs_details(content)["name"]
+    
+    def parse_biogs_details(self, content: bytes) -> Dict[str, Any]:
+        """Extract the swimmer name, gender ('M'/'F') and year of birth from a biogs page (None if not shown)"""
+        biogs_soup = _parse_html(content)
+        name = None
+        biogs_title = biogs_soup.title.string if biogs_soup.title else ""
+        # Extract from title like "Biographical Data - Khushi Rohit (Sutton & Cheam SC)"
+        if biogs_title and " - " in biogs_title and "(" in biogs_title:
+            parts = biogs_title.split(" - ", 1)
+            if len(parts) > 1:
+                name_club_part = parts[1].split("(")[0].strip()
+                if name_club_part and len(name_club_part) < 50:
+                    name = name_club_part
+        
+        # Fields are "label | value" table rows, or "Label: value" text
+        fields = {}
+        for row in biogs_soup.find_all('tr'):
+            cells = [cell.get_text(strip=True) for cell in row.find_all(['th', 'td'])]
+            if len(cells) >= 2 and cells[0]:
+                fields.setdefault(cells[0].rstrip(':').strip().lower(), cells[1])
+        labels = r'Gender|Sex|Year of Birth|YOB|Born|Date of Birth|Birth Year'
+        for label, value in re.findall(rf'\b({labels})\s*:\s*([A-Za-z]+|[\d/.-]+)', biogs_soup.get_text(" "), re.I):
+            fields.setdefault(label.lower(), value)
+        
+        gender_text = fields.get('gender') or fields.get('sex') or ""
+        year_of_birth = None
+        for label in BIRTH_LABELS:
+            year = re.search(r'\b(19|20)\d{2}\b', fields.get(label, ""))
+            if year:
+                year_of_birth = int(year.group())
+                break
+        return {
+            "name": name,
+            "gender": GENDER_VALUES.get(gender_text.strip().lower()),
+            "year_of_birth": year_of_birth
+        }
+    
     def scrape_swim_records(self, tiref: str) -> List[SwimRecord]:
         """Scrape swimming records from personal best page - OPTIMIZED with concurrent processing"""
         try:
@@ -259,8 +374,9 @@ class SwimmingResultsScraper:
             
             with ThreadPoolExecutor(max_workers=max_workers) as executor:
                 # Submit all event scraping tasks
+                # Each worker runs in a copy of this context so its spans join the scrape trace
                 future_to_event = {
-                    executor.submit(self._scrape_event_race_history, tiref, event_info): event_info
+                    executor.submit(contextvars.copy_context().run, self._scrape_event_race_history, tiref, event_info): event_info
                     for event_info in events_competed
                 }
                 
@@ -285,6 +401,7 @@ class SwimmingResultsScraper:
             # Fallback to original personal best scraping
             return self._scrape_personal_bests(tiref)
     
+    @stage("parse")
     def _scrape_personal_bests(self, tiref: str) -> List[SwimRecord]:
         """Original method to scrape personal best records (kept as fallback)"""
         try:
@@ -292,73 +409,84 @@ class SwimmingResultsScraper:
             if not response:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            records = []
+            records = self.parse_personal_bests(response.content, tiref)
+            logger.info(f"Scraped {len(records)} records for tiref {tiref}")
+            return records
+        
+        except Exception as e:
+            logger.error(f"Error scraping swim records for {tiref}: {e}")
+            return []
+    
+    def parse_personal_bests(self, content: bytes, tiref: str) -> List[SwimRecord]:
+        """Parse the LC and SC personal best tables of a personal best page"""
+        soup = _parse_html(content)
+        records = []
+        
+        # Find tables containing swim data
+        tables = soup.find_all('table')
+        
+        for table_idx, table in enumerate(tables):
+            rows = table.find_all('tr')
             
-            # Find tables containing swim data
-            tables = soup.find_all('table')
+            if len(rows) < 2:  # Need at least header + 1 data row
+                continue
             
-            for table_idx, table in enumerate(tables):
-                rows = table.find_all('tr')
-                
-                if len(rows) < 2:  # Need at least header + 1 data row
-                    continue
-                
-                # Determine pool type based on table headers or position
-                pool_type = PoolType.LONG_COURSE  # Default
-                header_text = rows[0].get_text().lower() if rows else ""
-                
-                # More precise pool type detection
-                if 'strokelc' in header_text.replace(' ', '') or 'lc time' in header_text:
-                    pool_type = PoolType.LONG_COURSE
-                elif 'strokesc' in header_text.replace(' ', '') or 'sc time' in header_text:
-                    pool_type = PoolType.SHORT_COURSE
-                elif table_idx == 0:  # First table is usually LC
-                    pool_type = PoolType.LONG_COURSE
-                elif table_idx == 1:  # Second table is usually SC
-                    pool_type = PoolType.SHORT_COURSE
-                
-                # Process data rows
-                for row in rows[1:]:
+            # Determine pool type based on table headers or position
+            pool_type = PoolType.LONG_COURSE  # Default
+            header_text = rows[0].get_text().lower() if rows else ""
+            
+            # More precise pool type detection
+            if 'strokelc' in header_text.replace(' ', '') or 'lc time' in header_text:
+                pool_type = PoolType.LONG_COURSE
+            elif 'strokesc' in header_text.replace(' ', '') or 'sc time' in header_text:
+                pool_type = PoolType.SHORT_COURSE
+            elif table_idx == 0:  # First table is usually LC
+                pool_type = PoolType.LONG_COURSE
+            elif table_idx == 1:  # Second table is usually SC
+                pool_type = PoolType.SHORT_COURSE
+            
+            # Process data rows
+            for row in rows[1:]:
+                try:
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) < 8:  # Need minimum columns for valid data
+                        continue
+                    
+                    # Extract data based on actual structure
+                    event_name = cells[0].get_text(strip=True) if len(cells) > 0 else ""
+                    time_str = cells[1].get_text(strip=True) if len(cells) > 1 else ""
+                    converted_time = cells[2].get_text(strip=True) if len(cells) > 2 else ""
+                    wa_points_str = cells[3].get_text(strip=True) if len(cells) > 3 else ""
+                    date_str = cells[4].get_text(strip=True) if len(cells) > 4 else ""
+                    meet_name = cells[5].get_text(strip=True) if len(cells) > 5 else ""
+                    venue = cells[6].get_text(strip=True) if len(cells) > 6 else ""
+                    license_info = cells[7].get_text(strip=True) if len(cells) > 7 else ""
+                    level = cells[8].get_text(strip=True) if len(cells) > 8 else ""
+                    
+                    # Validate essential data
+                    if not all([event_name, time_str, date_str]):
+                        continue
+                    
+                    # Parse event name to extract stroke and distance
+                    stroke, distance = self._parse_event_name_v2(event_name)
+                    if not stroke or not distance:
+                        continue
+                    
+                    # Parse date
+                    meet_date = self._parse_date_v2(date_str)
+                    if not meet_date:
+                        continue
+                    
+                    # Parse WA points
+                    wa_points = None
                     try:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) < 8:  # Need minimum columns for valid data
-                            continue
-                        
-                        # Extract data based on actual structure
-                        event_name = cells[0].get_text(strip=True) if len(cells) > 0 else ""
-                        time_str = cells[1].get_text(strip=True) if len(cells) > 1 else ""
-                        converted_time = cells[2].get_text(strip=True) if len(cells) > 2 else ""
-                        wa_points_str = cells[3].get_text(strip=True) if len(cells) > 3 else ""
-                        date_str = cells[4].get_text(strip=True) if len(cells) > 4 else ""
-                        meet_name = cells[5].get_text(strip=True) if len(cells) > 5 else ""
-                        venue = cells[6].get_text(strip=True) if len(cells) > 6 else ""
-                        license_info = cells[7].get_text(strip=True) if len(cells) > 7 else ""
-                        level = cells[8].get_text(strip=True) if len(cells) > 8 else ""
-                        
-                        # Validate essential data
-                        if not all([event_name, time_str, date_str]):
-                            continue
-                        
-                        # Parse event name to extract stroke and distance
-                        stroke, distance = self._parse_event_name_v2(event_name)
-                        if not stroke or not distance:
-                            continue
-                        
-                        # Parse date
-                        meet_date = self._parse_date_v2(date_str)
-                        if not meet_date:
-                            continue
-                        
-                        # Parse WA points
-                        wa_points = None
-                        try:
-                            if wa_points_str and wa_points_str.isdigit():
-                                wa_points = int(wa_points_str)
-                        except:
-                            pass
-                        
-                        # Create swim record
+                        if wa_points_str and wa_points_str.isdigit():
+                            wa_points = int(wa_points_str)
+                    except:
+                        pass
+                    
+                    # Create swim record
+                    with stage("models"):
                         record = SwimRecord(
                             tiref=tiref,
                             event_name=event_name,
@@ -374,19 +502,15 @@ class SwimmingResultsScraper:
                             round_type=RoundType.FINALS,  # Default
                             season=self._get_season_from_date(meet_date)
                         )
-                        
-                        records.append(record)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error parsing record row: {e}")
-                        continue
-            
-            logger.info(f"Scraped {len(records)} records for tiref {tiref}")
-            return records
-            
-        except Exception as e:
-            logger.error(f"Error scraping swim records for {tiref}: {e}")
-            return []
+                    
+                    records.append(record)
+                
+                except Exception as e:
+                    logger.warning(f"Error parsing record row: {e}")
+                    continue
+        
+        count("rows_parsed", len(records))
+        return records
     
     def _extract_events_from_records(self, records: List[SwimRecord]) -> List[Dict[str, Any]]:
         """Extract unique events (stroke/distance/course combinations) from personal best records"""
@@ -426,6 +550,7 @@ class SwimmingResultsScraper:
         logger.info(f"Found {len(events)} unique events to scrape detailed history for")
         return events
     
+    @stage("parse")
     def _scrape_event_race_history(self, tiref: str, event_info: Dict[str, Any]) -> List[SwimRecord]:
         """Scrape complete race history for a specific event"""
         try:
@@ -433,7 +558,7 @@ class SwimmingResultsScraper:
             course_code = event_info['course_code']
             
             # Build URL for individual event history
-            url = f"{self.BASE_URL}/individualbest/personal_best_time_date.php"
+            url = self.EVENT_HISTORY_URL
             params = {
                 'back': 'individualbest',
                 'tiref': tiref,
@@ -446,62 +571,73 @@ class SwimmingResultsScraper:
             if not response:
                 return []
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            records = []
+            records = self.parse_event_history(response.content, tiref, event_info)
+            logger.info(f"Scraped {len(records)} race records for {event_info['event_name']} ({event_info['pool_type'].value})")
+            return records
+        
+        except Exception as e:
+            logger.error(f"Error scraping event race history for {event_info}: {e}")
+            return []
+    
+    def parse_event_history(self, content: bytes, tiref: str, event_info: Dict[str, Any]) -> List[SwimRecord]:
+        """Parse the race history table of one event page"""
+        soup = _parse_html(content)
+        records = []
+        
+        # Find tables containing race data
+        tables = soup.find_all('table')
+        
+        for table in tables:
+            rows = table.find_all('tr')
             
-            # Find tables containing race data
-            tables = soup.find_all('table')
+            if len(rows) < 2:  # Need at least header + 1 data row
+                continue
             
-            for table in tables:
-                rows = table.find_all('tr')
-                
-                if len(rows) < 2:  # Need at least header + 1 data row
-                    continue
-                
-                # Process data rows
-                for row in rows[1:]:
+            # Process data rows
+            for row in rows[1:]:
+                try:
+                    cells = row.find_all(['td', 'th'])
+                    if len(cells) < 4:  # Need minimum columns for valid data
+                        continue
+                    
+                    # Extract data from individual event page format
+                    time_str = cells[0].get_text(strip=True) if len(cells) > 0 else ""
+                    wa_points_str = cells[1].get_text(strip=True) if len(cells) > 1 else ""
+                    round_str = cells[2].get_text(strip=True) if len(cells) > 2 else ""
+                    date_str = cells[3].get_text(strip=True) if len(cells) > 3 else ""
+                    meet_name = cells[4].get_text(strip=True) if len(cells) > 4 else ""
+                    venue = cells[5].get_text(strip=True) if len(cells) > 5 else ""
+                    club = cells[6].get_text(strip=True) if len(cells) > 6 else ""
+                    level = cells[7].get_text(strip=True) if len(cells) > 7 else ""
+                    
+                    # Validate essential data
+                    if not all([time_str, date_str]):
+                        continue
+                    
+                    # Parse date
+                    meet_date = self._parse_date_v2(date_str)
+                    if not meet_date:
+                        continue
+                    
+                    # Parse WA points
+                    wa_points = None
                     try:
-                        cells = row.find_all(['td', 'th'])
-                        if len(cells) < 4:  # Need minimum columns for valid data
-                            continue
-                        
-                        # Extract data from individual event page format
-                        time_str = cells[0].get_text(strip=True) if len(cells) > 0 else ""
-                        wa_points_str = cells[1].get_text(strip=True) if len(cells) > 1 else ""
-                        round_str = cells[2].get_text(strip=True) if len(cells) > 2 else ""
-                        date_str = cells[3].get_text(strip=True) if len(cells) > 3 else ""
-                        meet_name = cells[4].get_text(strip=True) if len(cells) > 4 else ""
-                        venue = cells[5].get_text(strip=True) if len(cells) > 5 else ""
-                        club = cells[6].get_text(strip=True) if len(cells) > 6 else ""
-                        level = cells[7].get_text(strip=True) if len(cells) > 7 else ""
-                        
-                        # Validate essential data
-                        if not all([time_str, date_str]):
-                            continue
-                        
-                        # Parse date
-                        meet_date = self._parse_date_v2(date_str)
-                        if not meet_date:
-                            continue
-                        
-                        # Parse WA points
-                        wa_points = None
-                        try:
-                            if wa_points_str and wa_points_str.isdigit():
-                                wa_points = int(wa_points_str)
-                        except:
-                            pass
-                        
-                        # Determine round type
+                        if wa_points_str and wa_points_str.isdigit():
+                            wa_points = int(wa_points_str)
+                    except:
+                        pass
+                    
+                    # Determine round type
+                    round_type = RoundType.FINALS
+                    if round_str.upper() == 'H':
+                        round_type = RoundType.HEATS
+                    elif round_str.upper() == 'SF':
+                        round_type = RoundType.SEMI_FINALS
+                    elif round_str.upper() == 'F':
                         round_type = RoundType.FINALS
-                        if round_str.upper() == 'H':
-                            round_type = RoundType.HEATS
-                        elif round_str.upper() == 'SF':
-                            round_type = RoundType.SEMI_FINALS
-                        elif round_str.upper() == 'F':
-                            round_type = RoundType.FINALS
-                        
-                        # Create swim record
+                    
+                    # Create swim record
+                    with stage("models"):
                         record = SwimRecord(
                             tiref=tiref,
                             event_name=event_info['event_name'],
@@ -517,20 +653,17 @@ class SwimmingResultsScraper:
                             round_type=round_type,
                             season=self._get_season_from_date(meet_date)
                         )
-                        
-                        records.append(record)
-                        
-                    except Exception as e:
-                        logger.warning(f"Error parsing race record row for {event_info['event_name']}: {e}")
-                        continue
-            
-            logger.info(f"Scraped {len(records)} race records for {event_info['event_name']} ({event_info['pool_type'].value})")
-            return records
-            
-        except Exception as e:
-            logger.error(f"Error scraping event race history for {event_info}: {e}")
-            return []
+                    
+                    records.append(record)
+                
+                except Exception as e:
+                    logger.warning(f"Error parsing race record row for {event_info['event_name']}: {e}")
+                    continue
+        
+        count("rows_parsed", len(records))
+        return records
     
+    @stage("dedupe")
     def _deduplicate_records(self, records: List[SwimRecord]) -> List[SwimRecord]:
         """Remove duplicate records based on key attributes"""
         seen_records = set()
@@ -583,56 +716,9 @@ class SwimmingResultsScraper:
         
         return stroke, distance
     
-    def _calculate_wa_points(self, time_seconds: float, stroke: StrokeType, distance: int, pool_type: str, gender: str = 'M') -> int:
+    def _calculate_wa_points(self, time_seconds: float, stroke: StrokeType, distance: int, pool_type: str, gender: Optional[str] = None) -> int:
         """Calculate World Aquatics (WA) points for a swim time"""
-        # Simplified WA points calculation based on world record ratios
-        # In a real implementation, you'd use official WA point scoring tables
-        
-        # World record reference times (in seconds) - approximate values for calculation
-        wr_times = {
-            ('Freestyle', 50, 'LC', 'M'): 20.91,
-            ('Freestyle', 100, 'LC', 'M'): 46.86,
-            ('Freestyle', 200, 'LC', 'M'): 104.00,
-            ('Freestyle', 400, 'LC', 'M'): 220.07,
-            ('Freestyle', 800, 'LC', 'M'): 458.17,
-            ('Freestyle', 1500, 'LC', 'M'): 871.02,
-            ('Backstroke', 50, 'LC', 'M'): 23.71,
-            ('Backstroke', 100, 'LC', 'M'): 51.60,
-            ('Backstroke', 200, 'LC', 'M'): 111.92,
-            ('Breaststroke', 50, 'LC', 'M'): 25.95,
-            ('Breaststroke', 100, 'LC', 'M'): 56.88,
-            ('Breaststroke', 200, 'LC', 'M'): 125.95,
-            ('Butterfly', 50, 'LC', 'M'): 22.27,
-            ('Butterfly', 100, 'LC', 'M'): 49.45,
-            ('Butterfly', 200, 'LC', 'M'): 110.73,
-            ('Individual Medley', 200, 'LC', 'M'): 113.42,
-            ('Individual Medley', 400, 'LC', 'M'): 240.54,
-        }
-        
-        # Adjust for short course (roughly 3-5% faster)
-        pool_factor = 0.96 if pool_type == 'SC' else 1.0
-        
-        # Get world record time for this event
-        key = (stroke.value if stroke else 'Freestyle', distance, 'LC', gender)
-        wr_time = wr_times.get(key)
-        
-        if not wr_time:
-            # Fallback for unknown events
-            return max(1, int(1000 - (time_seconds * 10)))
-        
-        # Adjust world record for pool type
-        adjusted_wr = wr_time * pool_factor
-        
-        # Calculate points (1000 points = world record, decreases as time increases)
-        if time_seconds <= adjusted_wr:
-            # Faster than world record (theoretical)
-            points = 1000 + int((adjusted_wr - time_seconds) * 50)
-        else:
-            # Slower than world record
-            ratio = adjusted_wr / time_seconds
-            points = int(1000 * (ratio ** 3))  # Cubic scaling for more realistic point distribution
-        
-        return max(1, min(points, 1500))  # Cap between 1 and 1500 points
+        return calculate_points(time_seconds, stroke.value if stroke else 'Freestyle', distance, pool_type, gender)
     
     def _extract_venue_details(self, venue_text: str) -> Tuple[str, Optional[str]]:
         """Extract venue name and location from venue text"""
@@ -759,5 +845,9 @@ class SwimmingResultsScraper:
         logger.info(f"Completed scrape for {tiref}: {len(swim_records)} records found")
         return swimmer_info, swim_records
 
-# Create a global scraper instance
-scraper = SwimmingResultsScraper()
+def __getattr__(name: str):
+    # The shared ``scraper`` instance is built on first access (see app.scraper.get_scraper)
+    if name == "scraper":
+        from app.scraper import get_scraper
+        return get_scraper()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,25 @@
+"""Recompute WA points for stored swims and personal bests.
+
+Usage (from backend/):
+    python -m app.tools.backfill_points [--all] [--batch-size 5000]
+"""
+import argparse
+import logging
+
+from app.database.database import db, init_db
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--all", action="store_true", help="Rescore every row, not just rows without points")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows read and updated per transaction")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    init_db()
+    updated = db.backfill_wa_points(recompute_all=args.all, batch_size=args.batch_size)
+    logger.info("Backfill finished: " + ", ".join(f"{table}: {count} rows updated" for table, count in updated.items()))
+
+if __name__ == "__main__":
+    main()
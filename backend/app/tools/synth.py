@@ -0,0 +1,329 @@
+"""Generate a synthetic swimming federation and bulk-load it into a database.
+
+Swimmers belong to clubs, swim a personal set of events weighted towards
+a specialist stroke, and race at meets from a shared calendar of county,
+regional and club competitions. Short course dominates the winter and
+long course the summer. Each swimmer's WA points follow a progression
+curve that rises steeply from age 9 and flattens towards a personal
+peak, with per-event strengths and race-to-race noise. Times are derived
+from the app's base-time tables, so stored points and times agree with
+what the app computes. Seasons come from the scraper's own
+``_get_season_from_date``.
+
+Rows are written straight into the ``init_db`` schema with ``executemany``
+in large transactions. The secondary ``swim_records`` indexes are dropped
+for the load and rebuilt afterwards by ``init_db``. The season rollup is
+then rebuilt in one grouped query. Personal bests are only built on
+request, through ``update_personal_bests``, because that is much slower
+than the load itself.
+
+Usage (from backend/):
+    python -m app.tools.synth [--swimmers 10000] [--races 150] [--db synth.db]
+        [--clubs 60] [--seasons 10] [--seed 42] [--tiref-base 1000000]
+        [--batch-rows 200000] [--exact] [--personal-bests]
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import argparse
+import logging
+import sqlite3
+import time
+
+import numpy as np
+
+from app.analytics.points import points_table
+from app.database import database
+from app.models.schemas import StrokeType, RoundType
+from app.scraper import get_scraper
+
+logger = logging.getLogger(__name__)
+
+# (stroke, distance) of every individual event, with how often swimmers enter it
+EVENTS: List[Tuple[StrokeType, int, float]] = [
+    (StrokeType.FREESTYLE, 50, 1.0), (StrokeType.FREESTYLE, 100, 1.0), (StrokeType.FREESTYLE, 200, 0.8),
+    (StrokeType.FREESTYLE, 400, 0.5), (StrokeType.FREESTYLE, 800, 0.15), (StrokeType.FREESTYLE, 1500, 0.1),
+    (StrokeType.BACKSTROKE, 50, 0.7), (StrokeType.BACKSTROKE, 100, 0.7), (StrokeType.BACKSTROKE, 200, 0.4),
+    (StrokeType.BREASTSTROKE, 50, 0.7), (StrokeType.BREASTSTROKE, 100, 0.7), (StrokeType.BREASTSTROKE, 200, 0.4),
+    (StrokeType.BUTTERFLY, 50, 0.6), (StrokeType.BUTTERFLY, 100, 0.5), (StrokeType.BUTTERFLY, 200, 0.2),
+    (StrokeType.INDIVIDUAL_MEDLEY, 100, 0.3), (StrokeType.INDIVIDUAL_MEDLEY, 200, 0.6),
+    (StrokeType.INDIVIDUAL_MEDLEY, 400, 0.25)
+]
+
+TOWNS = [
+    "Bath", "Bristol", "Cardiff", "Chelmsford", "Colchester", "Coventry", "Derby", "Exeter", "Guildford",
+    "Hatfield", "Leeds", "Leicester", "Luton", "Maidstone", "Norwich", "Nottingham", "Oxford", "Plymouth",
+    "Reading", "Sheffield", "Southampton", "Stockport", "Sutton", "Swindon", "Tonbridge", "Truro",
+    "Wakefield", "Warrington", "Wigan", "Worcester", "York", "Basingstoke", "Cheltenham", "Crawley"
+]
+CLUB_SUFFIXES = ["SC", "ASC", "Swimming Club", "Dolphins", "Barracudas", "Marlins", "Penguins", "Otters"]
+COUNTIES = ["Kent", "Surrey", "Essex", "Devon", "Yorkshire", "Hampshire", "Somerset", "Lancashire", "Norfolk"]
+REGIONS = ["London", "South East", "South West", "East", "Midlands", "North East", "North West"]
+VENUES = [
+    "London Aquatics Centre", "Ponds Forge", "Tollcross", "Sutton Sports Village", "Crystal Palace",
+    "Millfield", "Manchester Aquatics Centre", "Sheffield Ponds Forge", "Plymouth Life Centre",
+    "Leeds Aquatics Centre", "Coventry Alan Higgs Centre", "Swansea Wales National Pool",
+    "Guildford Spectrum", "Norwich UEA Sportspark", "Luton Inspire", "Basingstoke Aquadrome"
+]
+FIRST_NAMES = {
+    "M": ["Oliver", "Harry", "Noah", "Leo", "Arthur", "Oscar", "George", "Jack", "Charlie", "Freddie",
+          "Alfie", "Henry", "Theo", "Archie", "Joshua", "Thomas", "William", "James", "Ethan", "Samuel"],
+    "F": ["Amelia", "Isla", "Ava", "Mia", "Freya", "Grace", "Olivia", "Lily", "Emily", "Sophie",
+          "Ella", "Evie", "Poppy", "Isabella", "Millie", "Daisy", "Ruby", "Florence", "Alice", "Phoebe"]
+}
+LAST_NAMES = [
+    "Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Evans", "Thomas", "Roberts", "Walker",
+    "Wright", "Robinson", "Thompson", "White", "Hughes", "Edwards", "Green", "Hall", "Wood", "Harris",
+    "Lewis", "Martin", "Jackson", "Clarke", "Clark", "Turner", "Hill", "Scott", "Cooper", "Morris"
+]
+
+# Date the generated histories run up to, and swimmers' ages are taken at
+AS_OF = datetime(2025, 7, 31)
+
+# Meets per season in the shared calendar
+MEETS_PER_SEASON = 80
+
+# Swimmers generated before their rows are written in one transaction
+DEFAULT_BATCH_ROWS = 200_000
+
+# Indexes rebuilt by init_db after the load
+LOAD_DROPPED_INDEXES = ("idx_swim_records_tiref", "idx_swim_records_date", "idx_swim_records_version")
+
+def tiref_for(index: int, base: int = 1000000) -> str:
+    return str(base + index)
+
+def format_centiseconds(cs: int) -> str:
+    """Race time in the results site's format (e.g. 59.87, 2:04.31)"""
+    minutes, rest = divmod(cs, 6000)
+    if minutes:
+        return f"{minutes}:{rest // 100:02d}.{rest % 100:02d}"
+    return f"{rest // 100}.{rest % 100:02d}"
+
+class MeetCalendar:
+    """Meets of the federation, oldest first, with a column per attribute"""
+    
+    def __init__(self, rng: np.random.Generator, seasons: int, clubs: List[str]):
+        first_season = AS_OF.year - seasons
+        dates, names, venues, pools, championship = [], [], [], [], []
+        for season_start in range(first_season, AS_OF.year):
+            opening = datetime(season_start, 9, 1)
+            for day in np.sort(rng.integers(0, 364, MEETS_PER_SEASON)):
+                # Meets start on Saturdays
+                meet_date = opening + timedelta(days=int(day))
+                meet_date += timedelta(days=(5 - meet_date.weekday()) % 7)
+                if meet_date > AS_OF:
+                    continue
+                summer = meet_date.month in (5, 6, 7, 8)
+                kind = rng.random()
+                if kind < 0.15:
+                    name = f"{rng.choice(COUNTIES)} County Championships"
+                elif kind < 0.25:
+                    name = f"{rng.choice(REGIONS)} Regional {'Summer ' if summer else ''}Championships"
+                elif kind < 0.3:
+                    name = "National Summer Meet" if summer else "National Winter Championships"
+                elif kind < 0.75:
+                    name = f"{rng.choice(clubs)} {'Summer' if summer else rng.choice(['Autumn', 'Winter', 'Spring'])} Open"
+                else:
+                    name = f"{rng.choice(clubs)} {rng.choice(['Development Gala', 'Sprint Meet', 'Distance Meet'])}"
+                dates.append(meet_date)
+                names.append(name)
+                venues.append(str(rng.choice(VENUES)))
+                pools.append("LC" if rng.random() < (0.7 if summer else 0.25) else "SC")
+                championship.append(kind < 0.3)
+        
+        order = np.argsort(np.array(dates, dtype="datetime64[s]"), kind="stable")
+        self.dates = [dates[i] for i in order]
+        self.names = [names[i] for i in order]
+        self.venues = [venues[i] for i in order]
+        self.pools = np.array([pools[i] for i in order])
+        self.championship = np.array([championship[i] for i in order])
+        self.stored_dates = [d.isoformat(" ") for d in self.dates]
+        season_of = get_scraper()._get_season_from_date
+        self.seasons = [season_of(d) for d in self.dates]
+        self.days = np.array([(d - AS_OF).days for d in self.dates])
+    
+    def __len__(self):
+        return len(self.dates)
+
+class Federation:
+    """Clubs, meet calendar and base times shared by every generated swimmer"""
+    
+    def __init__(self, seed: int = 42, clubs: int = 60, seasons: int = 10):
+        self.rng = np.random.default_rng(seed)
+        names = sorted({f"{town} {suffix}" for town in TOWNS for suffix in CLUB_SUFFIXES})
+        self.clubs = [str(c) for c in self.rng.choice(names, size=min(clubs, len(names)), replace=False)]
+        self.calendar = MeetCalendar(self.rng, seasons, self.clubs)
+        
+        self.event_names = [f"{distance} {stroke.value}" for stroke, distance, _ in EVENTS]
+        self.event_strokes = np.array([stroke.value for stroke, _, _ in EVENTS])
+        self.event_distances = np.array([distance for _, distance, _ in EVENTS])
+        self.event_weights = np.array([weight for _, _, weight in EVENTS])
+        self.stroke_values = self.event_strokes.tolist()
+        self.distance_values = self.event_distances.tolist()
+        # Base times indexed [gender][course][event]
+        self.base = {
+            gender: {
+                course: points_table.base_times(self.event_strokes, self.event_distances, course, gender)
+                for course in ("LC", "SC")
+            }
+            for gender in ("M", "F")
+        }
+    
+    def swimmer(self, tiref: str, races: int, exact: bool = False) -> Tuple[tuple, List[tuple]]:
+        """One swimmer row and their race history rows"""
+        rng = self.rng
+        calendar = self.calendar
+        gender = "M" if rng.random() < 0.5 else "F"
+        age = int(rng.integers(9, 23))
+        club = self.clubs[int(rng.integers(len(self.clubs)))]
+        name = f"{rng.choice(FIRST_NAMES[gender])} {rng.choice(LAST_NAMES)}"
+        swimmer = (tiref, name, club, str(age), gender, AS_OF)
+        
+        # Career runs from age 9 to today, or for some to a drop-out after age 12
+        start = (9 - age) * 365 - int(rng.integers(365))
+        end = 0
+        if start + 3 * 365 < 0 and rng.random() < 0.3:
+            end = int(rng.integers(start + 3 * 365, 0))
+        career = np.flatnonzero((calendar.days >= start) & (calendar.days <= end))
+        if len(career) == 0:
+            career = np.array([len(calendar) - 1])
+        n = races if exact else max(1, int(rng.poisson(races)))
+        
+        # Events: a specialist stroke plus a spread of others, fewer distance swims for the young
+        specialty = rng.choice(self.event_strokes)
+        weights = self.event_weights * np.where(self.event_strokes == specialty, 3.0, 1.0)
+        events = rng.choice(len(EVENTS), size=min(len(EVENTS), int(rng.integers(4, 13))), replace=False,
+                            p=weights / weights.sum())
+        strength = rng.normal(1.0, 0.05, len(EVENTS)) + np.where(self.event_strokes == specialty, 0.08, 0.0)
+        
+        # Meets attended, then races spread over them
+        attended = rng.choice(career, size=min(len(career), max(1, -(-n // 3))), replace=False)
+        meet = np.sort(rng.choice(attended, size=n))
+        event = rng.choice(events, size=n)
+        course = calendar.pools[meet]
+        
+        # WA points rise from ~35% of the peak at age 9 and flatten out in the late teens
+        peak = float(np.clip(rng.normal(560, 110), 250, 950))
+        years = (calendar.days[meet] - start) / 365.0
+        points = peak * (1 - 0.65 * np.exp(-np.maximum(years, 0) / 3.5)) * strength[event]
+        points *= rng.normal(1.0, 0.04, n)
+        # Events with no long course base time (100 IM) are swum short course
+        lc_base, sc_base = self.base[gender]["LC"][event], self.base[gender]["SC"][event]
+        course = np.where(np.isnan(lc_base), "SC", course)
+        base = np.where(course == "LC", lc_base, sc_base)
+        seconds = base / np.cbrt(np.clip(points, 50, 1100) / 1000)
+        centiseconds = np.rint(seconds * 100).astype(int)
+        wa_points = np.floor(1000 * (base / (centiseconds / 100)) ** 3).astype(int)
+        heats = calendar.championship[meet] & (rng.random(n) < 0.5)
+        
+        records = [
+            (tiref, self.event_names[e], self.stroke_values[e], self.distance_values[e], c,
+             format_centiseconds(cs), cs / 100, p, None, calendar.stored_dates[m], calendar.venues[m],
+             calendar.names[m], RoundType.HEATS.value if h else RoundType.FINALS.value, calendar.seasons[m], 0)
+            for e, c, cs, p, m, h in zip(
+                event.tolist(), course.tolist(), centiseconds.tolist(), wa_points.tolist(), meet.tolist(), heats.tolist()
+            )
+        ]
+        return swimmer, records
+
+def generate(federation: Federation, swimmers: int, races: int, exact: bool = False,
+             tiref_base: int = 1000000) -> Iterator[Tuple[tuple, List[tuple]]]:
+    for index in range(swimmers):
+        yield federation.swimmer(tiref_for(index, tiref_base), races, exact)
+
+def load(path: Path, swimmers: int, races: int, exact: bool = False, seed: int = 42, clubs: int = 60,
+         seasons: int = 10, tiref_base: int = 1000000, batch_rows: int = DEFAULT_BATCH_ROWS,
+         personal_bests: bool = False) -> Dict[str, float]:
+    """Create or extend the database at ``path`` with generated swimmers; returns load stats"""
+    database.DB_PATH = Path(path)
+    database.init_db()
+    federation = Federation(seed, clubs, seasons)
+    
+    started = time.perf_counter()
+    loaded_swimmers = loaded_records = 0
+    conn = sqlite3.connect(str(path))
+    try:
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("PRAGMA journal_mode = MEMORY")
+        conn.execute("PRAGMA cache_size = -262144")
+        for index in LOAD_DROPPED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+        
+        swimmer_rows: List[tuple] = []
+        record_rows: List[tuple] = []
+        
+        def flush():
+            conn.executemany(
+                "INSERT OR IGNORE INTO swimmers (tiref, name, club, age_group, gender, last_updated) VALUES (?, ?, ?, ?, ?, ?)",
+                swimmer_rows
+            )
+            cursor = conn.executemany("""
+                INSERT OR IGNORE INTO swim_records
+                (tiref, event_name, stroke, distance, pool_type, time, time_seconds, wa_points, ranking,
+                 meet_date, venue, meet_name, round_type, season, row_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, record_rows)
+            conn.commit()
+            swimmer_rows.clear()
+            record_rows.clear()
+            return cursor.rowcount
+        
+        for swimmer, records in generate(federation, swimmers, races, exact, tiref_base):
+            swimmer_rows.append(swimmer)
+            record_rows.extend(records)
+            loaded_swimmers += 1
+            if len(record_rows) >= batch_rows:
+                loaded_records += flush()
+                logger.info(f"Loaded {loaded_swimmers} swimmers, {loaded_records} races")
+        loaded_records += flush()
+        load_seconds = time.perf_counter() - started
+        
+        # Season rollup for every loaded record
+        database._backfill_season_bests(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
+    
+    # Recreates the dropped indexes
+    database.init_db()
+    
+    if personal_bests:
+        for index in range(swimmers):
+            database.db.update_personal_bests(tiref_for(index, tiref_base))
+    
+    total_seconds = time.perf_counter() - started
+    return {
+        "swimmers": loaded_swimmers,
+        "records": loaded_records,
+        "load_seconds": round(load_seconds, 2),
+        "total_seconds": round(total_seconds, 2),
+        "records_per_minute": round(loaded_records / load_seconds * 60) if load_seconds else 0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--swimmers", type=int, default=10000)
+    parser.add_argument("--races", type=int, default=150, help="Mean races per swimmer")
+    parser.add_argument("--exact", action="store_true", help="Give every swimmer exactly --races races")
+    parser.add_argument("--db", default="synth.db", help="Database to create or extend")
+    parser.add_argument("--clubs", type=int, default=60)
+    parser.add_argument("--seasons", type=int, default=10, help="Seasons of meets up to summer 2025")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--tiref-base", type=int, default=1000000, help="First generated tiref")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Race rows per transaction")
+    parser.add_argument("--personal-bests", action="store_true",
+                        help="Also build personal bests with update_personal_bests (slow)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    stats = load(
+        Path(args.db), args.swimmers, args.races, exact=args.exact, seed=args.seed, clubs=args.clubs,
+        seasons=args.seasons, tiref_base=args.tiref_base, batch_rows=args.batch_rows,
+        personal_bests=args.personal_bests
+    )
+    logger.info(f"Loaded {stats['swimmers']} swimmers and {stats['records']} races into {args.db} "
+                f"in {stats['load_seconds']}s ({stats['records_per_minute']:,} races/minute), "
+                f"{stats['total_seconds']}s including indexes and rollups")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+"""In-memory serving of the bundled frontend.
+
+Files under the static directory are read into memory once, on first
+request or by ``preload`` in the background after startup. Compressible
+files also get gzip and, when the ``brotli`` package is installed,
+brotli variants, computed at load time. Each request then picks a variant
+from ``Accept-Encoding``, answers ``If-None-Match`` with 304 and never
+touches the disk.
+
+Vite puts a content hash in every file name under ``assets/``, so those
+are sent with a year-long immutable ``Cache-Control``. ``index.html``
+must pick up new deployments, so it is sent with ``no-cache`` and is
+revalidated cheaply through its ETag. The cache lives for the lifetime of
+the process, which restarts on every deployment.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+from email.utils import formatdate
+
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Cache-Control for content-hashed build output and for everything else
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+DEFAULT_CACHE_CONTROL = os.getenv("STATIC_CACHE_CONTROL", "public, max-age=3600")
+
+# Files larger than this are streamed from disk instead of cached
+STATIC_CACHE_MAX_FILE_BYTES = int(os.getenv("STATIC_CACHE_MAX_FILE_BYTES", str(5 * 1024 * 1024)))
+
+# Cache entries after which paths that do not exist are no longer remembered
+MAX_CACHED_MISSES = 10000
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 512
+
+COMPRESSIBLE_TYPES = (
+    "text/", "application/javascript", "application/json", "application/xml",
+    "application/manifest+json", "image/svg+xml", "application/wasm"
+)
+
+# Supported encodings, most preferred first
+ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+
+class CachedAsset:
+    """One file's bytes, precompressed variants and validators"""
+    
+    __slots__ = ("content_type", "variants", "etags", "last_modified", "cache_control")
+    
+    def __init__(self, path: Path, cache_control: str):
+        body = path.read_bytes()
+        content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"  # Starlette adds the charset for text/* itself
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.last_modified = formatdate(path.stat().st_mtime, usegmt=True)
+        
+        self.variants: Dict[str, bytes] = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES and content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+            if brotli:
+                compressed["br"] = brotli.compress(body, quality=11)
+            for encoding, data in compressed.items():
+                if len(data) < len(body):
+                    self.variants[encoding] = data
+        
+        digest = hashlib.sha1(body).hexdigest()[:20]
+        self.etags = {
+            encoding: f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            for encoding in self.variants
+        }
+    
+    def negotiate(self, accept_encoding: str) -> str:
+        """Best stored encoding the client accepts"""
+        if len(self.variants) == 1 or not accept_encoding:
+            return "identity"
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ENCODINGS:
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+                return encoding
+        return "identity"
+    
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header names any variant of this file"""
+        if if_none_match.strip() == "*":
+            return True
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return any(etag in tags for etag in self.etags.values())
+    
+    def response(self, method: str, accept_encoding: str, if_none_match: Optional[str]) -> Response:
+        encoding = self.negotiate(accept_encoding)
+        headers = {
+            "ETag": self.etags[encoding],
+            "Cache-Control": self.cache_control,
+            "Last-Modified": self.last_modified
+        }
+        if len(self.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if if_none_match and self.matches(if_none_match):
+            return Response(status_code=304, headers=headers)
+        
+        body = self.variants[encoding]
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=self.content_type)
+        return Response(body, headers=headers, media_type=self.content_type)
+
+def parse_accept_encoding(value: str) -> Dict[str, float]:
+    """Accept-Encoding header as {encoding: q}"""
+    accepted = {}
+    for part in value.split(","):
+        encoding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, number = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(number)
+                except ValueError:
+                    q = 0.0
+        if encoding:
+            accepted[encoding.strip().lower()] = q
+    return accepted
+
+class StaticAssets:
+    """ASGI app serving a directory from memory (drop-in for ``StaticFiles``)"""
+    
+    def __init__(self, directory: Path, cache_control: str = DEFAULT_CACHE_CONTROL):
+        self.directory = Path(directory).resolve()
+        self.cache_control = cache_control
+        self._cache: Dict[str, Optional[CachedAsset]] = {}
+    
+    def resolve(self, relative: str) -> Optional[Path]:
+        """File for a request path inside the directory, or None"""
+        path = (self.directory / relative.lstrip("/")).resolve()
+        if self.directory not in path.parents or not path.is_file():
+            return None
+        return path
+    
+    def get(self, relative: str) -> Optional[CachedAsset]:
+        """Cached file for a request path, loading it on first use (None when missing or too large)"""
+        key = relative.lstrip("/")
+        if key in self._cache:
+            return self._cache[key]
+        path = self.resolve(key)
+        asset = None
+        if path is not None and path.stat().st_size <= STATIC_CACHE_MAX_FILE_BYTES:
+            asset = CachedAsset(path, self.cache_control)
+        # Misses are remembered too, but only up to a bound so random URLs cannot grow the cache
+        if path is not None or len(self._cache) < MAX_CACHED_MISSES:
+            self._cache[key] = asset
+        return asset
+    
+    def preload(self) -> Tuple[int, int]:
+        """Load every file in the directory; returns (files, bytes in memory)"""
+        files = total = 0
+        for path in sorted(self.directory.rglob("*")):
+            if path.is_file():
+                asset = self.get(path.relative_to(self.directory).as_posix())
+                if asset:
+                    files += 1
+                    total += sum(len(data) for data in asset.variants.values())
+        return files, total
+    
+    def serve(self, relative: str, method: str, headers) -> Optional[Response]:
+        """Response for a file, or None when it does not exist"""
+        asset = self.get(relative)
+        if asset is None:
+            path = self.resolve(relative)
+            if path is None:
+                return None
+            return FileResponse(path, headers={"Cache-Control": self.cache_control})
+        return asset.response(method, headers.get("accept-encoding", ""), headers.get("if-none-match"))
+    
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        headers = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        if scope["method"] not in ("GET", "HEAD"):
+            response = Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            response = self.serve(scope["path"], scope["method"], headers) or Response("Not Found", status_code=404)
+        await response(scope, receive, send)
+
+class SiteAssets:
+    """The frontend build: hashed assets, other static files and the SPA entry point"""
+    
+    def __init__(self, static_dir: Path):
+        self.static_dir = static_dir
+        self.assets = StaticAssets(static_dir / "assets", IMMUTABLE_CACHE_CONTROL)
+        self.files = StaticAssets(static_dir, DEFAULT_CACHE_CONTROL)
+        self.pages = StaticAssets(static_dir, REVALIDATE_CACHE_CONTROL)
+    
+    @property
+    def available(self) -> bool:
+        return (self.static_dir / "index.html").is_file()
+    
+    def index(self, request) -> Optional[Response]:
+        """index.html for SPA routes, or None when there is no frontend build"""
+        return self.pages.serve("index.html", request.method, request.headers)
+    
+    def preload(self):
+        """Load the whole build into memory (run off the event loop)"""
+        started = time.perf_counter()
+        self.pages.get("index.html")
+        files, total = self.assets.preload() if self.assets.directory.is_dir() else (0, 0)
+        logger.info(f"Preloaded {files + 1} static files ({total / 1024:.0f} KiB with compressed variants, "
+                    f"encodings: {', '.join(ENCODINGS)}) in {time.perf_counter() - started:.2f}s")
@@ -0,0 +1,98 @@
+"""Benchmark the single-pass analytics engine against the legacy helpers.
+
+Usage (from backend/):
+    python -m benchmarks.analytics [--sizes 1000,10000,50000] [--repeat 5] [--json]
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.analytics.engine import analyze_records
+from app.models.schemas import SwimRecord, StrokeType, PoolType, RoundType
+from benchmarks import legacy_analytics
+
+EVENTS = [
+    (StrokeType.FREESTYLE, 50, 30.0), (StrokeType.FREESTYLE, 100, 65.0), (StrokeType.FREESTYLE, 200, 140.0),
+    (StrokeType.FREESTYLE, 400, 295.0), (StrokeType.BACKSTROKE, 50, 35.0), (StrokeType.BACKSTROKE, 100, 75.0),
+    (StrokeType.BREASTSTROKE, 50, 38.0), (StrokeType.BREASTSTROKE, 100, 82.0), (StrokeType.BUTTERFLY, 50, 33.0),
+    (StrokeType.BUTTERFLY, 100, 74.0), (StrokeType.INDIVIDUAL_MEDLEY, 200, 160.0), (StrokeType.INDIVIDUAL_MEDLEY, 400, 340.0)
+]
+
+def format_time(seconds: float) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"{int(minutes)}:{secs:05.2f}" if minutes else f"{secs:.2f}"
+
+def make_history(size: int, seed: int = 42, tiref: str = "1000000"):
+    """Build a newest-first race history like SwimmerDatabase.get_swim_records returns"""
+    rng = random.Random(seed)
+    start = datetime(2012, 9, 1)
+    records = []
+    for i in range(size):
+        stroke, distance, base = rng.choice(EVENTS)
+        meet_date = start + timedelta(days=i * 4000 // size)
+        seconds = base * (1.25 - 0.2 * i / size) * rng.uniform(0.97, 1.03)
+        records.append(SwimRecord(
+            id=i + 1,
+            tiref=tiref,
+            event_name=f"{distance} {stroke.value}",
+            stroke=stroke,
+            distance=distance,
+            pool_type=rng.choice([PoolType.LONG_COURSE, PoolType.SHORT_COURSE]),
+            time=format_time(seconds),
+            time_seconds=round(seconds, 2),
+            wa_points=rng.randint(200, 700),
+            meet_date=meet_date,
+            venue="Benchmark Pool",
+            meet_name=f"Meet {i}",
+            round_type=RoundType.FINALS,
+            season=f"{meet_date.year}-{meet_date.year + 1}" if meet_date.month >= 9 else f"{meet_date.year - 1}-{meet_date.year}"
+        ))
+    records.reverse()
+    return records
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def legacy(records):
+    legacy_analytics.calculate_swimmer_stats(records)
+    legacy_analytics.calculate_personal_bests_for_cards(records, None)
+
+def run(sizes, repeat: int):
+    results = []
+    for size in sizes:
+        records = make_history(size)
+        legacy_seconds = best_of(lambda: legacy(records), repeat)
+        engine_seconds = best_of(lambda: analyze_records(records), repeat)
+        results.append({
+            "records": size,
+            "legacy_ms": round(legacy_seconds * 1000, 3),
+            "engine_ms": round(engine_seconds * 1000, 3),
+            "speedup": round(legacy_seconds / engine_seconds, 2) if engine_seconds else None
+        })
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000,50000", help="Comma-separated history lengths")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+    args = parser.parse_args()
+    
+    results = run([int(s) for s in args.sizes.split(",")], args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    
+    print(f"{'records':>10} {'legacy ms':>12} {'engine ms':>12} {'speedup':>9}")
+    for row in results:
+        print(f"{row['records']:>10} {row['legacy_ms']:>12.2f} {row['engine_ms']:>12.2f} {row['speedup']:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
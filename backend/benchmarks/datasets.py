@@ -0,0 +1,20 @@
+"""Synthetic databases for the hot path benchmarks.
+
+Databases are generated and bulk-loaded by ``app.tools.synth`` into the
+application's own ``init_db`` schema, with exactly the requested number
+of races per swimmer so scales stay comparable between runs. Personal
+bests are left to ``update_personal_bests`` so that the benchmarks
+exercise it; the season rollup is built by the loader.
+"""
+from pathlib import Path
+
+from app.tools.synth import load, tiref_for
+
+__all__ = ["build_database", "tiref_for"]
+
+def build_database(path: Path, swimmers: int, records_per_swimmer: int, seed: int = 42,
+                   tiref_base: int = 1000000) -> Path:
+    """Create ``path`` with the app schema and fill it with synthetic data"""
+    path.unlink(missing_ok=True)
+    load(path, swimmers, records_per_swimmer, exact=True, seed=seed, tiref_base=tiref_base)
+    return path
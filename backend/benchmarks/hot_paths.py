@@ -0,0 +1,204 @@
+"""Benchmark database and API hot paths on synthetic databases.
+
+Each scale is a number of swimmers and records per swimmer, given as a
+preset name or ``SWIMMERSxRECORDS`` (e.g. ``2000x300``). Every scale runs
+in its own process against a fresh database built with the app schema, so
+in-memory indexes and caches never leak between scales. Results are JSON;
+pass ``--baseline`` to compare against an earlier results file and exit
+non-zero when a median slows down by more than ``--tolerance``.
+
+Usage (from backend/):
+    python -m benchmarks.hot_paths [--scales tiny,small,deep] [--repeat 7]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Named scales: (swimmers, records per swimmer)
+SCALES = {
+    "tiny": (100, 10),
+    "small": (1000, 100),
+    "medium": (10000, 100),
+    "deep": (100, 5000),
+    "large": (100000, 50),
+    "huge": (100000, 500)
+}
+DEFAULT_SCALES = "tiny,small,deep"
+
+# Swimmers sampled per scale; timed calls cycle through them
+SAMPLE_SWIMMERS = 5
+
+def parse_scale(spec: str):
+    if spec in SCALES:
+        return spec, SCALES[spec]
+    swimmers, _, records = spec.lower().partition("x")
+    return spec, (int(swimmers), int(records))
+
+def measure(func, repeat: int):
+    """Run ``func`` once to warm up, then ``repeat`` times; returns timings in ms and query counts of one run.
+    
+    Requests made through the test client run in another thread, so their
+    counts are read from the ``X-Query-Stats`` response header instead.
+    """
+    from app.monitoring.queries import track_queries, parse_header, QUERY_STATS_HEADER
+    
+    func(0)
+    with track_queries() as stats:
+        result = func(0)
+    queries = {"queries": stats.queries, "rows": stats.rows}
+    if hasattr(result, "headers") and QUERY_STATS_HEADER in result.headers:
+        header = parse_header(result.headers[QUERY_STATS_HEADER])
+        queries = {"queries": int(header["queries"]), "rows": int(header["rows"])}
+    timings = []
+    for i in range(repeat):
+        started = time.perf_counter()
+        func(i)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, queries
+
+def summarize(name: str, timings, queries):
+    timings = sorted(timings)
+    return {
+        "benchmark": name,
+        "runs": len(timings),
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(timings[-1], 3),
+        **queries
+    }
+
+def run_scale(name: str, swimmers: int, records: int, repeat: int, workdir: Path):
+    """Build one database and time every hot path against it (runs in a worker process)"""
+    from fastapi.testclient import TestClient
+    from app.database.database import db
+    from app.analytics.engine import analyze_records
+    from app.main import app
+    from app.monitoring import queries as query_monitoring
+    from benchmarks.analytics import make_history
+    from benchmarks.datasets import build_database, tiref_for
+    
+    # Query counts of client requests come from the X-Query-Stats header
+    query_monitoring.QUERY_STATS_HEADER_ENABLED = True
+    
+    started = time.perf_counter()
+    build_database(workdir / f"{name}.db", swimmers, records)
+    build_seconds = time.perf_counter() - started
+    
+    step = max(swimmers // SAMPLE_SWIMMERS, 1)
+    samples = [tiref_for(i) for i in range(0, swimmers, step)][:SAMPLE_SWIMMERS]
+    pick = lambda i: samples[i % len(samples)]
+    histories = {tiref: db.get_swim_records(tiref) for tiref in samples}
+    client = TestClient(app)
+    
+    def get(path: str):
+        response = client.get(path)
+        assert response.status_code == 200, f"{path} returned {response.status_code}"
+        return response
+    
+    # Fresh swimmers for every save so inserts are never ignored as duplicates
+    new_tirefs = iter(range(swimmers, swimmers + repeat + 2))
+    
+    benchmarks = [
+        ("save_swim_records", lambda i: db.save_swim_records(make_history(records, seed=i, tiref=tiref_for(next(new_tirefs))))),
+        ("update_personal_bests", lambda i: db.update_personal_bests(pick(i))),
+        ("get_swim_records", lambda i: db.get_swim_records(pick(i))),
+        ("list_swimmers", lambda i: db.list_swimmers()),
+        ("get_record_stats", lambda i: db.get_record_stats(pick(i))),
+        ("analyze_records", lambda i: analyze_records(histories[pick(i)])),
+        ("GET /complete", lambda i: get(f"/api/swimmers/{pick(i)}/complete")),
+        ("GET /personal-bests-cards", lambda i: get(f"/api/swimmers/{pick(i)}/personal-bests-cards"))
+    ]
+    
+    results = []
+    for benchmark, func in benchmarks:
+        timings, queries = measure(func, repeat)
+        results.append(summarize(benchmark, timings, queries))
+    return {"build_seconds": round(build_seconds, 2), "benchmarks": results}
+
+def run(scales, repeat: int):
+    """Run each scale in a fresh worker process and collect the results"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="swimbuddy-bench-") as workdir:
+        for spec in scales:
+            name, (swimmers, records) = parse_scale(spec)
+            print(f"Running {name} ({swimmers} swimmers x {records} records)...", file=sys.stderr)
+            completed = subprocess.run(
+                [sys.executable, "-m", "benchmarks.hot_paths", "--worker", spec,
+                 "--repeat", str(repeat), "--workdir", workdir],
+                capture_output=True, text=True
+            )
+            if completed.returncode != 0:
+                raise RuntimeError(f"Scale {name} failed:\n{completed.stderr[-4000:]}")
+            scale = json.loads(completed.stdout)
+            for row in scale["benchmarks"]:
+                results.append({"scale": name, "swimmers": swimmers, "records_per_swimmer": records, **row})
+            print(f"  built in {scale['build_seconds']}s", file=sys.stderr)
+    return results
+
+def compare(results, baseline, tolerance: float):
+    """Print median changes against a baseline to stderr; returns the regressions"""
+    previous = {(row["scale"], row["benchmark"]): row for row in baseline["results"]}
+    regressions = []
+    print(f"{'scale':<10} {'benchmark':<26} {'baseline ms':>12} {'current ms':>12} {'change':>8}", file=sys.stderr)
+    for row in results:
+        before = previous.get((row["scale"], row["benchmark"]))
+        if not before:
+            print(f"{row['scale']:<10} {row['benchmark']:<26} {'-':>12} {row['median_ms']:>12.3f} {'new':>8}", file=sys.stderr)
+            continue
+        change = row["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append({**row, "baseline_median_ms": before["median_ms"], "change": round(change, 3)})
+            flag = "  REGRESSION"
+        print(f"{row['scale']:<10} {row['benchmark']:<26} {before['median_ms']:>12.3f} "
+              f"{row['median_ms']:>12.3f} {change:>+7.1%}{flag}", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help=f"Comma-separated presets ({', '.join(SCALES)}) or SWIMMERSxRECORDS")
+    parser.add_argument("--repeat", type=int, default=7, help="Timed runs per benchmark (median is compared)")
+    parser.add_argument("--output", help="Write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown before failing")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        import logging
+        logging.disable(logging.WARNING)
+        name, (swimmers, records) = parse_scale(args.worker)
+        print(json.dumps(run_scale(name, swimmers, records, args.repeat, Path(args.workdir))))
+        return
+    
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": run(args.scales.split(","), args.repeat)
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(report["results"], baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slowed down by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
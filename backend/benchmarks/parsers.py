@@ -0,0 +1,195 @@
+"""Parser throughput benchmark over a page corpus.
+
+Runs each scraper parser over every corpus page it applies to (see
+``benchmarks.record_pages``). The default corpus is real pages recorded
+into ``benchmarks/fixtures/pages`` when there are any, otherwise the
+checked-in synthetic corpus rendered by ``benchmarks.upstream_server``,
+which only checks the parsers against the stand-in's layout. Output is
+checked against the corpus's ``golden.json`` first: records must match
+field for field, so a parser optimisation that changes any result fails
+before it is timed. Then reports pages per second, rows per second and
+peak traced memory per parser. Results are JSON; pass ``--baseline`` to compare against an
+earlier results file and exit non-zero when throughput drops by more
+than ``--tolerance``.
+
+Usage (from backend/):
+    python -m benchmarks.parsers [--pages benchmarks/fixtures/synthetic_pages] [--repeat 5]
+        [--output results.json] [--baseline baseline.json] [--tolerance 0.25] [--update-golden]
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import json
+import logging
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from app.models.schemas import StrokeType, PoolType
+from app.scraper.swimming_scraper import SwimmingResultsScraper
+from benchmarks.record_pages import PAGES_DIR, SYNTHETIC_PAGES_DIR, MANIFEST_FILE
+
+GOLDEN_FILE = "golden.json"
+
+# Fields that depend on when the parser ran rather than on the page
+VOLATILE_FIELDS = {"created_at"}
+
+def _event_info(entry: Dict[str, Any]) -> Dict[str, Any]:
+    event = entry["event"]
+    return {**event, "stroke": StrokeType(event["stroke"]), "pool_type": PoolType(event["pool_type"])}
+
+def parser_paths(scraper: SwimmingResultsScraper) -> Dict[str, Tuple[str, Callable[[bytes, Dict[str, Any]], list]]]:
+    """Parser name -> (page kind it reads, function returning its output rows)"""
+    return {
+        "personal_bests": ("personal_best", lambda content, entry: scraper.parse_personal_bests(content, entry["tiref"])),
+        "event_history": ("event_history", lambda content, entry: scraper.parse_event_history(
+            content, entry["tiref"], _event_info(entry))),
+        "swimmer_heading": ("personal_best", lambda content, entry: [
+            dict(zip(("name", "club"), scraper.parse_swimmer_heading(content, entry["tiref"])))]),
+        "biogs": ("biogs", lambda content, entry: [scraper.parse_biogs_details(content)])
+    }
+
+def serialize(rows: list) -> list:
+    """JSON-comparable form of parser output"""
+    return [
+        row.model_dump(mode="json", exclude=VOLATILE_FIELDS) if hasattr(row, "model_dump") else row
+        for row in rows
+    ]
+
+def load_corpus(pages: Path) -> List[Tuple[str, Dict[str, Any], bytes]]:
+    manifest = json.loads((pages / MANIFEST_FILE).read_text(encoding="utf-8"))
+    return [(filename, entry, (pages / filename).read_bytes()) for filename, entry in sorted(manifest.items())]
+
+def check_golden(outputs: Dict[str, Dict[str, list]], golden: Dict[str, Dict[str, list]]) -> List[str]:
+    """Describe every page whose parser output differs from the golden output"""
+    problems = []
+    for name, pages in outputs.items():
+        expected_pages = golden.get(name, {})
+        for filename in sorted(set(pages) | set(expected_pages)):
+            actual = pages.get(filename)
+            expected = expected_pages.get(filename)
+            if actual == expected:
+                continue
+            if actual is None or expected is None:
+                problems.append(f"{name} {filename}: {'missing from golden' if expected is None else 'not parsed'}")
+                continue
+            if len(actual) != len(expected):
+                problems.append(f"{name} {filename}: {len(actual)} rows, golden has {len(expected)}")
+                continue
+            index = next(i for i, (a, e) in enumerate(zip(actual, expected)) if a != e)
+            problems.append(f"{name} {filename} row {index}: {json.dumps(actual[index], sort_keys=True)} != {json.dumps(expected[index], sort_keys=True)}")
+    return problems
+
+def benchmark(name: str, parse: Callable, corpus: list, repeat: int) -> Dict[str, Any]:
+    """Time ``repeat`` passes over the corpus, then one traced pass for peak memory"""
+    rows = sum(len(parse(content, entry)) for _, entry, content in corpus)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _, entry, content in corpus:
+            parse(content, entry)
+        timings.append(time.perf_counter() - started)
+    
+    tracemalloc.start()
+    try:
+        for _, entry, content in corpus:
+            parse(content, entry)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    seconds = statistics.median(timings)
+    return {
+        "parser": name,
+        "pages": len(corpus),
+        "bytes": sum(len(content) for _, _, content in corpus),
+        "rows": rows,
+        "median_ms": round(seconds * 1000, 3),
+        "pages_per_second": round(len(corpus) / seconds, 1),
+        "rows_per_second": round(rows / seconds, 1),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+def compare(results, baseline, tolerance: float):
+    """Print throughput changes against a baseline to stderr; returns the regressions"""
+    previous = {row["parser"]: row for row in baseline["results"]}
+    regressions = []
+    print(f"{'parser':<18} {'baseline pages/s':>17} {'current pages/s':>16} {'change':>8}", file=sys.stderr)
+    for row in results:
+        before = previous.get(row["parser"])
+        if not before:
+            print(f"{row['parser']:<18} {'-':>17} {row['pages_per_second']:>16.1f} {'new':>8}", file=sys.stderr)
+            continue
+        change = row["pages_per_second"] / before["pages_per_second"] - 1 if before["pages_per_second"] else 0.0
+        flag = ""
+        if change < -tolerance:
+            regressions.append({**row, "baseline_pages_per_second": before["pages_per_second"], "change": round(change, 3)})
+            flag = "  REGRESSION"
+        print(f"{row['parser']:<18} {before['pages_per_second']:>17.1f} {row['pages_per_second']:>16.1f} "
+              f"{change:>+7.1%}{flag}", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=Path, help="Corpus directory with manifest.json (default: recorded pages, else synthetic)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed passes over the corpus per parser")
+    parser.add_argument("--output", help="Write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed throughput drop before failing")
+    parser.add_argument("--update-golden", action="store_true", help="Rewrite golden.json from the current parsers")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    if args.pages is None:
+        args.pages = PAGES_DIR if (PAGES_DIR / MANIFEST_FILE).exists() else SYNTHETIC_PAGES_DIR
+    corpus_kind = "synthetic" if args.pages.resolve() == SYNTHETIC_PAGES_DIR.resolve() else "recorded"
+    if corpus_kind == "synthetic":
+        print("Using the synthetic corpus from benchmarks.upstream_server; record real pages "
+              "with benchmarks.record_pages to check the parsers against the live layout", file=sys.stderr)
+    
+    scraper = SwimmingResultsScraper(base_url="http://127.0.0.1")
+    paths = parser_paths(scraper)
+    corpus = load_corpus(args.pages)
+    by_kind = {kind: [page for page in corpus if page[1]["page"] == kind] for kind, _ in paths.values()}
+    
+    outputs = {
+        name: {filename: serialize(parse(content, entry)) for filename, entry, content in by_kind[kind]}
+        for name, (kind, parse) in paths.items()
+    }
+    golden_path = args.pages / GOLDEN_FILE
+    if args.update_golden:
+        golden_path.write_text(json.dumps(outputs, indent=1, sort_keys=True), encoding="utf-8")
+        print(f"Wrote golden output for {len(corpus)} pages to {golden_path}", file=sys.stderr)
+        return
+    problems = check_golden(outputs, json.loads(golden_path.read_text(encoding="utf-8")))
+    if problems:
+        for problem in problems[:20]:
+            print(problem, file=sys.stderr)
+        print(f"{len(problems)} page(s) differ from the golden output", file=sys.stderr)
+        sys.exit(2)
+    
+    results = [benchmark(name, parse, by_kind[kind], args.repeat) for name, (kind, parse) in paths.items()]
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "corpus": corpus_kind,
+        "results": results
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} parser(s) slowed down by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
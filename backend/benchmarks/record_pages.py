@@ -0,0 +1,126 @@
+"""Record results-site pages into a parser fixture corpus.
+
+Fetches the personal best page, every event history page the scraper
+would visit and the biogs page for each tiref, through the scraper's own
+rate-limited session. Pages are anonymised before they are written: the
+tiref, swimmer name and club are replaced with fixture values, so the
+corpus keeps the real page layout without personal data. Files follow the
+``page_filename`` layout, so the corpus can also be served by
+``benchmarks.upstream_server --pages``. ``manifest.json`` lists every page
+with what its parser needs; write ``golden.json`` afterwards with
+``python -m benchmarks.parsers --pages DIR --update-golden``.
+
+Recordings of the real site go to ``benchmarks/fixtures/pages``. The
+checked-in ``benchmarks/fixtures/synthetic_pages`` corpus was recorded
+from ``benchmarks.upstream_server`` instead, so it only has the stand-in's
+rendering of the layout; regenerate it with ``--synthetic``.
+
+Usage (from backend/):
+    python -m benchmarks.record_pages --tirefs 1234567,7654321 [--base-url URL]
+        [--output benchmarks/fixtures/pages] [--delay 1.0]
+    python -m benchmarks.record_pages --synthetic --base-url http://127.0.0.1:8765
+"""
+from pathlib import Path
+from typing import Dict, List, Tuple
+import argparse
+import html
+import json
+import logging
+import sys
+
+from app.scraper.swimming_scraper import SwimmingResultsScraper
+from benchmarks.upstream_server import (
+    PERSONAL_BEST_PATH, EVENT_HISTORY_PATH, BIOGS_PATH, FIRST_NAMES, LAST_NAMES, CLUBS, page_filename
+)
+
+PAGES_DIR = Path(__file__).parent / "fixtures" / "pages"
+SYNTHETIC_PAGES_DIR = Path(__file__).parent / "fixtures" / "synthetic_pages"
+MANIFEST_FILE = "manifest.json"
+
+# Stand-in tirefs the synthetic corpus is recorded from
+SYNTHETIC_TIREFS = "1000001,1234567,2000042,3141592,1507205,2718281"
+
+PAGE_KINDS = {PERSONAL_BEST_PATH: "personal_best", EVENT_HISTORY_PATH: "event_history", BIOGS_PATH: "biogs"}
+
+# Fixture tirefs are numbered from here, in recording order
+FIXTURE_TIREF_BASE = 9000001
+
+def anonymise(page: str, replacements: List[Tuple[str, str]]) -> str:
+    """Replace identifying strings, both raw and HTML-escaped"""
+    for real, fake in replacements:
+        if not real:
+            continue
+        page = page.replace(html.escape(real), html.escape(fake)).replace(real, fake)
+    return page
+
+def record_swimmer(scraper: SwimmingResultsScraper, tiref: str, index: int, output: Path) -> Dict[str, dict]:
+    """Record one swimmer's pages; returns their manifest entries"""
+    fixture_tiref = str(FIXTURE_TIREF_BASE + index)
+    personal_best = scraper._make_request(scraper.PERSONAL_BEST_URL, {'mode': 'A', 'tiref': tiref})
+    name, club = scraper.parse_swimmer_heading(personal_best.content, tiref, personal_best.text)
+    replacements = [
+        (name, f"{FIRST_NAMES[index % len(FIRST_NAMES)]} {LAST_NAMES[index % len(LAST_NAMES)]}"),
+        (club, CLUBS[index % len(CLUBS)]),
+        (tiref, fixture_tiref)
+    ]
+    
+    pages = [(PERSONAL_BEST_PATH, {'tiref': fixture_tiref}, personal_best.text, {})]
+    records = scraper.parse_personal_bests(personal_best.content, tiref)
+    for event in scraper._extract_events_from_records(records):
+        response = scraper._make_request(scraper.EVENT_HISTORY_URL, {
+            'back': 'individualbest', 'tiref': tiref, 'mode': 'A',
+            'tstroke': event['stroke_id'], 'tcourse': event['course_code']
+        })
+        params = {'tiref': fixture_tiref, 'tstroke': str(event['stroke_id']), 'tcourse': event['course_code']}
+        pages.append((EVENT_HISTORY_PATH, params, response.text, {"event": {
+            "stroke": event['stroke'].value, "distance": event['distance'], "pool_type": event['pool_type'].value,
+            "stroke_id": event['stroke_id'], "course_code": event['course_code'], "event_name": event['event_name']
+        }}))
+    biogs = scraper._make_request(scraper.BIOGS_URL, {'tiref': tiref})
+    pages.append((BIOGS_PATH, {'tiref': fixture_tiref}, biogs.text, {}))
+    
+    entries = {}
+    for path, params, page, extra in pages:
+        filename = page_filename(path, params)
+        (output / filename).write_text(anonymise(page, replacements), encoding="utf-8")
+        entries[filename] = {"page": PAGE_KINDS[path], "tiref": fixture_tiref, **extra}
+    return entries
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tirefs", help="Comma-separated swimmers to record")
+    parser.add_argument("--base-url", help="Results site to record from (default: SCRAPER_BASE_URL or the real site)")
+    parser.add_argument("--output", type=Path, help="Corpus directory (default: fixtures/pages, or fixtures/synthetic_pages with --synthetic)")
+    parser.add_argument("--delay", type=float, help="Seconds between requests (default: 1.0, or 0 with --synthetic)")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="Rebuild the synthetic corpus from a running benchmarks.upstream_server at --base-url")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    
+    if args.synthetic:
+        if not args.base_url:
+            parser.error("--synthetic needs --base-url pointing at benchmarks.upstream_server")
+        args.tirefs = args.tirefs or SYNTHETIC_TIREFS
+        args.output = args.output or SYNTHETIC_PAGES_DIR
+        args.delay = 0.0 if args.delay is None else args.delay
+    elif not args.tirefs:
+        parser.error("--tirefs is required")
+    args.output = args.output or PAGES_DIR
+    args.delay = 1.0 if args.delay is None else args.delay
+    
+    args.output.mkdir(parents=True, exist_ok=True)
+    for stale in args.output.glob("*.html"):
+        stale.unlink()
+    
+    scraper = SwimmingResultsScraper(base_url=args.base_url, min_delay=args.delay)
+    manifest = {}
+    for index, tiref in enumerate(args.tirefs.split(",")):
+        entries = record_swimmer(scraper, tiref.strip(), index, args.output)
+        print(f"Recorded {len(entries)} pages for swimmer {index + 1}", file=sys.stderr)
+        manifest.update(entries)
+    
+    (args.output / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    print(f"Wrote {len(manifest)} pages to {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""End-to-end scrape load test against the local stand-in results site.
+
+For every combination of concurrency level and rate-limiter delay, scrapes
+a batch of swimmers through one shared ``SwimmingResultsScraper`` (as the
+API does) and saves them to a scratch database with the app's own
+``SwimmerDatabase`` methods. Reports swimmers per minute, page latency
+percentiles seen by the scraper, upstream statuses and failed scrapes.
+Injected errors and 429s go through the scraper's real retry policy, so
+expect multi-second backoffs when they are enabled.
+
+Usage (from backend/):
+    python -m benchmarks.scrape_load [--swimmers 20] [--concurrency 1,2,4] [--delays 0.8,0.2,0]
+        [--latency-ms 150] [--jitter-ms 50] [--error-rate 0] [--throttle-rate 0] [--max-rps 0]
+        [--upstream http://host:port] [--output results.json]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from app.database import database
+from app.monitoring.tracing import trace_scrape
+from app.scraper.swimming_scraper import SwimmingResultsScraper
+from benchmarks.upstream_server import UpstreamServer
+
+def timed_session(scraper: SwimmingResultsScraper, latencies: list):
+    """Record the latency of every page the scraper fetches"""
+    lock = threading.Lock()
+    for name in ("get", "head"):
+        send = getattr(scraper.session, name)
+        
+        def timed(*args, _send=send, **kwargs):
+            started = time.perf_counter()
+            try:
+                return _send(*args, **kwargs)
+            finally:
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+        setattr(scraper.session, name, timed)
+
+def scrape_and_save(scraper: SwimmingResultsScraper, tiref: str) -> dict:
+    """Scrape one swimmer and store it like POST /api/scraper/scrape does"""
+    db = database.db
+    with trace_scrape(tiref) as trace:
+        swimmer_info, records = scraper.scrape_swimmer_data(tiref)
+        if swimmer_info is None:
+            return {"ok": False, "records": 0, "pages": trace.counters["pages"]}
+        db.save_swimmer(swimmer_info)
+        saved = db.save_swim_records(records) if records else 0
+        db.update_personal_bests(tiref)
+    return {"ok": True, "records": saved, "pages": trace.counters["pages"]}
+
+def run_level(base_url: str, tirefs, concurrency: int, delay: float) -> dict:
+    scraper = SwimmingResultsScraper(base_url=base_url, min_delay=delay)
+    latencies: list = []
+    timed_session(scraper, latencies)
+    
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = []
+        for future in [executor.submit(scrape_and_save, scraper, tiref) for tiref in tirefs]:
+            try:
+                outcomes.append(future.result())
+            except Exception:
+                outcomes.append({"ok": False, "records": 0, "pages": 0})
+    seconds = time.perf_counter() - started
+    
+    page_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    scraped = sum(1 for outcome in outcomes if outcome["ok"])
+    return {
+        "concurrency": concurrency,
+        "min_delay": delay,
+        "swimmers": len(tirefs),
+        "failed": len(tirefs) - scraped,
+        "seconds": round(seconds, 2),
+        "swimmers_per_minute": round(scraped / seconds * 60, 2) if seconds else None,
+        "pages": len(latencies),
+        "records_saved": sum(outcome["records"] for outcome in outcomes),
+        "page_ms": {
+            f"p{p}": round(float(v), 1) for p, v in zip((50, 90, 99), np.percentile(page_ms, (50, 90, 99)))
+        }
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--swimmers", type=int, default=20, help="Swimmers scraped per level")
+    parser.add_argument("--concurrency", default="1,2,4", help="Comma-separated concurrent scrapes")
+    parser.add_argument("--delays", default="0.8,0.2,0", help="Comma-separated scraper min_delay values (seconds)")
+    parser.add_argument("--upstream", help="Use an already running stand-in instead of starting one")
+    parser.add_argument("--latency-ms", type=float, default=150.0)
+    parser.add_argument("--jitter-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=0.0, help="Stand-in answers 429 above this rate (0 = off)")
+    parser.add_argument("--output", help="Write results JSON to this file instead of stdout")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+    
+    server = None
+    base_url = args.upstream
+    if not base_url:
+        server = UpstreamServer(
+            ("127.0.0.1", 0), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate, max_rps=args.max_rps or None
+        ).start()
+        base_url = server.url
+    
+    results = []
+    with tempfile.TemporaryDirectory(prefix="swimbuddy-load-") as workdir:
+        database.DB_PATH = Path(workdir) / "load.db"
+        database.init_db()
+        next_tiref = 2000000
+        for concurrency in [int(c) for c in args.concurrency.split(",")]:
+            for delay in [float(d) for d in args.delays.split(",")]:
+                # New swimmers for every level so each one really inserts
+                tirefs = [str(t) for t in range(next_tiref, next_tiref + args.swimmers)]
+                next_tiref += args.swimmers
+                before = server.stats.snapshot() if server else {}
+                row = run_level(base_url, tirefs, concurrency, delay)
+                if server:
+                    after = server.stats.snapshot()
+                    row["upstream_status"] = {str(s): n - before.get(s, 0) for s, n in sorted(after.items())}
+                results.append(row)
+                print(f"concurrency={concurrency} delay={delay}s: {row['swimmers_per_minute']} swimmers/min, "
+                      f"page p50 {row['page_ms']['p50']}ms, {row['failed']} failed", file=sys.stderr)
+    
+    if server:
+        server.shutdown()
+        server.server_close()
+    
+    report = {"upstream": base_url, "latency_ms": args.latency_ms, "error_rate": args.error_rate,
+              "throttle_rate": args.throttle_rate, "results": results}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Cold start benchmark: import cost of the app and time to its first responses.
+
+Each run is a fresh interpreter, as after a scale-to-zero restart. A run
+times ``import app.main``, application startup (``init_db`` on a scratch
+database), the first API request, and the first scrape-path call
+(``get_scraper`` plus parsing a small page), which pays for the deferred
+imports. Runs also list the slowest modules from ``-X importtime`` and
+which heavy dependencies were already loaded after ``import app.main``.
+Results are JSON; pass ``--baseline`` to compare against an earlier
+results file and exit non-zero when a median slows down by more than
+``--tolerance``.
+
+Usage (from backend/):
+    python -m benchmarks.startup [--runs 5] [--top 15] [--output results.json]
+        [--baseline baseline.json] [--tolerance 0.25]
+"""
+from datetime import datetime
+from pathlib import Path
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Dependencies the app is expected to load only on first use
+DEFERRED_MODULES = ("requests", "bs4", "tenacity", "fake_useragent", "app.scraper.swimming_scraper")
+
+# Timed phases, in the order a worker runs them
+PHASES = ("import_ms", "startup_ms", "first_request_ms", "first_scrape_path_ms")
+
+def worker(workdir: str):
+    """Time one cold start in this (fresh) interpreter; prints JSON"""
+    import time
+    os.chdir(workdir)
+    started = time.perf_counter()
+    import app.main
+    imported = time.perf_counter()
+    loaded = [name for name in DEFERRED_MODULES if name in sys.modules]
+    
+    from fastapi.testclient import TestClient
+    app.main.SCRAPER_WARMUP = False  # Timed separately below
+    with TestClient(app.main.app) as client:
+        ready = time.perf_counter()
+        response = client.get("/api/swimmers/")
+        assert response.status_code == 200, f"/api/swimmers/ returned {response.status_code}"
+        first_request = time.perf_counter()
+        from app.scraper import get_scraper
+        scraper = get_scraper()
+        scraper.parse_personal_bests(b"<html><body><table><tr><th>Stroke</th></tr></table></body></html>", "1")
+        scraper._get_random_user_agent()
+        first_scrape = time.perf_counter()
+    
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+        "first_request_ms": (first_request - ready) * 1000,
+        "first_scrape_path_ms": (first_scrape - first_request) * 1000,
+        "loaded_at_import": loaded
+    }))
+
+def parse_importtime(stderr: str, top: int):
+    """Slowest modules by cumulative import time, from -X importtime output"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000, "cumulative_ms": int(cumulative_us) / 1000})
+    modules.sort(key=lambda m: m["cumulative_ms"], reverse=True)
+    return modules[:top]
+
+def run(runs: int, top: int):
+    """Run cold starts in fresh interpreters and summarize them"""
+    samples = []
+    slowest = []
+    with tempfile.TemporaryDirectory(prefix="swimbuddy-startup-") as workdir:
+        for i in range(runs):
+            # The first run also records import times (which slow it down, so it is not timed)
+            args = [sys.executable] + (["-X", "importtime"] if i == 0 else []) + ["-m", "benchmarks.startup", "--worker", workdir]
+            completed = subprocess.run(args, capture_output=True, text=True, cwd=Path(__file__).resolve().parent.parent)
+            if completed.returncode != 0:
+                raise RuntimeError(f"Startup run failed:\n{completed.stderr[-4000:]}")
+            sample = json.loads(completed.stdout.strip().splitlines()[-1])
+            if i == 0:
+                slowest = parse_importtime(completed.stderr, top)
+                loaded = sample["loaded_at_import"]
+            else:
+                samples.append(sample)
+            print(f"  run {i + 1}/{runs}", file=sys.stderr)
+    
+    results = []
+    for phase in PHASES:
+        timings = sorted(sample[phase] for sample in samples) or [0.0]
+        results.append({
+            "benchmark": phase,
+            "runs": len(samples),
+            "min_ms": round(timings[0], 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "max_ms": round(timings[-1], 3)
+        })
+    return results, slowest, loaded
+
+def compare(results, baseline, tolerance: float):
+    """Print median changes against a baseline to stderr; returns the regressions"""
+    previous = {row["benchmark"]: row for row in baseline["results"]}
+    regressions = []
+    print(f"{'phase':<22} {'baseline ms':>12} {'current ms':>12} {'change':>8}", file=sys.stderr)
+    for row in results:
+        before = previous.get(row["benchmark"])
+        if not before:
+            print(f"{row['benchmark']:<22} {'-':>12} {row['median_ms']:>12.3f} {'new':>8}", file=sys.stderr)
+            continue
+        change = row["median_ms"] / before["median_ms"] - 1 if before["median_ms"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append({**row, "baseline_median_ms": before["median_ms"], "change": round(change, 3)})
+            flag = "  REGRESSION"
+        print(f"{row['benchmark']:<22} {before['median_ms']:>12.3f} {row['median_ms']:>12.3f} "
+              f"{change:>+7.1%}{flag}", file=sys.stderr)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Timed cold starts (plus one untimed -X importtime run)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imported modules to report")
+    parser.add_argument("--output", help="Write results JSON to this file instead of stdout")
+    parser.add_argument("--baseline", help="Results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed median slowdown before failing")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.worker:
+        import logging
+        logging.disable(logging.WARNING)
+        worker(args.worker)
+        return
+    
+    results, slowest, loaded = run(args.runs + 1, args.top)
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "loaded_at_import": loaded,
+        "slowest_imports": slowest
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+    if loaded:
+        print(f"Loaded by import app.main although deferred: {', '.join(loaded)}", file=sys.stderr)
+    
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} phase(s) slowed down by more than {args.tolerance:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
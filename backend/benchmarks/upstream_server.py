@@ -0,0 +1,301 @@
+"""Local stand-in for swimmingresults.org.
+
+Serves ``personal_best.php``, ``personal_best_time_date.php`` and
+``biogs_details.php`` in the layouts the scraper parses, so scrapes can be
+load tested without touching the real site. Pages come from a directory
+of recorded HTML when one is given and has the page (see ``page_filename``),
+otherwise they are generated deterministically from the tiref. Latency,
+jitter, 5xx errors and 429 throttling can be injected.
+
+Point the app at it with ``SCRAPER_BASE_URL=http://127.0.0.1:8765``.
+
+Usage (from backend/):
+    python -m benchmarks.upstream_server [--port 8765] [--pages DIR] [--latency-ms 150]
+        [--jitter-ms 50] [--error-rate 0.01] [--throttle-rate 0.01] [--max-rps 20]
+"""
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+import argparse
+import html
+import random
+import threading
+import time
+import zlib
+
+from app.analytics.points import points_table
+
+PERSONAL_BEST_PATH = "/individualbest/personal_best.php"
+EVENT_HISTORY_PATH = "/individualbest/personal_best_time_date.php"
+BIOGS_PATH = "/biogs/biogs_details.php"
+
+# Event ids used by the results site's tstroke parameter: (stroke, distance)
+EVENT_IDS = {
+    1: ("Freestyle", 50), 2: ("Freestyle", 100), 3: ("Freestyle", 200), 4: ("Freestyle", 400),
+    5: ("Freestyle", 800), 6: ("Freestyle", 1500), 7: ("Breaststroke", 50), 8: ("Breaststroke", 100),
+    9: ("Breaststroke", 200), 10: ("Butterfly", 50), 11: ("Butterfly", 100), 12: ("Butterfly", 200),
+    13: ("Backstroke", 50), 14: ("Backstroke", 100), 15: ("Backstroke", 200),
+    16: ("Individual Medley", 200), 17: ("Individual Medley", 400), 18: ("Individual Medley", 100)
+}
+COURSES = {"L": "LC", "S": "SC"}
+
+FIRST_NAMES = ["Amelia", "Oliver", "Isla", "Harry", "Ava", "Noah", "Mia", "Leo", "Freya", "Arthur", "Grace", "Oscar"]
+LAST_NAMES = ["Smith", "Jones", "Taylor", "Brown", "Williams", "Wilson", "Evans", "Thomas", "Roberts", "Walker"]
+CLUBS = ["Otter SC", "Sutton & Cheam SC", "Tonbridge SC", "Bath Dolphin", "City of Leeds", "Ellesmere Titans"]
+MEETS = ["County Championships", "Winter Open", "Spring Sprint Meet", "Regional Championships", "Club Gala", "Summer Open"]
+VENUES = ["London Aquatics Centre", "Ponds Forge", "Tollcross", "Sutton Sports Village", "Crystal Palace", "Millfield"]
+
+def page_filename(path: str, params: Dict[str, str]) -> str:
+    """File name of a recorded page in a pages directory"""
+    tiref = params.get("tiref", "")
+    if path == PERSONAL_BEST_PATH:
+        return f"personal_best-{tiref}.html"
+    if path == EVENT_HISTORY_PATH:
+        return f"event_history-{tiref}-{params.get('tstroke', '')}{params.get('tcourse', '')}.html"
+    if path == BIOGS_PATH:
+        return f"biogs-{tiref}.html"
+    raise KeyError(path)
+
+class SyntheticSwimmer:
+    """Deterministic swimmer and race history derived from a tiref"""
+    
+    def __init__(self, tiref: str):
+        rng = random.Random(zlib.crc32(tiref.encode()))
+        self.tiref = tiref
+        self.name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+        self.club = rng.choice(CLUBS)
+        self.gender = rng.choice("MF")
+        level = rng.uniform(250, 650)  # WA points of current best swims
+        first_meet = datetime(2025, 7, 1) - timedelta(days=rng.randint(400, 2500))
+        
+        self.events: Dict[Tuple[int, str], List[Tuple[float, datetime, str, str, str]]] = {}
+        for event_id in sorted(rng.sample(sorted(EVENT_IDS), rng.randint(3, 10))):
+            stroke, distance = EVENT_IDS[event_id]
+            for course in ("L", "S"):
+                if course == "L" and rng.random() < 0.3:
+                    continue
+                base = float(points_table.base_times(stroke, distance, COURSES[course], self.gender))
+                if base != base:  # No base time for this event
+                    continue
+                races = []
+                count = rng.randint(3, 30)
+                for i in range(count):
+                    # Times fall from ~115% of the current best towards it, with noise
+                    progress = i / max(count - 1, 1)
+                    best = base / (level / 1000) ** (1 / 3)
+                    seconds = best * (1.15 - 0.15 * progress) * rng.uniform(0.99, 1.02)
+                    meet_date = first_meet + timedelta(days=int(progress * (datetime(2025, 7, 1) - first_meet).days))
+                    races.append((round(seconds, 2), meet_date, rng.choice(MEETS), rng.choice(VENUES), rng.choice("HF")))
+                self.events[(event_id, course)] = races
+        self.year_of_birth = rng.randint(2006, 2016)
+
+def format_time(seconds: float) -> str:
+    minutes, secs = divmod(seconds, 60)
+    return f"{int(minutes)}:{secs:05.2f}" if minutes else f"{secs:.2f}"
+
+def render_personal_best(swimmer: SyntheticSwimmer) -> str:
+    tables = []
+    for course, label in (("L", "LC"), ("S", "SC")):
+        rows = []
+        for (event_id, event_course), races in swimmer.events.items():
+            if event_course != course:
+                continue
+            stroke, distance = EVENT_IDS[event_id]
+            seconds, meet_date, meet, venue, _ = min(races)
+            points = int(points_table.points(seconds, stroke, distance, label, swimmer.gender))
+            rows.append(
+                f"<tr><td>{distance} {stroke}</td><td>{format_time(seconds)}</td><td>{format_time(seconds)}</td>"
+                f"<td>{points}</td><td>{meet_date:%d/%m/%y}</td><td>{html.escape(meet)}</td>"
+                f"<td>{html.escape(venue)}</td><td>{swimmer.tiref}</td><td>3</td></tr>"
+            )
+        tables.append(
+            f"<table><tr><th>Stroke</th><th>{label} Time</th><th>Converted Time</th><th>WA Pts</th><th>Date</th>"
+            f"<th>Meet</th><th>Venue</th><th>Licence</th><th>Level</th></tr>{''.join(rows)}</table>"
+        )
+    return (
+        f"<html><head><title>Individual Best Times</title></head><body>"
+        f"<p class=\"rnk_sj\">{html.escape(swimmer.name)} - (<a href=\"/biogs/biogs_details.php?tiref={swimmer.tiref}\">"
+        f"{swimmer.tiref}</a>) - {html.escape(swimmer.club)}</p>{''.join(tables)}</body></html>"
+    )
+
+def render_event_history(swimmer: SyntheticSwimmer, event_id: int, course: str) -> str:
+    races = swimmer.events.get((event_id, course), [])
+    stroke, distance = EVENT_IDS.get(event_id, ("Freestyle", 50))
+    rows = "".join(
+        f"<tr><td>{format_time(seconds)}</td>"
+        f"<td>{int(points_table.points(seconds, stroke, distance, COURSES[course], swimmer.gender))}</td>"
+        f"<td>{round_code}</td><td>{meet_date:%d/%m/%y}</td><td>{html.escape(meet)}</td><td>{html.escape(venue)}</td>"
+        f"<td>{html.escape(swimmer.club)}</td><td>3</td></tr>"
+        for seconds, meet_date, meet, venue, round_code in sorted(races, key=lambda race: race[1], reverse=True)
+    )
+    return (
+        f"<html><body><table><tr><th>Time</th><th>WA Pts</th><th>Round</th><th>Date</th><th>Meet</th>"
+        f"<th>Venue</th><th>Club</th><th>Level</th></tr>{rows}</table></body></html>"
+    )
+
+def render_biogs(swimmer: SyntheticSwimmer) -> str:
+    return (
+        f"<html><head><title>Biographical Data - {html.escape(swimmer.name)} ({html.escape(swimmer.club)})</title>"
+        f"</head><body><table><tr><th>Gender</th><td>{'Male' if swimmer.gender == 'M' else 'Female'}</td></tr>"
+        f"<tr><th>Year of Birth</th><td>{swimmer.year_of_birth}</td></tr></table></body></html>"
+    )
+
+class UpstreamStats:
+    """Responses served, by status"""
+    
+    def __init__(self):
+        self.by_status: Dict[int, int] = {}
+        self._lock = threading.Lock()
+    
+    def record(self, status: int):
+        with self._lock:
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+    
+    def snapshot(self) -> Dict[int, int]:
+        with self._lock:
+            return dict(self.by_status)
+
+class UpstreamServer(ThreadingHTTPServer):
+    """Threaded stand-in server with fault injection"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int], pages: Optional[Path] = None, latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 max_rps: Optional[float] = None, seed: int = 0):
+        super().__init__(address, UpstreamHandler)
+        self.pages = pages
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.max_rps = max_rps
+        self.stats = UpstreamStats()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recent: List[float] = []
+        self._swimmers: Dict[str, SyntheticSwimmer] = {}
+    
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def start(self) -> "UpstreamServer":
+        """Serve from a daemon thread"""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+    
+    def fault(self) -> Optional[int]:
+        """Status code to fail the next request with, if any"""
+        with self._lock:
+            roll = self._rng.random()
+            if self.max_rps:
+                now = time.monotonic()
+                self._recent = [t for t in self._recent if now - t < 1.0]
+                if len(self._recent) >= self.max_rps:
+                    return 429
+                self._recent.append(now)
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return 503
+        return None
+    
+    def delay(self):
+        with self._lock:
+            seconds = max(self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms), 0.0) / 1000
+        time.sleep(seconds)
+    
+    def swimmer(self, tiref: str) -> SyntheticSwimmer:
+        with self._lock:
+            swimmer = self._swimmers.get(tiref)
+        if swimmer is None:
+            swimmer = SyntheticSwimmer(tiref)
+            with self._lock:
+                self._swimmers[tiref] = swimmer
+        return swimmer
+    
+    def render(self, path: str, params: Dict[str, str]) -> Optional[str]:
+        if self.pages is not None:
+            try:
+                recorded = self.pages / page_filename(path, params)
+            except KeyError:
+                return None
+            if recorded.exists():
+                return recorded.read_text(encoding="utf-8")
+        
+        tiref = params.get("tiref", "")
+        if not tiref.isdigit():
+            return None
+        if path == PERSONAL_BEST_PATH:
+            return render_personal_best(self.swimmer(tiref))
+        if path == EVENT_HISTORY_PATH:
+            return render_event_history(self.swimmer(tiref), int(params.get("tstroke", 0) or 0), params.get("tcourse", "L"))
+        if path == BIOGS_PATH:
+            return render_biogs(self.swimmer(tiref))
+        return None
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    server: UpstreamServer
+    
+    def log_message(self, format, *args):
+        pass  # Keep load tests quiet
+    
+    def _respond(self, include_body: bool):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        self.server.delay()
+        
+        status = self.server.fault()
+        body = None
+        if status is None:
+            body = self.server.render(url.path, params) if url.path != "/" else "<html><body>OK</body></html>"
+            status = 200 if body is not None else 404
+        payload = (body or f"<html><body>{status}</body></html>").encode("utf-8")
+        
+        self.server.stats.record(status)
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if status == 429:
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        if include_body:
+            self.wfile.write(payload)
+    
+    def do_GET(self):
+        self._respond(include_body=True)
+    
+    def do_HEAD(self):
+        self._respond(include_body=False)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=Path, help="Directory of recorded pages served in preference to synthetic ones")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added response latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter on the latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--max-rps", type=float, help="Answer 429 above this many requests per second")
+    args = parser.parse_args()
+    
+    server = UpstreamServer(
+        (args.host, args.port), pages=args.pages, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, throttle_rate=args.throttle_rate, max_rps=args.max_rps
+    )
+    print(f"Serving stand-in results site on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"Responses by status: {server.stats.snapshot()}")
+        server.server_close()
+
+if __name__ == "__main__":
+    main()